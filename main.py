@@ -14,7 +14,6 @@ src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 try:
-    from src.gui.main_window import main
     from src.utils.logger import logger
     from src.config.settings import config
 except ImportError as e:
@@ -92,8 +91,15 @@ def show_startup_info():
     print("\n🚀 Iniciando aplicação...")
     print("=" * 60 + "\n")
 
+# Subcomandos atendidos pela linha de comando, sem carregar a interface gráfica
+CLI_COMMANDS = ("analyze", "estimate", "organize", "restore", "watch", "-h", "--help")
+
 def main_entry():
     """Ponto de entrada principal"""
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS + ("-q", "--quiet"):
+        from src.cli import main as cli_main
+        return cli_main(sys.argv[1:])
+    
     try:
         # Mostrar informações de inicialização
         show_startup_info()
@@ -112,6 +118,7 @@ def main_entry():
         logger.info("✅ Ambiente configurado com sucesso")
         logger.info("🎯 Iniciando interface gráfica")
         
+        from src.gui.main_window import main
         main()
         
         logger.info("👋 Aplicação finalizada")
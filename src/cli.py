@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Interface de linha de comando do Organizador de Arquivos (sem interface gráfica)
+Uso: python -m src.cli analyze|estimate|organize|restore|watch ...
+"""
+
+import sys
+import json
+import logging
+import argparse
+from typing import List, Dict, Optional, Any
+
+from .utils.logger import logger
+from .utils.backup import backup_manager
+from .core.organizer import organizer
+from .core.filters import filter_manager, SizeFilter, DateFilter, ExtensionFilter, HiddenFileFilter
+from .core.templates import mode_template, compile_template
+from .config.settings import config
+
+MODES = ["por_tipo", "por_data", "por_nome"]
+
+def _mode(value: str) -> str:
+    """Modo fixo, modelo nomeado em organization_templates ou modelo direto ({category}/{year}/{month})"""
+    template = mode_template(value, config.get("organization_templates", {}))
+    if template is None:
+        raise argparse.ArgumentTypeError(
+            f"modo desconhecido: {value} (use {', '.join(MODES)}, um modelo da configuração ou um modelo como "
+            f"'{{category}}/{{year}}/{{month}}')"
+        )
+    try:
+        compile_template(template)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+def _json_default(obj: Any):
+    """Converte visões da tabela colunar e do plano em estruturas serializáveis"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "to_dicts"):
+        return obj.to_dicts()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Objeto não serializável: {type(obj).__name__}")
+
+def _emit(data: Dict, pretty: bool = False):
+    """Escreve um objeto JSON na saída padrão (uma linha, salvo em modo legível)"""
+    sys.stdout.write(json.dumps(data, ensure_ascii=False, default=_json_default,
+                                indent=2 if pretty else None))
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+def _suggestion_line(suggestion) -> Dict:
+    return {
+        "type": "suggestion",
+        "source": suggestion["source"],
+        "destination": suggestion["destination"],
+        "category": suggestion["category"],
+        "size_mb": round(suggestion["size_mb"], 4)
+    }
+
+def _apply_filters(args: argparse.Namespace):
+    """Configura o gerenciador de filtros a partir das opções (sem alterar a configuração salva)"""
+    filter_manager.clear_filters()
+    
+    if args.preset and not filter_manager.apply_preset(args.preset):
+        raise ValueError(f"Preset desconhecido: {args.preset}")
+    if args.ext:
+        filter_manager.add_filter(ExtensionFilter(args.ext))
+    if args.min_size is not None or args.max_size is not None:
+        filter_manager.add_filter(SizeFilter(args.min_size or 0,
+                                             args.max_size if args.max_size is not None else float('inf')))
+    if args.days is not None:
+        filter_manager.add_filter(DateFilter(days_ago=args.days))
+    if args.exclude_hidden:
+        filter_manager.add_filter(HiddenFileFilter(include_hidden=False))
+
+def cmd_analyze(args: argparse.Namespace) -> int:
+    """Analisa a pasta e emite o plano (JSON compacto ou uma sugestão por linha em JSONL)"""
+    _apply_filters(args)
+    
+    if args.format == "jsonl":
+        # Em fluxo: cada lote é escrito assim que fica pronto
+        last_batch = None
+        for batch in organizer.iter_analysis(args.folder, args.mode, args.recursive, args.max_depth,
+                                             timeout=args.timeout, find_duplicates=args.find_duplicates,
+                                             group_similar_images=args.group_similar_images):
+            if not batch["success"]:
+                _emit({"type": "error", "error": batch.get("error") or batch.get("errors")})
+                return 1
+            for suggestion in batch["suggestions"]:
+                _emit(_suggestion_line(suggestion))
+            last_batch = batch
+        
+        similar_images = last_batch["similar_images"] if last_batch else None
+        if similar_images and similar_images["groups"]:
+            # O agrupamento roda sobre o plano completo, depois que as sugestões já saíram: as que
+            # mudaram de pasta saem de novo como "redirect", com o destino que o organize usaria
+            grouped = {path for group in similar_images["groups"] for path in group["files"]}
+            plan = last_batch["plan"]
+            for position, (source, _) in enumerate(plan.iter_moves()):
+                if source in grouped:
+                    _emit({**_suggestion_line(plan[position]), "type": "redirect"})
+        
+        _emit({"type": "summary", "stats": last_batch["stats"] if last_batch else {},
+               "duplicates": last_batch["duplicates"] if last_batch else None,
+               "similar_images": last_batch["similar_images"] if last_batch else None,
+               "partial": bool(last_batch and last_batch["partial"])})
+        return 0
+    
+    analysis = organizer.analyze_folder(args.folder, args.mode, args.recursive, args.max_depth,
+                                        timeout=args.timeout, find_duplicates=args.find_duplicates,
+                                        group_similar_images=args.group_similar_images)
+    if not analysis["success"]:
+        _emit({"success": False, "error": analysis.get("error") or analysis.get("errors")}, args.pretty)
+        return 1
+    
+    suggestions = analysis["suggestions"]
+    _emit({
+        "success": True,
+        "folder": args.folder,
+        "mode": args.mode,
+        "partial": analysis["partial"],
+        "stats": analysis["stats"],
+        "duplicates": analysis["duplicates"],
+        "similar_images": analysis["similar_images"],
+        "plan": suggestions.to_compact() if hasattr(suggestions, "to_compact") else list(suggestions)
+    }, args.pretty)
+    return 0
+
+def cmd_estimate(args: argparse.Namespace) -> int:
+    """Estimativa rápida por amostragem, sem varrer a pasta inteira"""
+    _apply_filters(args)
+    budget = args.budget if args.budget is not None else args.timeout
+    result = organizer.estimate_folder(args.folder, args.mode, args.recursive, args.max_depth,
+                                       budget, args.seed)
+    _emit(result, args.pretty)
+    return 0 if result["success"] else 1
+
+def cmd_organize(args: argparse.Namespace) -> int:
+    """Analisa e move os arquivos (ou apenas mostra o plano com --dry-run)"""
+    if args.dry_run:
+        return cmd_analyze(args)
+    
+    _apply_filters(args)
+    find_duplicates = args.find_duplicates or (args.duplicates not in (None, "keep")) or None
+    analysis = organizer.analyze_folder(args.folder, args.mode, args.recursive, args.max_depth,
+                                        timeout=args.timeout, find_duplicates=find_duplicates,
+                                        group_similar_images=args.group_similar_images)
+    if not analysis["success"]:
+        _emit({"success": False, "error": analysis.get("error") or analysis.get("errors")}, args.pretty)
+        return 1
+    
+    if not analysis["suggestions"]:
+        _emit({"success": True, "moved_files": 0, "errors": [], "backup_id": None}, args.pretty)
+        return 0
+    
+    # Em jsonl cada arquivo é emitido assim que é movido, sem acumular a lista
+    on_moved = None
+    if args.format == "jsonl":
+        on_moved = lambda source, destination: _emit({"type": "moved", "source": source,
+                                                      "destination": destination})
+    
+    result = organizer.execute_organization(analysis["suggestions"], create_backup=not args.no_backup,
+                                            duplicates=analysis["duplicates"], duplicate_action=args.duplicates,
+                                            on_moved=on_moved)
+    
+    if args.format == "jsonl":
+        for error in result.get("errors", []):
+            _emit({"type": "error", "error": error})
+        _emit({"type": "summary", "success": result["success"], "stats": result.get("stats", {}),
+               "backup_id": result.get("backup_id")})
+    else:
+        _emit({
+            "success": result["success"],
+            "moved_files": result.get("stats", {}).get("moved_files", 0),
+            "errors": result.get("errors", [result.get("error")] if "error" in result else []),
+            "backup_id": result.get("backup_id"),
+            "stats": result.get("stats", {})
+        }, args.pretty)
+    
+    return 0 if result["success"] else 1
+
+def cmd_restore(args: argparse.Namespace) -> int:
+    """Lista backups ou restaura um backup"""
+    if args.list or not args.backup_id:
+        backups = backup_manager.list_backups()
+        if args.format == "jsonl":
+            for backup in backups:
+                _emit(backup)
+        else:
+            _emit({"backups": backups}, args.pretty)
+        return 0
+    
+    success = backup_manager.restore_backup(args.backup_id)
+    _emit({"success": success, "backup_id": args.backup_id}, args.pretty)
+    return 0 if success else 1
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    """Observa pastas e organiza arquivos novos até ser interrompido"""
+    from .core.watcher import FolderWatcher
+    
+    _apply_filters(args)
+    watcher = FolderWatcher(args.folders or None, args.mode, args.debounce,
+                            create_backup=False if args.no_backup else None)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    
+    _emit({"success": True, "stats": watcher.stats}, args.pretty)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o parser de argumentos"""
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Organizador de Arquivos - linha de comando")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Somente avisos e erros no stderr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    def add_common(sub: argparse.ArgumentParser):
+        sub.add_argument("--format", choices=["json", "jsonl"], default="json", help="Formato da saída")
+        sub.add_argument("--pretty", action="store_true", help="JSON indentado")
+    
+    def add_duplicates(sub: argparse.ArgumentParser):
+        sub.add_argument("--find-duplicates", action="store_true", default=None,
+                         help="Procurar duplicatas por conteúdo (lê os arquivos)")
+        sub.add_argument("--group-similar-images", action="store_true", default=None,
+                         help="Agrupar imagens quase idênticas em subpastas (requer Pillow)")
+    
+    def add_analysis(sub: argparse.ArgumentParser):
+        sub.add_argument("--mode", type=_mode, default="por_tipo",
+                         help="Modo de organização (por_tipo, por_data, por_nome ou modelo como {category}/{year})")
+        sub.add_argument("-r", "--recursive", action="store_true", default=None, help="Incluir subpastas")
+        sub.add_argument("--max-depth", type=int, default=None, help="Profundidade máxima (com -r)")
+        sub.add_argument("--timeout", type=float, default=None, help="Prazo da análise em segundos (resultado parcial)")
+        sub.add_argument("--preset", help="Preset de filtros (ex.: apenas_imagens)")
+        sub.add_argument("--ext", action="append", help="Incluir só estas extensões (repetível)")
+        sub.add_argument("--min-size", type=float, help="Tamanho mínimo (MB)")
+        sub.add_argument("--max-size", type=float, help="Tamanho máximo (MB)")
+        sub.add_argument("--days", type=int, help="Modificados nos últimos N dias")
+        sub.add_argument("--exclude-hidden", action="store_true", help="Ignorar arquivos ocultos")
+    
+    analyze = subparsers.add_parser("analyze", help="Analisa uma pasta e emite o plano")
+    analyze.add_argument("folder")
+    add_analysis(analyze)
+    add_duplicates(analyze)
+    add_common(analyze)
+    analyze.set_defaults(handler=cmd_analyze)
+    
+    estimate = subparsers.add_parser("estimate", help="Estimativa rápida por amostragem")
+    estimate.add_argument("folder")
+    add_analysis(estimate)
+    add_common(estimate)
+    estimate.add_argument("--budget", type=float, default=None, help="Orçamento de tempo (segundos)")
+    estimate.add_argument("--seed", type=int, default=None, help="Semente da amostragem")
+    estimate.set_defaults(handler=cmd_estimate)
+    
+    organize = subparsers.add_parser("organize", help="Organiza os arquivos de uma pasta")
+    organize.add_argument("folder")
+    add_analysis(organize)
+    add_duplicates(organize)
+    add_common(organize)
+    organize.add_argument("--no-backup", action="store_true", help="Não criar backup")
+    organize.add_argument("--dry-run", action="store_true", help="Apenas mostrar o plano")
+    organize.add_argument("--duplicates", choices=["keep", "skip", "hardlink", "quarantine"], default=None,
+                          help="O que fazer com cópias extras (implica --find-duplicates)")
+    organize.set_defaults(handler=cmd_organize)
+    
+    restore = subparsers.add_parser("restore", help="Restaura ou lista backups")
+    restore.add_argument("backup_id", nargs="?")
+    restore.add_argument("--list", action="store_true", help="Listar backups disponíveis")
+    add_common(restore)
+    restore.set_defaults(handler=cmd_restore)
+    
+    watch = subparsers.add_parser("watch", help="Organiza arquivos conforme chegam")
+    watch.add_argument("folders", nargs="*", help="Pastas (padrão: watch_folders da configuração)")
+    watch.add_argument("--mode", type=_mode, default=None, help="Modo de organização ou modelo de caminho")
+    watch.add_argument("--debounce", type=float, default=None, help="Segundos de estabilidade")
+    watch.add_argument("--no-backup", action="store_true", help="Não criar backups")
+    watch.add_argument("--preset", help="Preset de filtros")
+    watch.add_argument("--ext", action="append", help="Incluir só estas extensões (repetível)")
+    watch.add_argument("--min-size", type=float, help="Tamanho mínimo (MB)")
+    watch.add_argument("--max-size", type=float, help="Tamanho máximo (MB)")
+    watch.add_argument("--days", type=int, help="Modificados nos últimos N dias")
+    watch.add_argument("--exclude-hidden", action="store_true", help="Ignorar arquivos ocultos")
+    add_common(watch)
+    watch.set_defaults(handler=cmd_watch)
+    
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    args = build_parser().parse_args(argv)
+    
+    if args.quiet:
+        logger.set_console_level(logging.WARNING)
+    
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        _emit({"success": False, "error": str(e)})
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
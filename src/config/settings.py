@@ -37,10 +37,47 @@ class Config:
             "auto_save_logs": True,
             "window_geometry": "1100x800",
             "enable_drag_drop": True,
-            "show_file_preview": True
+            "show_file_preview": True,
+            "recursive_scan": False,
+            "scan_max_depth": None,
+            "scan_workers": 8,
+            "use_metadata_index": True,
+            "skip_unchanged_dirs": True,
+            "analysis_batch_size": 500,
+            "content_sniffing": "unknown",
+            "sniff_workers": 4,
+            "watch_folders": [],
+            "watch_debounce_seconds": 2.0,
+            "watch_batch_size": 200,
+            "watch_poll_interval": 5.0,
+            "batch_workers": None,
+            "batch_workers_per_device": 2,
+            "estimate_time_budget": 0.2,
+            "progress_rate_hz": 20,
+            "analysis_memory_budget_mb": 1024,
+            "spill_dir": None,
+            "detect_duplicates": False,
+            "duplicate_action": "keep",
+            "duplicates_folder": "Duplicados",
+            "hash_workers": 4,
+            "group_similar_images": False,
+            "similar_images_categories": ["Imagens"],
+            "similar_images_max_distance": 5,
+            "image_hash_workers": None,
+            "organization_templates": {
+                "por_categoria_data": "{category}/{year}/{month}",
+                "por_extensao_tamanho": "{ext}/{size_class}"
+            },
+            "scan_snapshot_entries": 2,
+            "move_workers": 8,
+            "move_workers_per_device": 4,
+            "move_segment_size": 10000
         }
         
         self.settings = self.load_settings()
+        
+        # Incrementado a cada alteração; estruturas derivadas (ex.: índice de categorias) se reconstroem
+        self.version = 0
     
     def load_settings(self) -> Dict[str, Any]:
         """Carrega configurações do arquivo"""
@@ -74,6 +111,7 @@ class Config:
     def set(self, key: str, value: Any):
         """Define valor de configuração"""
         self.settings[key] = value
+        self.version += 1
         self.save_settings()
     
     def add_recent_folder(self, folder_path: str):
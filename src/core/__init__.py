@@ -9,6 +9,21 @@ __author__ = "Organizador IA Team"
 __description__ = "Lógica principal de organização de arquivos"
 
 from .organizer import AdvancedOrganizer, organizer
+from .scanner import FileScanner, PathEntry, file_scanner
+from .file_table import FileTable, FileRow, FileRowList
+from .plan import OrganizationPlan, PlanView, PlanEntry, DestinationNames
+from .spill import SpillStore, SpilledPlan, SpilledRows
+from .snapshot import ScanSnapshot, ScanSnapshotCache, scan_snapshots
+from .categories import CategoryIndex, CategoryClassifier, category_classifier
+from .sniffer import ContentSniffer, content_sniffer
+from .watcher import FolderWatcher
+from .batch import BatchAnalyzer, batch_analyzer
+from .estimator import FolderEstimator, folder_estimator
+from .duplicates import DuplicateFinder, duplicate_finder
+from .executor import MoveExecutor, move_executor
+from .similar_images import SimilarImageFinder, MultiIndexHamming, similar_image_finder
+from .rules import RuleEngine, CompiledRule, compile_rule
+from .templates import PathTemplate, compile_template, template_for_mode
 from .filters import (
     FileFilter, SizeFilter, DateFilter, ExtensionFilter,
     NameFilter, CategoryFilter, HiddenFileFilter, ReadOnlyFilter,
@@ -17,6 +32,21 @@ from .filters import (
 
 __all__ = [
     "AdvancedOrganizer", "organizer",
+    "FileScanner", "PathEntry", "file_scanner",
+    "FileTable", "FileRow", "FileRowList",
+    "OrganizationPlan", "PlanView", "PlanEntry", "DestinationNames",
+    "SpillStore", "SpilledPlan", "SpilledRows",
+    "ScanSnapshot", "ScanSnapshotCache", "scan_snapshots",
+    "CategoryIndex", "CategoryClassifier", "category_classifier",
+    "ContentSniffer", "content_sniffer",
+    "FolderWatcher",
+    "BatchAnalyzer", "batch_analyzer",
+    "FolderEstimator", "folder_estimator",
+    "DuplicateFinder", "duplicate_finder",
+    "MoveExecutor", "move_executor",
+    "SimilarImageFinder", "MultiIndexHamming", "similar_image_finder",
+    "RuleEngine", "CompiledRule", "compile_rule",
+    "PathTemplate", "compile_template", "template_for_mode",
     "FileFilter", "SizeFilter", "DateFilter", "ExtensionFilter",
     "NameFilter", "CategoryFilter", "HiddenFileFilter", "ReadOnlyFilter",
     "FilterManager", "SmartFilter", "filter_manager"
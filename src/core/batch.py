@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Análise em lote de várias pastas em processos paralelos, limitada por dispositivo
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional, Callable, Iterable, Deque, Tuple
+
+from ..utils.logger import logger
+from ..utils.metadata_index import metadata_index
+from ..config.settings import config
+from .filters import filter_manager, FileFilter
+from .organizer import organizer
+
+def _analyze_root(folder_path: str, organization_mode: str, recursive: Optional[bool],
+                  max_depth: Optional[int], filters: List[FileFilter]) -> Dict:
+    """Executado no processo de trabalho: analisa uma pasta e devolve um resultado serializável"""
+    filter_manager.filters = list(filters)
+    analysis = organizer.analyze_folder(folder_path, organization_mode, recursive, max_depth)
+    metadata_index.flush()
+    
+    if not analysis["success"]:
+        return {"success": False, "error": analysis.get("error") or analysis.get("errors")}
+    
+    stats = dict(analysis["stats"])
+    for key in ("largest_file", "smallest_file"):
+        if hasattr(stats.get(key), "to_dict"):
+            stats[key] = stats[key].to_dict()
+    
+    suggestions = analysis["suggestions"]
+    return {
+        "success": True,
+        "stats": stats,
+        "plan": suggestions.to_compact() if hasattr(suggestions, "to_compact") else
+                {"source_dirs": [], "dest_dirs": [], "moves": []}
+    }
+
+class BatchAnalyzer:
+    """Analisa muitas pastas em paralelo sem sobrecarregar um mesmo disco"""
+    
+    def __init__(self):
+        self.progress_callback: Optional[Callable[[int, int, str], None]] = None
+    
+    def set_progress_callback(self, callback: Callable[[int, int, str], None]):
+        """Define callback chamado a cada pasta concluída"""
+        self.progress_callback = callback
+    
+    @staticmethod
+    def _device(folder_path: str) -> int:
+        """Dispositivo onde a pasta está (st_dev)"""
+        return os.stat(folder_path).st_dev
+    
+    def analyze(self, folders: Iterable[str], organization_mode: str = "por_tipo",
+                recursive: Optional[bool] = None, max_depth: Optional[int] = None,
+                max_workers: Optional[int] = None, per_device: Optional[int] = None) -> Dict:
+        """Analisa as pastas em processos separados e combina as estatísticas"""
+        folders = list(dict.fromkeys(os.path.abspath(folder) for folder in folders))
+        results: Dict[str, Dict] = {}
+        
+        # Fila por dispositivo: no máximo per_device análises simultâneas em cada disco
+        queues: Dict[int, Deque[str]] = {}
+        for folder in folders:
+            try:
+                queues.setdefault(self._device(folder), deque()).append(folder)
+            except OSError as e:
+                results[folder] = {"success": False, "error": str(e)}
+        
+        pending_count = sum(len(queue) for queue in queues.values())
+        if max_workers is None:
+            max_workers = config.get("batch_workers") or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, pending_count))
+        if per_device is None:
+            per_device = config.get("batch_workers_per_device", 2)
+        per_device = max(1, per_device)
+        
+        filters = list(filter_manager.filters)
+        args = (organization_mode, recursive, max_depth, filters)
+        
+        logger.info(f"📚 Análise em lote de {len(folders)} pastas em {len(queues)} dispositivo(s) "
+                    f"({max_workers} processos, até {per_device} por dispositivo)")
+        
+        if pending_count == 1 or max_workers == 1:
+            # Sem paralelismo possível: evitar o custo de iniciar processos
+            for queue in queues.values():
+                while queue:
+                    folder = queue.popleft()
+                    results[folder] = _analyze_root(folder, *args)
+                    self._report(len(results), len(folders), folder)
+        elif pending_count:
+            self._run_pool(queues, args, max_workers, per_device, results, len(folders))
+        
+        ordered = {folder: results[folder] for folder in folders}
+        stats = self._merge_stats(result["stats"] for result in ordered.values() if result["success"])
+        errors = {folder: result["error"] for folder, result in ordered.items() if not result["success"]}
+        
+        logger.info(f"✅ Análise em lote concluída: {stats['total_files']} arquivos, {len(errors)} pasta(s) com erro")
+        
+        return {
+            "success": not errors,
+            "results": ordered,
+            "stats": stats,
+            "errors": errors
+        }
+    
+    def _run_pool(self, queues: Dict[int, Deque[str]], args: Tuple, max_workers: int, per_device: int,
+                  results: Dict[str, Dict], total: int):
+        """Distribui as pastas entre os processos respeitando o limite por dispositivo"""
+        running: Dict[Future, Tuple[str, int]] = {}
+        active = {device: 0 for device in queues}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            while running or any(queues.values()):
+                # Rodízio entre dispositivos para que um disco lento não atrase os demais
+                submitted = True
+                while submitted and len(running) < max_workers:
+                    submitted = False
+                    for device, queue in queues.items():
+                        if queue and active[device] < per_device and len(running) < max_workers:
+                            folder = queue.popleft()
+                            running[pool.submit(_analyze_root, folder, *args)] = (folder, device)
+                            active[device] += 1
+                            submitted = True
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder, device = running.pop(future)
+                    active[device] -= 1
+                    try:
+                        results[folder] = future.result()
+                    except Exception as e:
+                        logger.error(f"Erro no processo de análise de {folder}", e)
+                        results[folder] = {"success": False, "error": str(e)}
+                    self._report(len(results), total, folder)
+    
+    def _report(self, done: int, total: int, folder: str):
+        if self.progress_callback:
+            self.progress_callback(done, total, f"Analisada: {folder}")
+    
+    @staticmethod
+    def _merge_stats(all_stats: Iterable[Dict]) -> Dict:
+        """Soma as estatísticas de várias análises"""
+        merged = organizer._new_stats()
+        categories_stats = merged["categories_stats"]
+        
+        for stats in all_stats:
+            if not stats:
+                continue
+            merged["total_files"] += stats["total_files"]
+            merged["total_size_mb"] += stats["total_size_mb"]
+            
+            for category, info in stats["categories_stats"].items():
+                total = categories_stats.setdefault(category, {"count": 0, "size_mb": 0})
+                total["count"] += info["count"]
+                total["size_mb"] += info["size_mb"]
+            
+            largest, smallest = stats.get("largest_file"), stats.get("smallest_file")
+            if largest is not None and (merged["largest_file"] is None or
+                                        largest["size_mb"] > merged["largest_file"]["size_mb"]):
+                merged["largest_file"] = largest
+            if smallest is not None and (merged["smallest_file"] is None or
+                                         smallest["size_mb"] < merged["smallest_file"]["size_mb"]):
+                merged["smallest_file"] = smallest
+        
+        merged["categories_count"] = len(categories_stats)
+        return merged
+
+# Instância global do analisador em lote
+batch_analyzer = BatchAnalyzer()
\ No newline at end of file
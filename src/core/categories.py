@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Índice pré-compilado de extensões para categorias do Organizador de Arquivos
+"""
+
+import json
+import hashlib
+from typing import Dict, Optional, Any
+
+from ..utils.logger import logger
+from ..config.settings import config, FILE_CATEGORIES
+
+DEFAULT_CATEGORY = "Outros"
+
+# Tamanho mínimo da extensão base para reconhecer sufixos numerados (ex.: ".blend1" -> ".blend")
+MIN_NUMBERED_BASE = 3
+
+class CategoryIndex:
+    """Mapa de extensões simples mais trie reversa de sufixos compostos (ex.: ".tar.gz")"""
+    
+    def __init__(self, categories: Dict[str, Any]):
+        self.extensions: Dict[str, str] = {}
+        # Trie reversa: cada nível é um componente do sufixo, do último para o primeiro
+        self.trie: Dict[str, Dict] = {}
+        self.max_parts = 1
+        
+        for category, info in categories.items():
+            extensions = info.get("extensions", []) if isinstance(info, dict) else info
+            for extension in extensions:
+                self._add(extension, category)
+        
+        # Assinatura do mapeamento: muda quando alguma extensão troca de categoria
+        payload = json.dumps(sorted(self.extensions.items()), ensure_ascii=False)
+        self.signature = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def _add(self, extension: str, category: str):
+        """Registra uma extensão; a primeira categoria que a declara prevalece"""
+        extension = extension.lower().strip()
+        if not extension.startswith('.'):
+            extension = '.' + extension
+        parts = [part for part in extension.split('.') if part]
+        if not parts:
+            return
+        
+        extension = '.' + '.'.join(parts)
+        if extension in self.extensions:
+            return
+        self.extensions[extension] = category
+        
+        if len(parts) > 1:
+            node = self.trie
+            for part in reversed(parts):
+                node = node.setdefault(part, {})
+            node[None] = category
+            self.max_parts = max(self.max_parts, len(parts))
+    
+    def classify(self, name: str) -> str:
+        """Categoria do arquivo pelo nome, preferindo o sufixo composto mais longo"""
+        # Mesma semântica de Path.suffix: pontos iniciais não iniciam extensão
+        stem = name.lstrip('.').lower()
+        last = stem.rfind('.')
+        if last <= 0 or last == len(stem) - 1:
+            return DEFAULT_CATEGORY
+        
+        if self.max_parts > 1:
+            parts = stem.split('.')[1:][-self.max_parts:]
+            node = self.trie
+            match = None
+            for part in reversed(parts):
+                node = node.get(part)
+                if node is None:
+                    break
+                match = node.get(None, match)
+            if match is not None:
+                return match
+        
+        return self.by_extension(stem[last:])
+    
+    def by_extension(self, extension: str) -> str:
+        """Categoria de uma extensão simples (com ponto)"""
+        extension = extension.lower()
+        category = self.extensions.get(extension)
+        if category is not None:
+            return category
+        
+        # Sufixos numerados de backup/versão (".blend1", ".ogg2") herdam a categoria da base
+        base = extension.rstrip("0123456789")
+        if base != extension and len(base) > MIN_NUMBERED_BASE:
+            return self.extensions.get(base, DEFAULT_CATEGORY)
+        
+        return DEFAULT_CATEGORY
+
+class CategoryClassifier:
+    """Mantém o índice de categorias, reconstruído só quando a configuração muda"""
+    
+    def __init__(self):
+        self._index: Optional[CategoryIndex] = None
+        self._config_version: Optional[int] = None
+        self._source_signature: Optional[str] = None
+    
+    @property
+    def index(self) -> CategoryIndex:
+        # A versão da configuração muda com qualquer ajuste (pastas recentes, tema...): ela só
+        # dispara a comparação da assinatura das categorias, que decide a reconstrução
+        if self._index is None or self._config_version != config.version:
+            self._config_version = config.version
+            merged = self.merged_categories()
+            signature = hashlib.sha1(json.dumps(merged, sort_keys=True, ensure_ascii=False,
+                                                default=str).encode("utf-8")).hexdigest()
+            if self._index is None or signature != self._source_signature:
+                self._source_signature = signature
+                self._index = CategoryIndex(merged)
+                logger.debug(f"Índice de categorias reconstruído: {len(self._index.extensions)} extensões")
+        return self._index
+    
+    def merged_categories(self) -> Dict[str, Any]:
+        """Categorias customizadas (prioritárias) seguidas das categorias padrão"""
+        merged: Dict[str, Any] = {}
+        custom = config.get("custom_categories", {}) or {}
+        merged.update(custom)
+        for category, info in FILE_CATEGORIES.items():
+            if category in merged:
+                # Categoria padrão estendida pelo usuário: manter também as extensões originais
+                extra = merged[category].get("extensions", []) if isinstance(merged[category], dict) else merged[category]
+                merged[category] = {"extensions": list(extra) + info["extensions"]}
+            else:
+                merged[category] = info
+        return merged
+    
+    def classify(self, name: str) -> str:
+        return self.index.classify(name)
+    
+    def by_extension(self, extension: str) -> str:
+        return self.index.by_extension(extension)
+
+# Instância global do classificador de categorias
+category_classifier = CategoryClassifier()
\ No newline at end of file
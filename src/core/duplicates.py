@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Detecção de arquivos duplicados por conteúdo (tamanho, hash parcial e hash completo)
+"""
+
+import os
+import mmap
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Sequence, Mapping, Tuple
+
+from ..utils.logger import logger
+from ..utils.cancellation import CancellationToken
+from .file_table import BYTES_PER_MB
+
+# Bytes lidos do início e do fim de cada arquivo no hash parcial
+PARTIAL_BLOCK = 64 * 1024
+
+# Bytes do mmap passados ao hash por vez (entre eles o cancelamento é verificado)
+HASH_CHUNK = 4 * 1024 * 1024
+
+# Ações possíveis para as cópias extras na organização
+DUPLICATE_ACTIONS = ("keep", "skip", "hardlink", "quarantine")
+
+# (caminho, tamanho em bytes, data de modificação) de um arquivo candidato
+Candidate = Tuple[str, int, float]
+
+class DuplicateFinder:
+    """Agrupa arquivos idênticos: só arquivos de mesmo tamanho e mesmo hash parcial são lidos por inteiro"""
+    
+    def __init__(self, workers: int = 4, min_size: int = 1):
+        self.workers = max(1, workers)
+        # Arquivos vazios são todos "iguais" e não ocupam espaço: ignorados por padrão
+        self.min_size = min_size
+    
+    def find(self, files_info: Sequence[Mapping], token: Optional[CancellationToken] = None) -> Dict:
+        """Retorna os grupos de duplicatas (o mais antigo de cada grupo é o original)"""
+        # Etapa 1: só tamanhos repetidos podem ter duplicatas. Duas passadas sobre as linhas para
+        # que caminhos só sejam montados para os candidatos
+        size_counts = Counter(file_info["size_bytes"] for file_info in files_info)
+        candidates = [
+            (file_info["path"], file_info["size_bytes"], file_info["modified"])
+            for file_info in files_info
+            if file_info["size_bytes"] >= self.min_size and size_counts[file_info["size_bytes"]] > 1
+        ]
+        del size_counts
+        
+        groups: List[List[Candidate]] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as pool:
+            # Etapa 2: início e fim do arquivo; arquivos pequenos já ficam resolvidos aqui
+            partial_groups = self._group(pool, self._partial_hash, candidates, token)
+            
+            # Etapa 3: hash completo apenas onde o parcial não cobre o arquivo inteiro
+            pending = []
+            for (size, _), members in partial_groups.items():
+                if size <= 2 * PARTIAL_BLOCK:
+                    groups.append(members)
+                else:
+                    pending.extend(members)
+            groups.extend(self._group(pool, self._full_hash, pending, token).values())
+        
+        return self._report(groups, token)
+    
+    def _group(self, pool: ThreadPoolExecutor, hasher, candidates: List[Candidate],
+               token: Optional[CancellationToken]) -> Dict[Tuple[int, str], List[Candidate]]:
+        """Agrupa por (tamanho, hash) em paralelo, mantendo só os grupos com mais de um arquivo"""
+        buckets: Dict[Tuple[int, str], List[Candidate]] = {}
+        
+        def digest(candidate: Candidate) -> Optional[str]:
+            if token is not None and token.cancelled:
+                return None
+            return hasher(candidate[0], token)
+        
+        for candidate, value in zip(candidates, pool.map(digest, candidates)):
+            if value is not None:
+                buckets.setdefault((candidate[1], value), []).append(candidate)
+        
+        return {key: members for key, members in buckets.items() if len(members) > 1}
+    
+    @staticmethod
+    def _partial_hash(path: str, token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Hash do primeiro e do último bloco (o arquivo inteiro se for pequeno)"""
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(PARTIAL_BLOCK), digest_size=16)
+                size = os.fstat(f.fileno()).st_size
+                if size > PARTIAL_BLOCK:
+                    f.seek(max(PARTIAL_BLOCK, size - PARTIAL_BLOCK))
+                    digest.update(f.read(PARTIAL_BLOCK))
+            return digest.hexdigest()
+        except OSError as e:
+            logger.warning(f"Arquivo ignorado na busca de duplicatas {path}: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _full_hash(path: str, token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Hash do conteúdo completo lido por mmap (sem cópias para buffers do Python)"""
+        digest = hashlib.blake2b(digest_size=32)
+        try:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    for offset in range(0, len(view), HASH_CHUNK):
+                        if token is not None and token.cancelled:
+                            return None
+                        digest.update(view[offset:offset + HASH_CHUNK])
+            return digest.hexdigest()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Arquivo ignorado na busca de duplicatas {path}: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _report(groups: List[List[Candidate]], token: Optional[CancellationToken]) -> Dict:
+        """Grupos ordenados (original primeiro) e espaço ocupado pelas cópias"""
+        report_groups = []
+        wasted_bytes = 0
+        
+        for members in groups:
+            members.sort(key=lambda candidate: (candidate[2], candidate[0]))
+            size = members[0][1]
+            wasted_bytes += size * (len(members) - 1)
+            report_groups.append({
+                "size_bytes": size,
+                "original": members[0][0],
+                "duplicates": [path for path, _, _ in members[1:]]
+            })
+        
+        report_groups.sort(key=lambda group: group["size_bytes"] * len(group["duplicates"]), reverse=True)
+        
+        return {
+            "groups": report_groups,
+            "duplicate_files": sum(len(group["duplicates"]) for group in report_groups),
+            "wasted_mb": wasted_bytes / BYTES_PER_MB,
+            "partial": bool(token is not None and token.cancelled)
+        }
+
+# Instância global do detector de duplicatas
+duplicate_finder = DuplicateFinder()
\ No newline at end of file
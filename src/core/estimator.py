@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Estimativa rápida por amostragem do conteúdo de pastas grandes
+"""
+
+import os
+import math
+import time
+import random
+from collections import ChainMap
+from typing import List, Dict, Optional, Callable, Tuple
+
+from ..utils.logger import logger
+from ..utils.validator import file_validator
+from ..utils.walker import is_hidden_dir
+from .filters import filter_manager
+from .file_table import BYTES_PER_MB
+
+# Quantil da normal para intervalos de 95% de confiança
+Z_95 = 1.96
+
+# Limite de sondagens por estimativa (o orçamento de tempo costuma encerrar antes)
+MAX_PROBES = 20000
+
+# (nomes de arquivos, subpastas) de uma pasta
+Listing = Tuple[List[str], List[str]]
+
+# (tamanho em bytes, categoria, pasta destino) de um arquivo amostrado; None se filtrado/inacessível
+Sample = Optional[Tuple[int, str, str]]
+
+class FolderEstimator:
+    """Estimador de Knuth: sondagens aleatórias raiz-folha ponderadas pelo fator de ramificação"""
+    
+    def __init__(self, files_per_dir: int = 8):
+        # Arquivos amostrados (com stat) em cada pasta visitada por uma sondagem
+        self.files_per_dir = files_per_dir
+    
+    def estimate(self, folder_path: str, classify: Callable[[str], str],
+                 dest_folder_name: Callable[[str, str, float, int], str], recursive: bool = False,
+                 max_depth: Optional[int] = None, time_budget: float = 0.2,
+                 seed: Optional[int] = None, include_hidden: bool = False) -> Dict:
+        """Estima contagem, tamanho por categoria e pastas destino dentro do orçamento de tempo"""
+        # Cada sondagem desce da raiz escolhendo uma subpasta ao acaso; multiplicar o que se vê em
+        # cada nível pelo produto dos fatores de ramificação dá uma estimativa não enviesada do total.
+        # A média das sondagens converge e a variância entre elas dá os limites de confiança
+        start = time.monotonic()
+        deadline = start + time_budget
+        rng = random.Random(seed)
+        listings: Dict[str, Listing] = {}
+        samples: Dict[str, Sample] = {}
+        probes: List[Dict[Tuple[str, str], float]] = []
+        exact = False
+        
+        while len(probes) < MAX_PROBES:
+            probe = self._probe(folder_path, rng, recursive, max_depth, classify, dest_folder_name,
+                                listings, samples, deadline if probes else None, include_hidden)
+            if probe is None:
+                # Sondagem interrompida pelo prazo: descartada para não enviesar a média
+                break
+            probes.append(probe)
+            if time.monotonic() >= deadline:
+                break
+            
+            exact = not recursive and len(samples) == len(listings[folder_path][0])
+            if exact:
+                # Pasta inteira já amostrada: novas sondagens repetiriam o mesmo resultado
+                break
+        
+        probe_count = len(probes)
+        if exact:
+            # Com todos os arquivos em mãos o total é a soma real (peso 1), não a média das sondagens
+            totals: Dict[Tuple[str, str], float] = {}
+            for sample in samples.values():
+                if sample is not None:
+                    self._accumulate(totals, sample, 1.0)
+            probes = [totals]
+        
+        elapsed = time.monotonic() - start
+        result = self._summarize(probes, exact)
+        result.update({
+            "success": True,
+            "estimated": not exact,
+            "probes": probe_count,
+            "listed_dirs": len(listings),
+            "sampled_files": len(samples),
+            "elapsed_seconds": round(elapsed, 4)
+        })
+        
+        logger.debug(f"Estimativa de {folder_path}: {probe_count} sondagens, {len(listings)} pastas "
+                     f"listadas, {len(samples)} arquivos amostrados em {elapsed:.3f}s")
+        return result
+    
+    def _probe(self, folder_path: str, rng: random.Random, recursive: bool, max_depth: Optional[int],
+               classify: Callable[[str], str], dest_folder_name: Callable[[str, str, float, int], str],
+               listings: Dict[str, Listing], samples: Dict[str, Sample],
+               deadline: Optional[float], include_hidden: bool = False) -> Optional[Dict[Tuple[str, str], float]]:
+        """Uma sondagem raiz-folha; retorna as estimativas (chave -> valor) ou None se expirou"""
+        totals: Dict[Tuple[str, str], float] = {}
+        weight = 1.0
+        dir_path = folder_path
+        depth = 0
+        
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            
+            listing = listings.get(dir_path)
+            if listing is None:
+                listing = listings[dir_path] = self._list(dir_path, include_hidden)
+            files, subdirs = listing
+            
+            if files:
+                chosen = files if len(files) <= self.files_per_dir else rng.sample(files, self.files_per_dir)
+                # Cada arquivo amostrado representa len(files) / len(chosen) arquivos da pasta
+                scale = weight * len(files) / len(chosen)
+                
+                for name in chosen:
+                    path = os.path.join(dir_path, name)
+                    if path not in samples:
+                        samples[path] = self._sample(path, name, classify, dest_folder_name)
+                    if samples[path] is not None:
+                        self._accumulate(totals, samples[path], scale)
+            
+            if not recursive or not subdirs or (max_depth is not None and depth >= max_depth):
+                return totals
+            
+            weight *= len(subdirs)
+            dir_path = rng.choice(subdirs)
+            depth += 1
+    
+    @staticmethod
+    def _accumulate(totals: Dict[Tuple[str, str], float], sample: Tuple[int, str, str], scale: float):
+        """Soma um arquivo amostrado, representando scale arquivos, às grandezas da sondagem"""
+        size, category, dest_folder = sample
+        size_mb = size / BYTES_PER_MB * scale
+        for key, value in ((("total", "files"), scale), (("total", "size_mb"), size_mb),
+                           (("count", category), scale), (("size_mb", category), size_mb),
+                           (("destination", dest_folder), scale)):
+            totals[key] = totals.get(key, 0.0) + value
+    
+    @staticmethod
+    def _list(dir_path: str, include_hidden: bool = False) -> Listing:
+        """Lista uma pasta separando arquivos e subpastas (sem seguir links de pastas)"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Mesmas pastas que a varredura percorre: ocultas só com show_hidden_files
+                            if include_hidden or not is_hidden_dir(entry.path):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Pasta ignorada na estimativa {dir_path}: {str(e)}")
+        return files, subdirs
+    
+    @staticmethod
+    def _sample(path: str, name: str, classify: Callable[[str], str],
+                dest_folder_name: Callable[[str, str, float, int], str]) -> Sample:
+        """Stat, categoria e filtros de um arquivo amostrado"""
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            return None
+        
+        category = classify(name)
+        if filter_manager.filters:
+            file_info = ChainMap({"category": category},
+                                 file_validator.build_file_info(path, name, stat_info))
+            if not filter_manager.passes(file_info):
+                return None
+        
+        return stat_info.st_size, category, dest_folder_name(name, category, stat_info.st_mtime, stat_info.st_size)
+    
+    @staticmethod
+    def _summarize(probes: List[Dict[Tuple[str, str], float]], exact: bool = False) -> Dict:
+        """Média das sondagens com intervalo de 95% de confiança para cada grandeza"""
+        count = len(probes)
+        keys = set()
+        for probe in probes:
+            keys.update(probe)
+        
+        def interval(key: Tuple[str, str]) -> Dict:
+            values = [probe.get(key, 0.0) for probe in probes]
+            mean = sum(values) / count
+            if exact:
+                margin = 0.0
+            elif count > 1:
+                variance = sum((value - mean) ** 2 for value in values) / (count - 1)
+                margin = Z_95 * math.sqrt(variance / count)
+            else:
+                # Uma única sondagem não permite estimar a variância
+                margin = float('inf') if mean else 0.0
+            return {"estimate": mean, "low": max(0.0, mean - margin), "high": mean + margin}
+        
+        if not count:
+            empty = {"estimate": 0.0, "low": 0.0, "high": 0.0}
+            return {"stats": {"total_files": empty, "total_size_mb": empty,
+                              "categories_stats": {}, "destinations": {}}}
+        
+        categories_stats = {
+            category: {"count": interval(("count", category)), "size_mb": interval(("size_mb", category))}
+            for kind, category in sorted(keys) if kind == "count"
+        }
+        destinations = {folder: interval(("destination", folder))
+                        for kind, folder in sorted(keys) if kind == "destination"}
+        
+        return {
+            "stats": {
+                "total_files": interval(("total", "files")),
+                "total_size_mb": interval(("total", "size_mb")),
+                "categories_count": len(categories_stats),
+                "categories_stats": categories_stats,
+                "destinations": destinations
+            }
+        }
+
+# Instância global do estimador
+folder_estimator = FolderEstimator()
\ No newline at end of file
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Execução paralela das movimentações do plano, limitada por dispositivo
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional, Callable, Iterable, Sequence, Deque, Tuple, Any, Union
+
+from ..utils.logger import logger
+
+# Arquivos de uma mesma pasta destino executados por tarefa do pool
+MOVE_CHUNK = 64
+
+# (posição no plano, pasta destino ou None se nada será criado no destino)
+MoveTask = Tuple[int, Optional[str]]
+
+# (posição, valor retornado pela operação, exceção)
+MoveOutcome = Tuple[int, Any, Optional[Exception]]
+
+class OrderedResults:
+    """Entrega os resultados na ordem das posições, mesmo que terminem fora de ordem"""
+    
+    def __init__(self, positions: Sequence[int], on_result: Callable[[int, Any, Optional[Exception]], None]):
+        self.positions = positions
+        self.on_result = on_result
+        self.executed = 0
+        self._next = 0
+        self._pending: Dict[int, Tuple[Any, Optional[Exception]]] = {}
+    
+    def add(self, position: int, value: Any, error: Optional[Exception] = None):
+        self.executed += 1
+        self._pending[position] = (value, error)
+        while self._next < len(self.positions) and self.positions[self._next] in self._pending:
+            position = self.positions[self._next]
+            self._next += 1
+            self.on_result(position, *self._pending.pop(position))
+    
+    def finish(self):
+        """Entrega o que ficou retido atrás de posições não executadas (cancelamento)"""
+        for position in sorted(self._pending):
+            self.on_result(position, *self._pending[position])
+        self._pending.clear()
+        self._next = len(self.positions)
+
+class MoveExecutor:
+    """Cria as pastas destino de uma vez e executa as movimentações em lotes por pasta em um pool de threads"""
+    
+    def __init__(self, workers: int = 8, per_device: int = 4, chunk_size: int = MOVE_CHUNK):
+        self.workers = workers
+        # Operações de metadados simultâneas em um mesmo dispositivo
+        self.per_device = per_device
+        self.chunk_size = chunk_size
+    
+    def run(self, tasks: Sequence[MoveTask], operation: Callable[[int], Any],
+            on_result: Callable[[int, Any, Optional[Exception]], None],
+            cancelled: Callable[[], bool] = lambda: False) -> int:
+        """Executa operation(posição) para cada tarefa; on_result recebe os resultados em ordem de posição"""
+        # Dependências entre tarefas (ex.: hardlinks que esperam o novo local do original) ficam a
+        # cargo do chamador, que as executa em uma chamada posterior
+        results = OrderedResults(sorted(position for position, _ in tasks), on_result)
+        devices = self._prepare_directories({dest_dir for _, dest_dir in tasks if dest_dir})
+        
+        queues = self._queues(tasks, devices, results)
+        if self.workers <= 1:
+            for queue in queues.values():
+                for chunk in queue:
+                    for outcome in self._run_chunk(chunk, operation, cancelled):
+                        results.add(*outcome)
+        elif queues:
+            self._run_pool(queues, operation, cancelled, results)
+        
+        results.finish()
+        return results.executed
+    
+    @staticmethod
+    def _prepare_directories(directories: Iterable[str]) -> Dict[str, Union[int, OSError]]:
+        """Cria as pastas destino em uma única passada; pasta -> dispositivo (st_dev) ou o erro"""
+        devices: Dict[str, Union[int, OSError]] = {}
+        for dest_dir in sorted(directories):
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+                devices[dest_dir] = os.stat(dest_dir).st_dev
+            except OSError as e:
+                logger.error(f"Erro ao criar pasta destino {dest_dir}", e)
+                devices[dest_dir] = e
+        return devices
+    
+    def _queues(self, tasks: Sequence[MoveTask], devices: Dict[str, Union[int, OSError]],
+                results: OrderedResults) -> Dict[Optional[int], Deque[List[int]]]:
+        """Lotes por pasta destino, enfileirados por dispositivo na ordem da primeira posição"""
+        by_dir: Dict[Optional[str], List[int]] = {}
+        for position, dest_dir in tasks:
+            device = devices.get(dest_dir) if dest_dir else None
+            if isinstance(device, OSError):
+                # Pasta não pôde ser criada: cada arquivo dela registra o erro
+                results.add(position, None, device)
+                continue
+            by_dir.setdefault(dest_dir, []).append(position)
+        
+        chunks: List[Tuple[Optional[int], List[int]]] = []
+        for dest_dir, positions in by_dir.items():
+            device = devices.get(dest_dir) if dest_dir else None
+            chunks.extend((device, positions[start:start + self.chunk_size])
+                          for start in range(0, len(positions), self.chunk_size))
+        chunks.sort(key=lambda chunk: chunk[1][0])
+        
+        queues: Dict[Optional[int], Deque[List[int]]] = {}
+        for device, chunk in chunks:
+            queues.setdefault(device, deque()).append(chunk)
+        return queues
+    
+    @staticmethod
+    def _run_chunk(positions: List[int], operation: Callable[[int], Any],
+                   cancelled: Callable[[], bool]) -> List[MoveOutcome]:
+        """Executa um lote em sequência, parando no cancelamento"""
+        outcomes = []
+        for position in positions:
+            if cancelled():
+                break
+            try:
+                outcomes.append((position, operation(position), None))
+            except Exception as e:
+                outcomes.append((position, None, e))
+        return outcomes
+    
+    def _run_pool(self, queues: Dict[Optional[int], Deque[List[int]]], operation: Callable[[int], Any],
+                  cancelled: Callable[[], bool], results: OrderedResults):
+        """Distribui os lotes entre as threads respeitando o limite por dispositivo"""
+        running: Dict[Future, Optional[int]] = {}
+        active = {device: 0 for device in queues}
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="move") as pool:
+            while running or (any(queues.values()) and not cancelled()):
+                # Rodízio entre dispositivos para que um disco lento não atrase os demais
+                submitted = True
+                while submitted and len(running) < self.workers and not cancelled():
+                    submitted = False
+                    for device, queue in queues.items():
+                        if queue and active[device] < self.per_device and len(running) < self.workers:
+                            future = pool.submit(self._run_chunk, queue.popleft(), operation, cancelled)
+                            running[future] = device
+                            active[device] += 1
+                            submitted = True
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    active[running.pop(future)] -= 1
+                    for outcome in future.result():
+                        results.add(*outcome)
+
+# Instância global do executor de movimentações
+move_executor = MoveExecutor()
\ No newline at end of file
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Tabela colunar de arquivos para análises com milhões de entradas
+"""
+
+import os
+import stat
+import sys
+import mimetypes
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Any
+
+from ..utils.validator import file_suffix, is_hidden_file
+
+# Bits da coluna de flags
+FLAG_HIDDEN = 1
+FLAG_READONLY = 2
+
+BYTES_PER_MB = 1024 * 1024
+
+# Bytes por linha fora das colunas: ponteiro na lista de nomes e cabeçalho do objeto str
+NAME_OVERHEAD_BYTES = sys.getsizeof("") + 8
+
+# Campos sempre armazenados (tamanho, extensão, mtime e categoria são usados em toda análise)
+CORE_FIELDS = frozenset({"name", "path", "size_bytes", "size_mb", "extension", "modified", "category"})
+
+# Campos opcionais e a coluna que os armazena; sem a coluna, são obtidos com um novo stat
+OPTIONAL_FIELDS = {
+    "created": "ctimes",
+    "accessed": "atimes",
+    "permissions": "modes",
+    "is_hidden": "flags",
+    "is_readonly": "flags",
+}
+
+class StringPool:
+    """Tabela de strings internadas indexadas por código inteiro"""
+    
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+    
+    def code(self, value: str) -> int:
+        """Retorna o código da string, registrando-a se for nova"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+    
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+    
+    def __len__(self) -> int:
+        return len(self.values)
+
+class FileTable:
+    """Tabela colunar (array) de arquivos com pastas, extensões e categorias internadas"""
+    
+    def __init__(self, fields: Optional[Iterable[str]] = None):
+        self.dirs = StringPool()
+        self.extensions = StringPool()
+        self.categories = StringPool()
+        
+        self.dir_ids = array('I')
+        self.names: List[str] = []
+        self.ext_codes = array('I')
+        self.category_codes = array('I')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.ctimes = array('d')
+        self.atimes = array('d')
+        self.modes = array('I')
+        self.flags = array('B')
+        
+        # Colunas opcionais preenchidas; None declara que todos os campos serão lidos
+        self.columns = self.columns_for(fields)
+        
+        # Tipo MIME depende apenas das extensões: calculado sob demanda e memorizado
+        self._mime_cache: Dict[str, Optional[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    @staticmethod
+    def columns_for(fields: Optional[Iterable[str]]) -> Set[str]:
+        """Colunas opcionais necessárias para os campos declarados"""
+        if fields is None:
+            return set(OPTIONAL_FIELDS.values())
+        return {OPTIONAL_FIELDS[field] for field in fields if field in OPTIONAL_FIELDS}
+    
+    def estimate_bytes(self, rows: range) -> int:
+        """Memória aproximada ocupada pelas linhas (colunas preenchidas e nomes)"""
+        per_row = NAME_OVERHEAD_BYTES + sum(
+            column.itemsize for column in (self.dir_ids, self.ext_codes, self.category_codes, self.sizes, self.mtimes)
+        )
+        per_row += sum(getattr(self, column).itemsize for column in self.columns)
+        return len(rows) * per_row + sum(len(name) for name in self.names[rows.start:rows.stop])
+    
+    def reset(self):
+        """Descarta todas as linhas (após serem gravadas em disco), mantendo as colunas declaradas"""
+        self.dirs = StringPool()
+        self.extensions = StringPool()
+        self.categories = StringPool()
+        for column in ("dir_ids", "ext_codes", "category_codes", "sizes", "mtimes",
+                       "ctimes", "atimes", "modes", "flags"):
+            setattr(self, column, array(getattr(self, column).typecode))
+        self.names = []
+    
+    def append(self, dir_path: str, name: str, stat_info: os.stat_result, category: str) -> int:
+        """Adiciona um arquivo a partir do seu stat e retorna o índice da linha"""
+        self.dir_ids.append(self.dirs.code(dir_path))
+        self.names.append(name)
+        self.ext_codes.append(self.extensions.code(file_suffix(name).lower()))
+        self.category_codes.append(self.categories.code(category))
+        self.sizes.append(stat_info.st_size)
+        self.mtimes.append(stat_info.st_mtime)
+        
+        columns = self.columns
+        if columns:
+            if "ctimes" in columns:
+                self.ctimes.append(stat_info.st_ctime)
+            if "atimes" in columns:
+                self.atimes.append(stat_info.st_atime)
+            if "modes" in columns:
+                self.modes.append(stat_info.st_mode)
+            if "flags" in columns:
+                self.flags.append(self._flags(name, stat_info))
+        
+        return len(self.names) - 1
+    
+    @staticmethod
+    def _flags(name: str, stat_info: os.stat_result) -> int:
+        is_readonly = not bool(stat_info.st_mode & stat.S_IWRITE)
+        return (FLAG_HIDDEN if is_hidden_file(name, stat_info) else 0) | (FLAG_READONLY if is_readonly else 0)
+    
+    # Acessores por linha
+    def path(self, index: int) -> str:
+        return os.path.join(self.dirs[self.dir_ids[index]], self.names[index])
+    
+    def dir_path(self, index: int) -> str:
+        return self.dirs[self.dir_ids[index]]
+    
+    def extension(self, index: int) -> str:
+        return self.extensions[self.ext_codes[index]]
+    
+    def category(self, index: int) -> str:
+        return self.categories[self.category_codes[index]]
+    
+    def _restat(self, index: int) -> Optional[os.stat_result]:
+        """Stat sob demanda para campos cuja coluna não foi declarada"""
+        try:
+            return os.stat(self.path(index))
+        except OSError:
+            return None
+    
+    def created(self, index: int) -> Optional[float]:
+        if "ctimes" in self.columns:
+            return self.ctimes[index]
+        stat_info = self._restat(index)
+        return stat_info.st_ctime if stat_info else None
+    
+    def accessed(self, index: int) -> Optional[float]:
+        if "atimes" in self.columns:
+            return self.atimes[index]
+        stat_info = self._restat(index)
+        return stat_info.st_atime if stat_info else None
+    
+    def mode(self, index: int) -> Optional[int]:
+        if "modes" in self.columns:
+            return self.modes[index]
+        stat_info = self._restat(index)
+        return stat_info.st_mode if stat_info else None
+    
+    def permissions(self, index: int) -> Optional[str]:
+        mode = self.mode(index)
+        return oct(mode)[-3:] if mode is not None else None
+    
+    def flag(self, index: int, flag: int) -> Optional[bool]:
+        if "flags" in self.columns:
+            return bool(self.flags[index] & flag)
+        stat_info = self._restat(index)
+        return bool(self._flags(self.names[index], stat_info) & flag) if stat_info else None
+    
+    def mime_type(self, index: int) -> Optional[str]:
+        name = self.names[index]
+        # Chave com as duas últimas extensões (ex.: ".tar.gz" tem tipo e codificação próprios)
+        last = name.rfind('.')
+        previous = name.rfind('.', 0, last) if last > 0 else -1
+        key = name[previous if previous > 0 else last:].lower() if last > 0 else ""
+        if key not in self._mime_cache:
+            self._mime_cache[key] = mimetypes.guess_type("arquivo" + key)[0] if key else None
+        return self._mime_cache[key]
+    
+    def row(self, index: int) -> "FileRow":
+        """Visão tipo dicionário de uma linha (campos calculados sob demanda)"""
+        return FileRow(self, index)
+    
+    def rows(self, indices: Optional[Iterable[int]] = None) -> "FileRowList":
+        """Sequência preguiçosa de linhas para os índices informados"""
+        if indices is None:
+            indices = range(len(self))
+        return FileRowList(self, indices)
+    
+    def to_dicts(self, indices: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Materializa as linhas como dicionários (para exportação)"""
+        return [row.to_dict() for row in self.rows(indices)]
+
+class FileRow(Mapping):
+    """Visão somente leitura de uma linha da FileTable com as chaves de get_file_info"""
+    
+    __slots__ = ("table", "index")
+    
+    _FIELDS = {
+        "name": lambda t, i: t.names[i],
+        "path": lambda t, i: t.path(i),
+        "size_bytes": lambda t, i: t.sizes[i],
+        "size_mb": lambda t, i: t.sizes[i] / BYTES_PER_MB,
+        "extension": lambda t, i: t.extension(i),
+        "mime_type": lambda t, i: t.mime_type(i),
+        "created": lambda t, i: t.created(i),
+        "modified": lambda t, i: t.mtimes[i],
+        "accessed": lambda t, i: t.accessed(i),
+        "is_hidden": lambda t, i: t.flag(i, FLAG_HIDDEN),
+        "is_readonly": lambda t, i: t.flag(i, FLAG_READONLY),
+        "permissions": lambda t, i: t.permissions(i),
+        "category": lambda t, i: t.category(i),
+    }
+    
+    def __init__(self, table: FileTable, index: int):
+        self.table = table
+        self.index = index
+    
+    def __getitem__(self, key: str) -> Any:
+        getter = self._FIELDS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self.table, self.index)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+    
+    def __repr__(self) -> str:
+        return f"FileRow({self.table.path(self.index)!r})"
+    
+    def to_dict(self) -> Dict:
+        return {key: getter(self.table, self.index) for key, getter in self._FIELDS.items()}
+
+class FileRowList(Sequence):
+    """Lista preguiçosa de linhas da FileTable (guarda apenas os índices)"""
+    
+    def __init__(self, table: FileTable, indices: Iterable[int]):
+        self.table = table
+        self.indices = indices if isinstance(indices, (range, array)) else array('I', indices)
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return FileRowList(self.table, self.indices[position])
+        return FileRow(self.table, self.indices[position])
+    
+    def __len__(self) -> int:
+        return len(self.indices)
+    
+    def total_size_bytes(self) -> int:
+        sizes = self.table.sizes
+        return sum(sizes[i] for i in self.indices)
+    
+    def largest(self) -> Optional[FileRow]:
+        if not len(self.indices):
+            return None
+        sizes = self.table.sizes
+        return FileRow(self.table, max(self.indices, key=sizes.__getitem__))
+    
+    def smallest(self) -> Optional[FileRow]:
+        if not len(self.indices):
+            return None
+        sizes = self.table.sizes
+        return FileRow(self.table, min(self.indices, key=sizes.__getitem__))
+    
+    def to_dicts(self) -> List[Dict]:
+        return self.table.to_dicts(self.indices)
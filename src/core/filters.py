@@ -6,14 +6,18 @@ Sistema de filtros avançados para o Organizador de Arquivos
 import re
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Callable, Optional, Iterable
 import fnmatch
 
 from ..utils.logger import logger
+from .file_table import FileTable, FLAG_HIDDEN, FLAG_READONLY, BYTES_PER_MB
 
 class FileFilter:
     """Classe base para filtros de arquivo"""
     
+    # Campos de file_info lidos pelo filtro (None: desconhecidos, todos são carregados)
+    fields: Optional[frozenset] = None
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -21,10 +25,16 @@ class FileFilter:
     def apply(self, file_info: Dict) -> bool:
         """Aplica o filtro ao arquivo. Retorna True se o arquivo passa no filtro"""
         raise NotImplementedError
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        """Aplica o filtro às linhas da tabela colunar. Retorna os índices que passam"""
+        return [i for i in indices if self.apply(table.row(i))]
 
 class SizeFilter(FileFilter):
     """Filtro por tamanho de arquivo"""
     
+    fields = frozenset({"size_mb"})
+    
     def __init__(self, min_size_mb: float = 0, max_size_mb: float = float('inf')):
         super().__init__(
             f"Tamanho ({min_size_mb}MB - {max_size_mb}MB)",
@@ -36,10 +46,18 @@ class SizeFilter(FileFilter):
     def apply(self, file_info: Dict) -> bool:
         size_mb = file_info.get("size_mb", 0)
         return self.min_size_mb <= size_mb <= self.max_size_mb
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        min_bytes = self.min_size_mb * BYTES_PER_MB
+        max_bytes = self.max_size_mb * BYTES_PER_MB
+        sizes = table.sizes
+        return [i for i in indices if min_bytes <= sizes[i] <= max_bytes]
 
 class DateFilter(FileFilter):
     """Filtro por data de modificação"""
     
+    fields = frozenset({"modified"})
+    
     def __init__(self, days_ago: int = None, start_date: datetime = None, end_date: datetime = None):
         if days_ago is not None:
             self.start_date = datetime.now() - timedelta(days=days_ago)
@@ -62,10 +80,18 @@ class DateFilter(FileFilter):
             return False
         
         return True
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        start = self.start_date.timestamp() if self.start_date else float('-inf')
+        end = self.end_date.timestamp() if self.end_date else float('inf')
+        mtimes = table.mtimes
+        return [i for i in indices if start <= mtimes[i] <= end]
 
 class ExtensionFilter(FileFilter):
     """Filtro por extensão de arquivo"""
     
+    fields = frozenset({"extension"})
+    
     def __init__(self, extensions: List[str], include: bool = True):
         self.extensions = [ext.lower() if ext.startswith('.') else f'.{ext.lower()}' for ext in extensions]
         self.include = include
@@ -80,10 +106,20 @@ class ExtensionFilter(FileFilter):
         extension = file_info.get("extension", "").lower()
         has_extension = extension in self.extensions
         return has_extension if self.include else not has_extension
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        # Comparar códigos internados em vez de strings
+        codes = {code for ext, code in table.extensions.codes.items() if ext in self.extensions}
+        ext_codes = table.ext_codes
+        if self.include:
+            return [i for i in indices if ext_codes[i] in codes]
+        return [i for i in indices if ext_codes[i] not in codes]
 
 class NameFilter(FileFilter):
     """Filtro por nome de arquivo"""
     
+    fields = frozenset({"name"})
+    
     def __init__(self, pattern: str, use_regex: bool = False, case_sensitive: bool = False):
         self.pattern = pattern
         self.use_regex = use_regex
@@ -116,6 +152,8 @@ class NameFilter(FileFilter):
 class CategoryFilter(FileFilter):
     """Filtro por categoria de arquivo"""
     
+    fields = frozenset({"category"})
+    
     def __init__(self, categories: List[str], include: bool = True):
         self.categories = [cat.lower() for cat in categories]
         self.include = include
@@ -130,10 +168,19 @@ class CategoryFilter(FileFilter):
         category = file_info.get("category", "").lower()
         has_category = category in self.categories
         return has_category if self.include else not has_category
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        codes = {code for cat, code in table.categories.codes.items() if cat.lower() in self.categories}
+        category_codes = table.category_codes
+        if self.include:
+            return [i for i in indices if category_codes[i] in codes]
+        return [i for i in indices if category_codes[i] not in codes]
 
 class HiddenFileFilter(FileFilter):
     """Filtro para arquivos ocultos"""
     
+    fields = frozenset({"is_hidden"})
+    
     def __init__(self, include_hidden: bool = False):
         self.include_hidden = include_hidden
         
@@ -145,10 +192,20 @@ class HiddenFileFilter(FileFilter):
     def apply(self, file_info: Dict) -> bool:
         is_hidden = file_info.get("is_hidden", False)
         return not is_hidden or self.include_hidden
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        if self.include_hidden:
+            return list(indices)
+        if "flags" not in table.columns:
+            return super().apply_table(table, indices)
+        flags = table.flags
+        return [i for i in indices if not flags[i] & FLAG_HIDDEN]
 
 class ReadOnlyFilter(FileFilter):
     """Filtro para arquivos somente leitura"""
     
+    fields = frozenset({"is_readonly"})
+    
     def __init__(self, include_readonly: bool = True):
         self.include_readonly = include_readonly
         
@@ -160,6 +217,14 @@ class ReadOnlyFilter(FileFilter):
     def apply(self, file_info: Dict) -> bool:
         is_readonly = file_info.get("is_readonly", False)
         return not is_readonly or self.include_readonly
+    
+    def apply_table(self, table: FileTable, indices: Iterable[int]) -> List[int]:
+        if self.include_readonly:
+            return list(indices)
+        if "flags" not in table.columns:
+            return super().apply_table(table, indices)
+        flags = table.flags
+        return [i for i in indices if not flags[i] & FLAG_READONLY]
 
 class FilterManager:
     """Gerenciador de filtros"""
@@ -188,18 +253,30 @@ class FilterManager:
         if not self.filters:
             return files_info
         
-        filtered_files = []
-        
-        for file_info in files_info:
-            # Arquivo passa se atende a todos os filtros
-            passes_all_filters = all(filter_obj.apply(file_info) for filter_obj in self.filters)
-            
-            if passes_all_filters:
-                filtered_files.append(file_info)
+        filtered_files = [file_info for file_info in files_info if self.passes(file_info)]
         
         logger.info(f"Filtros aplicados: {len(files_info)} -> {len(filtered_files)} arquivos")
         return filtered_files
     
+    def passes(self, file_info: Dict) -> bool:
+        """Verifica se um arquivo atende a todos os filtros ativos"""
+        return all(filter_obj.apply(file_info) for filter_obj in self.filters)
+    
+    def select(self, table: FileTable, indices: Iterable[int]) -> Iterable[int]:
+        """Aplica os filtros ativos coluna a coluna, estreitando os índices a cada filtro"""
+        for filter_obj in self.filters:
+            indices = filter_obj.apply_table(table, indices)
+        return indices
+    
+    def required_fields(self) -> Optional[set]:
+        """Campos de file_info lidos pelos filtros ativos (None se algum filtro não os declara)"""
+        fields = set()
+        for filter_obj in self.filters:
+            if filter_obj.fields is None:
+                return None
+            fields.update(filter_obj.fields)
+        return fields
+    
     def get_filter_summary(self) -> Dict:
         """Retorna resumo dos filtros ativos"""
         return {
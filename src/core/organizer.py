@@ -3,28 +3,72 @@
 Organizador principal melhorado com funcionalidades avançadas
 """
 
-import shutil
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Callable, Any
+from array import array
+from typing import List, Dict, Optional, Callable, Any, Iterator, Iterable, Sequence, Mapping, Tuple, Union
 import threading
 import time
+from functools import partial
+from itertools import repeat, islice
 
 from ..utils.logger import logger
 from ..utils.backup import backup_manager
-from ..utils.validator import file_validator, operation_validator
+from ..utils.validator import file_validator, operation_validator, file_suffix
+from ..utils.metadata_index import MetadataIndex, metadata_index
+from ..utils.cancellation import CancellationToken
+from ..utils.events import EventBus, EventBatch
+from ..utils.fsops import move_file, LINKED, COPIED
 from .filters import filter_manager
-from ..config.settings import config, FILE_CATEGORIES
+from .scanner import file_scanner
+from .file_table import FileTable, FileRow, FileRowList, BYTES_PER_MB
+from .plan import OrganizationPlan, PlanView, DestinationNames, CompactRecord, build_compact
+from .spill import SpillStore, SpilledPlan, SpilledRows
+from .snapshot import scan_snapshots
+from .categories import category_classifier
+from .sniffer import content_sniffer
+from .estimator import folder_estimator
+from .duplicates import duplicate_finder, DUPLICATE_ACTIONS
+from .similar_images import similar_image_finder
+from .rules import RuleEngine, compile_rule
+from .executor import move_executor
+from .templates import PathTemplate, template_for_mode
+from ..config.settings import config
 
 class AdvancedOrganizer:
     """Organizador avançado de arquivos com funcionalidades melhoradas"""
     
+    # Tempo máximo (s) que um lote parcial espera antes de ser entregue no modo em fluxo
+    BATCH_MAX_DELAY = 0.25
+    
+    # Campos de file_info lidos pela geração de sugestões e pelas estatísticas
+    REQUIRED_FIELDS = frozenset({"name", "size_mb", "extension", "modified", "category"})
+    
+    # Linhas filtradas/planejadas entre verificações de cancelamento
+    CANCEL_CHUNK = 2048
+    
+    # Novos nomes tentados quando o destino aparece ocupado na hora de mover
+    MAX_COLLISION_RETRIES = 100
+    
     def __init__(self):
         self.is_running = False
+        # Uma organização por vez: adquirido sem esperar, para que duas threads não entrem juntas
+        self._execution_lock = threading.Lock()
         self.current_operation = None
         self.progress_callback: Optional[Callable] = None
         self.log_callback: Optional[Callable] = None
         self.cancel_requested = False
+        # Token da análise em andamento (cancelado por cancel_operation)
+        self.analysis_token: Optional[CancellationToken] = None
+        
+        # Progresso e logs passam pelo barramento: o worker só registra, a entrega é agrupada
+        self.events = EventBus(config.get("progress_rate_hz", 20))
+        self._callbacks_subscribed = False
+        
+        # Regras personalizadas: funções ficam só em memória; o motor é recompilado quando mudam
+        self._rule_functions: Dict[str, Callable[[Mapping], Optional[str]]] = {}
+        self._rule_engine: Optional[RuleEngine] = None
         
         # Estatísticas da operação atual
         self.stats = {
@@ -32,18 +76,34 @@ class AdvancedOrganizer:
             "processed_files": 0,
             "moved_files": 0,
             "skipped_files": 0,
+            "copied_files": 0,
             "errors": 0,
             "start_time": None,
             "end_time": None
         }
     
     def set_progress_callback(self, callback: Callable[[int, int, str], None]):
-        """Define callback para atualização de progresso"""
+        """Define callback para atualização de progresso (chamado na thread do barramento)"""
         self.progress_callback = callback
+        self._subscribe_callbacks()
     
     def set_log_callback(self, callback: Callable[[str], None]):
-        """Define callback para logs"""
+        """Define callback para logs (chamado na thread do barramento)"""
         self.log_callback = callback
+        self._subscribe_callbacks()
+    
+    def _subscribe_callbacks(self):
+        if not self._callbacks_subscribed:
+            self._callbacks_subscribed = True
+            self.events.subscribe(self._deliver_callbacks)
+    
+    def _deliver_callbacks(self, batch: EventBatch):
+        """Repassa um lote do barramento aos callbacks no formato antigo"""
+        if self.log_callback:
+            for message, _ in batch.logs:
+                self.log_callback(message)
+        if self.progress_callback and batch.progress:
+            self.progress_callback(*batch.progress)
     
     def _log(self, message: str, level: str = "info"):
         """Log interno com callback"""
@@ -54,160 +114,484 @@ class AdvancedOrganizer:
         elif level == "error":
             logger.error(message)
         
-        if self.log_callback:
-            self.log_callback(message)
+        self.events.log(message, level)
     
     def _update_progress(self, current: int, total: int, message: str = ""):
-        """Atualiza progresso com callback"""
-        if self.progress_callback:
-            self.progress_callback(current, total, message)
+        """Atualiza progresso (o barramento mantém só o mais recente até a próxima entrega)"""
+        self.events.progress(current, total, message)
     
-    def analyze_folder(self, folder_path: str, organization_mode: str = "por_tipo") -> Dict:
-        """Analisa pasta e retorna sugestões de organização"""
+    def analyze_folder(self, folder_path: str, organization_mode: str = "por_tipo",
+                       recursive: Optional[bool] = None, max_depth: Optional[int] = None,
+                       fields: Optional[Iterable[str]] = None, token: Optional[CancellationToken] = None,
+                       timeout: Optional[float] = None, find_duplicates: Optional[bool] = None,
+                       group_similar_images: Optional[bool] = None) -> Dict:
+        """Analisa pasta e retorna sugestões de organização (parciais se cancelada ou fora do prazo)"""
+        last_batch = None
+        
+        for batch in self.iter_analysis(folder_path, organization_mode, recursive, max_depth,
+                                        fields=fields, token=token, timeout=timeout,
+                                        find_duplicates=find_duplicates,
+                                        group_similar_images=group_similar_images):
+            if not batch["success"]:
+                return batch
+            
+            last_batch = batch
+        
+        if last_batch is None or last_batch["scanned_files"] == 0:
+            return {"success": True, "suggestions": [], "stats": {}, "duplicates": None, "similar_images": None,
+                    "partial": bool(last_batch and last_batch["partial"]),
+                    "cancel_reason": last_batch["cancel_reason"] if last_batch else None}
+        
+        return {
+            "success": True,
+            "suggestions": last_batch["plan"],
+            "stats": last_batch["stats"],
+            "files_info": last_batch["all_files_info"],
+            "table": last_batch["table"],
+            "duplicates": last_batch["duplicates"],
+            "similar_images": last_batch["similar_images"],
+            "partial": last_batch["partial"],
+            "cancel_reason": last_batch["cancel_reason"]
+        }
+    
+    def iter_analysis(self, folder_path: str, organization_mode: str = "por_tipo",
+                      recursive: Optional[bool] = None, max_depth: Optional[int] = None,
+                      batch_size: Optional[int] = None,
+                      fields: Optional[Iterable[str]] = None,
+                      token: Optional[CancellationToken] = None,
+                      timeout: Optional[float] = None,
+                      find_duplicates: Optional[bool] = None,
+                      group_similar_images: Optional[bool] = None) -> Iterator[Dict]:
+        """Analisa pasta em fluxo, produzindo lotes de sugestões e estatísticas parciais"""
+        # Cancelamento (token ou cancel_operation) e prazo interrompem scan, filtros e plano;
+        # o último lote sai com done=True e partial=True, com o que foi processado até ali
+        if token is None:
+            token = CancellationToken(timeout)
+        elif timeout is not None and token.deadline is None:
+            token.deadline = time.monotonic() + timeout
+        self.analysis_token = token
+        
         try:
-            self._log(f"🔍 Iniciando análise da pasta: {folder_path}")
+            if recursive is None:
+                recursive = config.get("recursive_scan", False)
+            if max_depth is None:
+                max_depth = config.get("scan_max_depth")
+            if batch_size is None:
+                batch_size = config.get("analysis_batch_size", 500)
+            if find_duplicates is None:
+                find_duplicates = config.get("detect_duplicates", False)
+            if group_similar_images is None:
+                group_similar_images = config.get("group_similar_images", False)
+            
+            # Regras recompiladas a cada análise (idades em dias são relativas ao momento atual)
+            self._rule_engine = None
+            
+            self._log(f"🔍 Iniciando análise da pasta: {folder_path}"
+                      f"{' (incluindo subpastas)' if recursive else ''}")
             
             # Validar pasta
             if not file_validator.validate_folder_access(folder_path):
                 validation_summary = file_validator.get_validation_summary()
                 self._log(f"❌ Erro na validação da pasta: {validation_summary['errors']}", "error")
-                return {"success": False, "errors": validation_summary["errors"]}
+                yield {"success": False, "errors": validation_summary["errors"]}
+                return
             
-            # Obter lista de arquivos
-            folder = Path(folder_path)
-            all_files = list(folder.glob('*'))
-            files = [f for f in all_files if f.is_file()]
+            # Caminho absoluto: o índice e as impressões digitais das pastas usam caminhos absolutos
+            folder_path = os.path.abspath(folder_path)
             
-            if not files:
-                self._log("⚠️ Nenhum arquivo encontrado na pasta", "warning")
-                return {"success": True, "suggestions": [], "stats": {}}
+            # Listar, coletar metadados e classificar em uma única passada (os.scandir),
+            # reaproveitando campos derivados do índice persistente quando nada mudou
+            index = metadata_index if config.get("use_metadata_index", True) else None
+            classify, refine = self._classifiers(index)
             
-            self._log(f"📊 Encontrados {len(files)} arquivos para análise")
+            # Outro modo ou outros filtros sobre a mesma pasta: a última varredura completa é
+            # reaproveitada enquanto nenhuma pasta da árvore mudar de mtime
+            include_hidden = config.get("show_hidden_files", False)
+            snapshot_key = (folder_path, recursive, max_depth if recursive else None, recursive and include_hidden,
+                            f"{category_classifier.index.signature}:{config.get('content_sniffing', 'unknown')}")
+            scan_snapshots.max_entries = config.get("scan_snapshot_entries", 2)
+            required_fields = self._required_fields(fields)
+            table = (scan_snapshots.get(snapshot_key, FileTable.columns_for(required_fields))
+                     if scan_snapshots.max_entries > 0 else None)
+            directories: Optional[Dict[str, int]] = None
             
-            # Obter informações detalhadas dos arquivos
-            files_info = []
-            for i, file_path in enumerate(files, 1):
-                self._update_progress(i, len(files), f"Analisando: {file_path.name}")
+            if table is not None:
+                self._log(f"♻️ Pasta inalterada: reaproveitando a varredura anterior ({len(table)} arquivos)")
+                spans = scan_snapshots.replay(table, token)
+            else:
+                # Arquivos ficam em uma tabela colunar; dicionários só existem como visões sob demanda
+                # Só os campos declarados (análise, filtros e os extras pedidos pelo chamador, como
+                # na exportação) viram colunas; os demais são obtidos sob demanda
+                table = FileTable(fields=required_fields)
+                directories = {}
+                scan_started_ns = time.time_ns()
                 
-                file_info = file_validator.get_file_info(str(file_path))
-                file_info["path"] = str(file_path)
-                file_info["category"] = self._get_file_category(file_path.suffix)
+                if recursive:
+                    spans = file_scanner.scan_tree(
+                        folder_path, table, classify, max_depth, config.get("scan_workers", 8), index,
+                        skip_unchanged=config.get("skip_unchanged_dirs", True), refine=refine, token=token,
+                        directories=directories, include_hidden=include_hidden, chunk_size=batch_size
+                    )
+                else:
+                    spans = file_scanner.scan(folder_path, table, classify, index, refine, token, directories,
+                                              chunk_size=batch_size)
+            
+            plan = OrganizationPlan(table)
+            
+            stats = self._new_stats()
+            total_suggestions = 0
+            batch_start = 0
+            last_yield = time.monotonic()
+            self.events.set_counter("scanned_files", 0)
+            self.events.set_counter("planned_files", 0)
+            
+            # Orçamento de memória: acima dele, arquivos selecionados e plano do segmento atual vão
+            # para um SQLite temporário e a tabela recomeça vazia. Lotes já entregues deixam então de
+            # ser válidos após o próximo lote; o plano combinado (result["plan"]) continua válido
+            # A tabela de um snapshot já está inteira na memória e é compartilhada: não é descartada
+            budget_mb = config.get("analysis_memory_budget_mb", 1024)
+            memory_budget = budget_mb * BYTES_PER_MB if budget_mb and directories is not None else None
+            store: Optional[SpillStore] = None
+            spilled_rows = 0
+            segment_selected = array('I')
+            segment_bytes = 0
+            # Fim das linhas já varridas (ou já entregues pelo snapshot) no segmento atual
+            scanned_end = 0
+            
+            for span in spans:
+                scanned_end = span.stop
+                scanned_files = spilled_rows + scanned_end
+                if span:
+                    self.events.increment("scanned_files", len(span))
+                    self._update_progress(scanned_files, 0, f"Analisando: {table.names[span[-1]]}")
                 
-                files_info.append(file_info)
+                # Entregar o lote quando encher ou quando o scan estiver lento
+                pending = scanned_end - batch_start
+                if pending and (pending >= batch_size or time.monotonic() - last_yield >= self.BATCH_MAX_DELAY):
+                    rows = range(batch_start, scanned_end)
+                    result = self._process_batch(table, rows, folder_path, organization_mode, stats, plan, token)
+                    total_suggestions += len(result["suggestions"])
+                    self.events.set_counter("planned_files", total_suggestions)
+                    batch_start = scanned_end
+                    last_yield = time.monotonic()
+                    
+                    segment_selected.extend(result["files_info"].indices)
+                    segment_bytes += table.estimate_bytes(rows) + plan.estimate_bytes(len(result["suggestions"]))
+                    result["scanned_files"] = scanned_files
+                    if store is not None:
+                        result["plan"] = SpilledPlan(store, plan)
+                    yield result
+                    
+                    # Nomes reservados nas pastas destino valem para todo o plano e contam no orçamento
+                    if memory_budget and segment_bytes + plan.names.estimate_bytes() > memory_budget:
+                        if store is None:
+                            store = SpillStore(config.get("spill_dir"))
+                            self._log(f"💾 Orçamento de memória ({budget_mb} MB) excedido: "
+                                      f"gravando a análise em disco")
+                        self._spill_segment(store, table, segment_selected, plan, stats)
+                        plan.names.spill(store)
+                        spilled_rows += len(table)
+                        table.reset()
+                        plan = OrganizationPlan(table, plan.names)
+                        segment_selected = array('I')
+                        segment_bytes = 0
+                        batch_start = 0
+                        scanned_end = 0
             
-            # Aplicar filtros se configurados
-            if filter_manager.filters:
-                files_info = filter_manager.apply_filters(files_info)
-                self._log(f"🔍 Filtros aplicados: {len(files_info)} arquivos selecionados")
+            scanned_files = spilled_rows + scanned_end
+            
+            if scanned_files == 0:
+                self._log("⚠️ Nenhum arquivo encontrado na pasta", "warning")
+            else:
+                self._log(f"📊 Encontrados {scanned_files} arquivos para análise")
             
-            # Gerar sugestões de organização
-            suggestions = self._generate_suggestions(files_info, folder_path, organization_mode)
+            result = self._process_batch(table, range(batch_start, scanned_end),
+                                         folder_path, organization_mode, stats, plan, token)
             
-            # Estatísticas
-            stats = self._calculate_stats(files_info, suggestions)
+            if scanned_files and filter_manager.filters:
+                self._log(f"🔍 Filtros aplicados: {stats['total_files']} arquivos selecionados")
+            result["done"] = True
+            result["scanned_files"] = scanned_files
+            total_suggestions += len(result["suggestions"])
             
-            self._log(f"✅ Análise concluída: {len(suggestions)} sugestões geradas")
+            # Todos os arquivos selecionados da análise (inclusive os já gravados em disco)
+            segment_selected.extend(result["files_info"].indices)
+            if store is not None:
+                result["plan"] = SpilledPlan(store, plan)
+                result["all_files_info"] = SpilledRows(store, table.rows(segment_selected))
+            else:
+                result["all_files_info"] = table.rows(segment_selected)
             
-            return {
-                "success": True,
-                "suggestions": suggestions,
-                "stats": stats,
-                "files_info": files_info
-            }
+            # Duplicatas por conteúdo entre os arquivos selecionados (lê os arquivos: opcional)
+            if find_duplicates and scanned_files and not token.cancelled:
+                result["duplicates"] = self.find_duplicates(result["all_files_info"], token)
+            
+            # Imagens quase idênticas (rajadas, cópias redimensionadas) vão juntas para uma subpasta
+            if group_similar_images and scanned_files and not token.cancelled:
+                result["similar_images"] = self.group_similar_images(result["plan"], token)
+            
+            self.events.set_counter("planned_files", total_suggestions)
+            self.events.flush()
+            
+            # Varredura completa e ainda inteira na memória: fica disponível para a próxima análise
+            if directories is not None and store is None and not token.cancelled:
+                scan_snapshots.put(snapshot_key, table, directories, scan_started_ns)
+            
+            if token.cancelled:
+                result["partial"] = True
+                result["cancel_reason"] = token.reason
+                reason = "prazo esgotado" if token.reason == "deadline" else "cancelada pelo usuário"
+                self._log(f"⏹️ Análise interrompida ({reason}): {total_suggestions} sugestões parciais", "warning")
+            elif scanned_files:
+                self._log(f"✅ Análise concluída: {total_suggestions} sugestões geradas")
+            
+            yield result
             
         except Exception as e:
             self._log(f"❌ Erro na análise: {str(e)}", "error")
             logger.error("Erro na análise da pasta", e)
-            return {"success": False, "error": str(e)}
+            yield {"success": False, "error": str(e)}
+        
+        finally:
+            if self.analysis_token is token:
+                self.analysis_token = None
     
-    def _get_file_category(self, extension: str) -> str:
-        """Determina categoria do arquivo baseada na extensão"""
-        extension = extension.lower()
-        
-        for category, info in FILE_CATEGORIES.items():
-            if extension in info["extensions"]:
-                return category
-        
-        return "Outros"
-    
-    def _generate_suggestions(self, files_info: List[Dict], base_folder: str, mode: str) -> List[Dict]:
-        """Gera sugestões de organização"""
-        suggestions = []
-        base_path = Path(base_folder)
-        
-        for file_info in files_info:
-            source_path = Path(file_info["path"])
-            
-            # Determinar pasta destino baseada no modo
-            if mode == "por_tipo":
-                category = file_info["category"]
-                dest_folder = base_path / category
-            elif mode == "por_data":
-                modified_date = datetime.fromtimestamp(file_info["modified"])
-                date_folder = f"{modified_date.year}-{modified_date.month:02d}"
-                dest_folder = base_path / date_folder
-            elif mode == "por_nome":
-                first_char = file_info["name"][0].upper() if file_info["name"] else "#"
-                if not first_char.isalpha():
-                    first_char = "#"
-                dest_folder = base_path / first_char
-            else:
-                dest_folder = base_path / "Organizados"
-            
-            # Determinar nome final (resolver conflitos)
-            final_name = self._resolve_name_conflict(dest_folder, file_info["name"])
-            final_path = dest_folder / final_name
-            
-            suggestion = {
-                "source": str(source_path),
-                "destination": str(final_path),
-                "source_name": file_info["name"],
-                "final_name": final_name,
-                "category": file_info.get("category", "Outros"),
-                "dest_folder": str(dest_folder),
-                "dest_folder_name": dest_folder.name,
-                "size_mb": file_info["size_mb"],
-                "file_info": file_info
+    def _spill_segment(self, store: SpillStore, table: FileTable, selected: array,
+                       plan: OrganizationPlan, stats: Dict):
+        """Grava o segmento atual em disco; extremos das estatísticas deixam de apontar para a tabela"""
+        for key in ("largest_file", "smallest_file"):
+            if isinstance(stats[key], FileRow):
+                stats[key] = stats[key].to_dict()
+        store.spill(table, selected, plan)
+    
+    def find_duplicates(self, files_info: Sequence[Mapping], token: Optional[CancellationToken] = None) -> Dict:
+        """Procura arquivos com conteúdo idêntico entre os arquivos analisados"""
+        self._log("🔁 Procurando arquivos duplicados...")
+        duplicate_finder.workers = max(1, config.get("hash_workers", 4))
+        duplicates = duplicate_finder.find(files_info, token)
+        
+        if duplicates["duplicate_files"]:
+            self._log(f"🔁 {duplicates['duplicate_files']} duplicatas em {len(duplicates['groups'])} grupos "
+                      f"({duplicates['wasted_mb']:.2f} MB repetidos)")
+        return duplicates
+    
+    def group_similar_images(self, plan: Sequence[Mapping], token: Optional[CancellationToken] = None) -> Dict:
+        """Redireciona grupos de imagens semelhantes do plano para subpastas compartilhadas"""
+        if not similar_image_finder.available:
+            self._log("⚠️ Pillow não instalado: agrupamento de imagens semelhantes ignorado", "warning")
+            return {"groups": [], "grouped_files": 0, "available": False}
+        
+        self._log("🖼️ Procurando imagens semelhantes...")
+        categories = set(config.get("similar_images_categories", ["Imagens"]))
+        candidates = [(position, entry["source"], entry["file_info"]["modified"])
+                      for position, entry in enumerate(plan) if entry["category"] in categories]
+        
+        similar_image_finder.max_distance = config.get("similar_images_max_distance", 5)
+        similar_image_finder.workers = config.get("image_hash_workers")
+        groups = []
+        
+        for members in similar_image_finder.find(candidates, token):
+            # Subpasta dentro do destino da imagem mais antiga do grupo
+            first_position, first_path, _ = members[0]
+            folder = os.path.join(plan[first_position]["dest_folder"],
+                                  similar_image_finder.group_folder_name(first_path))
+            for position, _, _ in members:
+                plan.redirect(position, folder)
+            groups.append({"folder": folder, "files": [path for _, path, _ in members]})
+        
+        grouped_files = sum(len(group["files"]) for group in groups)
+        if groups:
+            self._log(f"🖼️ {grouped_files} imagens semelhantes agrupadas em {len(groups)} subpastas")
+        return {"groups": groups, "grouped_files": grouped_files, "available": True}
+    
+    def _classifiers(self, index: Optional[MetadataIndex] = None) -> Tuple[Callable[[str], str], Optional[Callable]]:
+        """Classificador por nome e reclassificação em lote por conteúdo conforme a configuração"""
+        category_index = category_classifier.index
+        
+        # Leitura de bytes mágicos: "unknown" só para arquivos em "Outros", "all" também
+        # corrige extensões erradas, "off" desativa
+        sniffing = config.get("content_sniffing", "unknown")
+        refine = None
+        if sniffing in ("unknown", "all"):
+            refine = partial(content_sniffer.refine, verify_all=sniffing == "all")
+        
+        if index is not None:
+            # O modo de leitura de conteúdo também determina as categorias gravadas
+            index.sync_category_signature(f"{category_index.signature}:{sniffing}")
+        
+        return category_index.classify, refine
+    
+    def plan_files(self, folder_path: str, file_paths: Iterable[str],
+                   organization_mode: str = "por_tipo") -> Dict:
+        """Gera sugestões apenas para os arquivos informados, sem varrer a pasta inteira"""
+        try:
+            folder_path = os.path.abspath(folder_path)
+            classify, refine = self._classifiers()
+            
+            table = FileTable(fields=self._required_fields())
+            plan = OrganizationPlan(table)
+            file_scanner.scan_paths(file_paths, table, classify, refine)
+            
+            stats = self._new_stats()
+            result = self._process_batch(table, range(len(table)), folder_path, organization_mode, stats, plan)
+            
+            return {
+                "success": True,
+                "suggestions": plan,
+                "stats": result["stats"],
+                "files_info": result["files_info"],
+                "table": table
             }
+        
+        except Exception as e:
+            logger.error("Erro ao planejar arquivos", e)
+            return {"success": False, "error": str(e)}
+    
+    def _required_fields(self, extra_fields: Optional[Iterable[str]] = None) -> Optional[set]:
+        """Campos declarados de antemão: os da análise, os dos filtros ativos e os pedidos pelo chamador"""
+        filter_fields = filter_manager.required_fields()
+        if filter_fields is None:
+            return None
+        return set(self.REQUIRED_FIELDS) | filter_fields | set(extra_fields or ())
+    
+    def _process_batch(self, table: FileTable, rows: range, folder_path: str, mode: str,
+                       stats: Dict, plan: OrganizationPlan, token: Optional[CancellationToken] = None) -> Dict:
+        """Filtra um lote de linhas da tabela, gera suas sugestões e atualiza as estatísticas"""
+        plan_start = len(plan)
+        selected = array('I')
+        processed = rows.start
+        
+        # Em blocos, para que um lote grande (pasta plana enorme) possa ser interrompido
+        for chunk_start in range(rows.start, rows.stop, self.CANCEL_CHUNK):
+            if token is not None and token.cancelled:
+                break
+            
+            chunk = range(chunk_start, min(chunk_start + self.CANCEL_CHUNK, rows.stop))
+            indices = filter_manager.select(table, chunk) if filter_manager.filters else chunk
+            chunk_info = table.rows(indices)
+            
+            chunk_suggestions = self._generate_suggestions(chunk_info, folder_path, mode, plan)
+            self._accumulate_stats(stats, chunk_info, chunk_suggestions)
             
-            suggestions.append(suggestion)
+            if filter_manager.filters:
+                selected.extend(chunk_info.indices)
+            processed = chunk.stop
+        
+        files_info = table.rows(selected if filter_manager.filters else range(rows.start, processed))
+        suggestions = plan.view(plan_start)
         
-        return suggestions
+        return {
+            "success": True,
+            "suggestions": suggestions,
+            "plan": plan,
+            "files_info": files_info,
+            "table": table,
+            "stats": self._snapshot_stats(stats),
+            "scanned_files": len(table),
+            "done": False,
+            "duplicates": None,
+            "similar_images": None,
+            "partial": False,
+            "cancel_reason": None
+        }
     
-    def _resolve_name_conflict(self, dest_folder: Path, filename: str) -> str:
-        """Resolve conflitos de nome de arquivo"""
-        if not dest_folder.exists():
-            return filename
+    def _get_file_category(self, extension: str) -> str:
+        """Determina categoria do arquivo baseada na extensão"""
+        return category_classifier.by_extension(extension)
+    
+    def _generate_suggestions(self, files_info: FileRowList, base_folder: str, mode: str,
+                              plan: Optional[OrganizationPlan] = None) -> PlanView:
+        """Gera sugestões de organização como entradas do plano compacto"""
+        table = files_info.table
+        if plan is None:
+            plan = OrganizationPlan(table)
+        plan.root = base_folder
+        start = len(plan)
         
-        dest_path = dest_folder / filename
-        if not dest_path.exists():
-            return filename
+        # Regras personalizadas têm precedência sobre o modo (primeira que casar)
+        rules = self.rule_engine()
+        rule_destinations = rules.evaluate(table, files_info.indices) if rules else repeat(None)
         
-        # Arquivo já existe, adicionar sufixo numérico
-        name_stem = Path(filename).stem
-        extension = Path(filename).suffix
-        counter = 1
+        # Pastas relativas se repetem: cada uma é unida à pasta base uma única vez
+        template = self.path_template(mode)
+        dest_folders: Dict[str, str] = {}
+        extensions, categories = table.extensions, table.categories
+        ext_codes, category_codes = table.ext_codes, table.category_codes
         
-        while True:
-            new_name = f"{name_stem}_{counter}{extension}"
-            new_path = dest_folder / new_name
+        for row, rule_destination in zip(files_info.indices, rule_destinations):
+            name = table.names[row]
             
-            if not new_path.exists():
-                return new_name
+            # Determinar pasta destino baseada na regra ou no modo
+            relative = rule_destination or template.folder(
+                name, extensions[ext_codes[row]], categories[category_codes[row]],
+                table.mtimes[row], table.sizes[row]
+            )
+            dest_folder = dest_folders.get(relative)
+            if dest_folder is None:
+                dest_folder = dest_folders[relative] = os.path.join(base_folder, relative)
             
-            counter += 1
+            # Arquivo já está na pasta destino (análise recursiva de pasta já organizada)
+            if table.dir_path(row) == dest_folder:
+                continue
             
-            # Evitar loop infinito
-            if counter > 9999:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                return f"{name_stem}_{timestamp}{extension}"
+            # Determinar nome final (resolver conflitos com o disco e com o que o plano já reservou);
+            # o plano guarda só o que difere do original
+            final_name = self._resolve_name_conflict(dest_folder, name, plan.names)
+            plan.append(row, dest_folder, final_name)
+        
+        return plan.view(start)
+    
+    @staticmethod
+    def path_template(mode: str) -> PathTemplate:
+        """Modelo de caminho compilado de um modo (fixo, nomeado na configuração ou literal)"""
+        # Modos aceitos: por_tipo, por_data, por_nome, nomes em organization_templates ou um
+        # modelo direto como "{category}/{year}/{month}" (ValueError se inválido)
+        return template_for_mode(mode, config.get("organization_templates", {}))
     
-    def _calculate_stats(self, files_info: List[Dict], suggestions: List[Dict]) -> Dict:
+    def _dest_folder_name(self, mode: str, name: str, category: str, mtime: float, size: int = 0) -> str:
+        """Nome da pasta destino de um arquivo conforme o modo de organização"""
+        return self.path_template(mode).folder(name, file_suffix(name), category, mtime, size)
+    
+    def _resolve_name_conflict(self, dest_folder: Union[str, Path], filename: str,
+                               names: Optional[DestinationNames] = None) -> str:
+        """Resolve conflitos de nome de arquivo"""
+        if names is None:
+            names = DestinationNames()
+        return names.reserve(str(dest_folder), filename)
+    
+    def _calculate_stats(self, files_info: Sequence[Mapping], suggestions: List[Dict]) -> Dict:
         """Calcula estatísticas da análise"""
-        total_size_mb = sum(f["size_mb"] for f in files_info)
+        stats = self._new_stats()
+        self._accumulate_stats(stats, files_info, suggestions)
+        return stats
+    
+    def _new_stats(self) -> Dict:
+        """Cria estatísticas de análise vazias"""
+        return {
+            "total_files": 0,
+            "total_size_mb": 0,
+            "categories_count": 0,
+            "categories_stats": {},
+            "largest_file": None,
+            "smallest_file": None
+        }
+    
+    def _accumulate_stats(self, stats: Dict, files_info: Sequence[Mapping], suggestions: List[Dict]):
+        """Acumula um lote de arquivos e sugestões nas estatísticas da análise"""
+        stats["total_files"] += len(files_info)
+        
+        if isinstance(files_info, FileRowList):
+            # Caminho colunar: somas e extremos direto da coluna de tamanhos
+            stats["total_size_mb"] += files_info.total_size_bytes() / BYTES_PER_MB
+            largest = files_info.largest()
+            smallest = files_info.smallest()
+        else:
+            stats["total_size_mb"] += sum(f["size_mb"] for f in files_info)
+            largest = max(files_info, key=lambda x: x["size_mb"]) if files_info else None
+            smallest = min(files_info, key=lambda x: x["size_mb"]) if files_info else None
         
         # Estatísticas por categoria
-        categories_stats = {}
+        categories_stats = stats["categories_stats"]
         for suggestion in suggestions:
             category = suggestion["category"]
             if category not in categories_stats:
@@ -216,19 +600,43 @@ class AdvancedOrganizer:
             categories_stats[category]["count"] += 1
             categories_stats[category]["size_mb"] += suggestion["size_mb"]
         
-        return {
-            "total_files": len(files_info),
-            "total_size_mb": total_size_mb,
-            "categories_count": len(categories_stats),
-            "categories_stats": categories_stats,
-            "largest_file": max(files_info, key=lambda x: x["size_mb"]) if files_info else None,
-            "smallest_file": min(files_info, key=lambda x: x["size_mb"]) if files_info else None
+        stats["categories_count"] = len(categories_stats)
+        
+        if largest is not None:
+            if stats["largest_file"] is None or largest["size_mb"] > stats["largest_file"]["size_mb"]:
+                stats["largest_file"] = largest
+            if stats["smallest_file"] is None or smallest["size_mb"] < stats["smallest_file"]["size_mb"]:
+                stats["smallest_file"] = smallest
+    
+    def _snapshot_stats(self, stats: Dict) -> Dict:
+        """Cópia das estatísticas parciais que não muda com os próximos lotes"""
+        snapshot = stats.copy()
+        snapshot["categories_stats"] = {
+            category: info.copy() for category, info in stats["categories_stats"].items()
         }
+        return snapshot
     
-    def execute_organization(self, suggestions: List[Dict], create_backup: bool = True) -> Dict:
+    def execute_organization(self, suggestions: List[Dict], create_backup: bool = True,
+                             duplicates: Optional[Dict] = None, duplicate_action: Optional[str] = None,
+                             on_moved: Optional[Callable[[str, str], None]] = None,
+                             backup_id: Optional[str] = None) -> Dict:
         """Executa a organização dos arquivos"""
-        if self.is_running:
-            return {"success": False, "error": "Operação já em andamento"}
+        # O plano é percorrido em segmentos de move_segment_size movimentações: só o segmento atual
+        # fica na memória (um SpilledPlan continua em disco) e cada segmento concluído vai para o
+        # diário do backup. on_moved(origem, destino) recebe cada arquivo movido; result["moved_files"]
+        # só lista as sugestões quando elas foram passadas como lista. Com backup_id, as movimentações
+        # são acrescentadas a um backup já existente (ex.: o da sessão de observação) em vez de um novo
+        
+        # Cópias extras (resultado de find_duplicates): mantidas, puladas, trocadas por hardlink
+        # para o original ou levadas à quarentena
+        if duplicate_action is None:
+            duplicate_action = config.get("duplicate_action", "keep")
+        if duplicate_action not in DUPLICATE_ACTIONS:
+            return {"success": False, "error": f"Ação para duplicatas inválida: {duplicate_action}"}
+        
+        if not self._execution_lock.acquire(blocking=False):
+            # busy distingue "tente de novo depois" dos demais erros sem depender da mensagem
+            return {"success": False, "error": "Operação já em andamento", "busy": True}
         
         self.is_running = True
         self.cancel_requested = False
@@ -237,70 +645,187 @@ class AdvancedOrganizer:
             "processed_files": 0,
             "moved_files": 0,
             "skipped_files": 0,
+            "copied_files": 0,
             "errors": 0,
             "start_time": datetime.now(),
             "end_time": None
         }
+        self.events.set_counter("moved_files", 0)
+        self.events.set_counter("move_errors", 0)
         
         try:
             self._log(f"🚀 Iniciando organização de {len(suggestions)} arquivos")
             
-            # Validar operação
-            is_valid, validation_summary = operation_validator.validate_organization_operation(
-                Path(suggestions[0]["source"]).parent if suggestions else "",
-                [{"source": s["source"], "destination": s["destination"]} for s in suggestions]
-            )
+            base_folder = self._base_folder(suggestions) if len(suggestions) else ""
+            segment_size = max(1, config.get("move_segment_size", 10000))
+            
+            # Validar arquivos segmento a segmento, antes de mover qualquer arquivo; o espaço em disco
+            # é verificado uma única vez, para o tamanho somado de todos os segmentos
+            validation_errors = []
+            total_size_mb = 0.0
+            for _, segment in self._iter_segments(self._iter_moves(suggestions), segment_size):
+                is_valid, validation_summary = operation_validator.validate_organization_operation(
+                    base_folder, [{"source": source, "destination": destination} for source, destination in segment],
+                    check_disk_space=False
+                )
+                if not is_valid:
+                    validation_errors.extend(validation_summary["errors"])
+                total_size_mb += validation_summary.get("total_size_mb", 0.0)
+            
+            if validation_errors:
+                self._log(f"❌ Validação falhou: {validation_errors}", "error")
+                return {"success": False, "errors": validation_errors}
             
-            if not is_valid:
-                self._log(f"❌ Validação falhou: {validation_summary['errors']}", "error")
-                return {"success": False, "errors": validation_summary["errors"]}
+            has_space, space_summary = operation_validator.validate_disk_space(base_folder, total_size_mb)
+            if not has_space:
+                for warning in space_summary["warnings"]:
+                    self._log(f"⚠️ {warning}", "warning")
             
-            # Criar backup se solicitado
-            backup_id = None
-            if create_backup and config.get("auto_backup", True):
-                backup_data = {
+            duplicate_actions = self._duplicate_actions(suggestions, duplicates, duplicate_action, base_folder)
+            
+            # Criar backup se solicitado: as movimentações entram no diário do backup conforme são
+            # concluídas (com o destino real), então duplicatas puladas e falhas não são restauradas
+            if backup_id is None and create_backup and config.get("auto_backup", True):
+                backup_id = backup_manager.create_backup({
                     "type": "organization",
-                    "source_folder": str(Path(suggestions[0]["source"]).parent),
-                    "files_moved": [{"source": s["source"], "destination": s["destination"]} for s in suggestions],
-                    "mode": "advanced_organization"
-                }
-                backup_id = backup_manager.create_backup(backup_data)
+                    "source_folder": base_folder,
+                    "mode": "advanced_organization",
+                    "journal": True
+                })
                 if backup_id:
                     self._log(f"💾 Backup criado: {backup_id}")
             
             # Executar movimentação dos arquivos
-            moved_files = []
             errors = []
+            moved_files: Optional[List] = [] if isinstance(suggestions, list) else None
+            # Movimentações do lote em execução e suas posições no plano
+            moves: List[Tuple[str, str]] = []
+            positions: List[int] = []
+            # (pasta de origem, nome, pasta destino, nome final) das movimentações concluídas do lote
+            done: List[CompactRecord] = []
+            # Local atual dos originais de duplicatas (os hardlinks apontam para ele)
+            moved_originals = {target: target for action, target in duplicate_actions.values()
+                               if action == "hardlink"}
+            # Destino ocupado depois do planejamento: novo nome pelo mesmo índice de nomes do plano
+            names = getattr(suggestions, "names", None) or DestinationNames()
+            names_lock = threading.Lock()
+            # Origem -> destino real, quando difere do planejado
+            renamed: Dict[str, str] = {}
             
-            for i, suggestion in enumerate(suggestions, 1):
-                if self.cancel_requested:
-                    self._log("⏹️ Operação cancelada pelo usuário", "warning")
-                    break
+            def move(index: int) -> Tuple[str, str]:
+                """Executado nas threads do pool: move (ou liga/pula) o arquivo de uma posição do lote"""
+                source, destination = moves[index]
+                action, target = duplicate_actions.get(source, ("keep", None))
+                if action == "skip":
+                    return "skipped", destination
+                if action == "quarantine":
+                    destination = target
+                planned = destination
                 
-                self._update_progress(i, len(suggestions), f"Movendo: {suggestion['source_name']}")
+                for _ in range(self.MAX_COLLISION_RETRIES):
+                    try:
+                        if action == "hardlink" and self._link_duplicate(moved_originals.get(target, target),
+                                                                         Path(source), Path(destination)):
+                            outcome = LINKED
+                        else:
+                            outcome = move_file(source, destination)
+                        break
+                    except FileExistsError:
+                        dest_folder = os.path.dirname(destination)
+                        with names_lock:
+                            destination = os.path.join(dest_folder,
+                                                       names.reserve(dest_folder, os.path.basename(planned)))
+                else:
+                    raise FileExistsError(f"Destino ocupado após {self.MAX_COLLISION_RETRIES} tentativas: "
+                                          f"{planned}")
                 
-                try:
-                    source_path = Path(suggestion["source"])
-                    dest_path = Path(suggestion["destination"])
-                    
-                    # Criar pasta destino se não existir
-                    dest_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Mover arquivo
-                    shutil.move(str(source_path), str(dest_path))
-                    
-                    moved_files.append(suggestion)
-                    self.stats["moved_files"] += 1
-                    
-                    self._log(f"✅ Movido: {suggestion['source_name']} -> {suggestion['dest_folder_name']}/")
-                    
-                except Exception as e:
-                    error_msg = f"Erro ao mover {suggestion['source_name']}: {str(e)}"
+                if source in moved_originals:
+                    moved_originals[source] = destination
+                if destination != planned:
+                    renamed[source] = destination
+                return outcome, destination
+            
+            def record(index: int, result: Optional[Tuple[str, str]], error: Optional[Exception]):
+                """Registra o resultado de uma posição do lote (na thread que chamou execute_organization)"""
+                source = moves[index][0]
+                source_name = os.path.basename(source)
+                outcome, destination = result or (None, None)
+                self.stats["processed_files"] += 1
+                self._update_progress(self.stats["processed_files"], self.stats["total_files"],
+                                      f"Movendo: {source_name}")
+                
+                if error is not None:
+                    error_msg = f"Erro ao mover {source_name}: {str(error)}"
                     errors.append(error_msg)
                     self.stats["errors"] += 1
+                    self.events.increment("move_errors")
                     self._log(f"❌ {error_msg}", "error")
+                elif outcome == "skipped":
+                    self.stats["skipped_files"] += 1
+                    self._log(f"⏭️ Duplicata mantida no lugar: {source_name}")
+                else:
+                    final_name = os.path.basename(destination)
+                    done.append((os.path.dirname(source), source_name, os.path.dirname(destination),
+                                 final_name if final_name != source_name else None))
+                    if moved_files is not None:
+                        moved_files.append(suggestions[positions[index]])
+                    if on_moved is not None:
+                        on_moved(source, destination)
+                    self.stats["moved_files"] += 1
+                    self.events.increment("moved_files")
+                    if outcome == COPIED:
+                        # Outro dispositivo: o arquivo foi copiado e a origem removida
+                        self.stats["copied_files"] += 1
+                    if renamed.get(source) == destination:
+                        self._log(f"⚠️ Destino ocupado, renomeado: {source_name} -> {final_name}", "warning")
+                    self._log(f"✅ Movido: {source_name} -> {os.path.basename(os.path.dirname(destination))}/")
+            
+            def run_batch(batch: List[Tuple[str, str]], batch_positions: List[int]):
+                """Executa um lote no pool e grava no diário do backup o que foi concluído"""
+                nonlocal moves, positions
+                moves, positions = batch, batch_positions
                 
-                self.stats["processed_files"] += 1
+                # Pastas destino criadas antes; movimentações em paralelo por pasta e dispositivo
+                tasks = []
+                for index, (source, destination) in enumerate(moves):
+                    action, target = duplicate_actions.get(source, ("keep", None))
+                    if action == "skip":
+                        tasks.append((index, None))
+                    else:
+                        tasks.append((index, os.path.dirname(target if action == "quarantine" else destination)))
+                move_executor.run(tasks, move, record, lambda: self.cancel_requested)
+                
+                if backup_id and done:
+                    backup_manager.append_moves(backup_id, build_compact(done))
+                done.clear()
+            
+            move_executor.workers = max(1, config.get("move_workers", 8))
+            move_executor.per_device = max(1, config.get("move_workers_per_device", 4))
+            
+            # Hardlinks esperam todos os originais chegarem ao novo local, inclusive os de
+            # segmentos posteriores: ficam para um último lote (no máximo um por duplicata)
+            deferred: Tuple[List[Tuple[str, str]], List[int]] = ([], [])
+            for start, segment in self._iter_segments(self._iter_moves(suggestions), segment_size):
+                if self.cancel_requested:
+                    break
+                batch, batch_positions = [], []
+                for position, move_pair in enumerate(segment, start):
+                    if duplicate_actions.get(move_pair[0], ("keep", None))[0] == "hardlink":
+                        deferred[0].append(move_pair)
+                        deferred[1].append(position)
+                    else:
+                        batch.append(move_pair)
+                        batch_positions.append(position)
+                run_batch(batch, batch_positions)
+            
+            if deferred[0] and not self.cancel_requested:
+                run_batch(*deferred)
+            
+            if self.cancel_requested:
+                self._log("⏹️ Operação cancelada pelo usuário", "warning")
+            
+            if backup_id:
+                backup_manager.add_total(backup_id, self.stats["moved_files"])
             
             self.stats["end_time"] = datetime.now()
             duration = (self.stats["end_time"] - self.stats["start_time"]).total_seconds()
@@ -315,14 +840,17 @@ class AdvancedOrganizer:
             
             success = self.stats["errors"] == 0 and not self.cancel_requested
             
-            return {
+            result = {
                 "success": success,
                 "stats": self.stats.copy(),
-                "moved_files": moved_files,
+                "renamed": renamed,
                 "errors": errors,
                 "backup_id": backup_id,
                 "duration_seconds": duration
             }
+            if moved_files is not None:
+                result["moved_files"] = moved_files
+            return result
             
         except Exception as e:
             self._log(f"❌ Erro crítico na organização: {str(e)}", "error")
@@ -331,9 +859,94 @@ class AdvancedOrganizer:
         
         finally:
             self.is_running = False
+            self._execution_lock.release()
+            # Pastas mudaram: mesmo com mtime de baixa resolução, nenhuma varredura antiga é reaproveitada
+            scan_snapshots.clear()
+            self.events.flush()
+    
+    @staticmethod
+    def _iter_moves(suggestions: Iterable[Mapping]) -> Iterator[Tuple[str, str]]:
+        """(origem, destino) das sugestões, lidas do plano compacto sem criar as entradas"""
+        if hasattr(suggestions, "iter_moves"):
+            return suggestions.iter_moves()
+        return ((suggestion["source"], suggestion["destination"]) for suggestion in suggestions)
+    
+    @staticmethod
+    def _iter_segments(moves: Iterator[Tuple[str, str]], size: int) -> Iterator[Tuple[int, List[Tuple[str, str]]]]:
+        """(posição inicial, movimentações) de cada segmento de até size movimentações"""
+        start = 0
+        while True:
+            segment = list(islice(moves, size))
+            if not segment:
+                return
+            yield start, segment
+            start += len(segment)
+    
+    @staticmethod
+    def _base_folder(suggestions: Sequence[Mapping]) -> str:
+        """Pasta organizada: a raiz da análise ou, numa lista avulsa, a pasta comum às origens"""
+        root = getattr(suggestions, "root", None)
+        if root:
+            return root
+        try:
+            return os.path.commonpath([os.path.dirname(suggestion["source"]) for suggestion in suggestions])
+        except ValueError:
+            # Origens em unidades diferentes (Windows)
+            return os.path.dirname(suggestions[0]["source"])
+    
+    def _duplicate_actions(self, suggestions: Sequence[Mapping], duplicates: Optional[Dict],
+                           action: str, base_folder: str) -> Dict[str, Tuple[str, str]]:
+        """Origem de cada cópia extra -> (ação, original ou caminho na quarentena)"""
+        if not duplicates or action == "keep":
+            return {}
+        
+        originals = {path: group["original"] for group in duplicates["groups"] for path in group["duplicates"]}
+        if not originals:
+            return {}
+        
+        actions = {}
+        names = DestinationNames()
+        quarantine_name = config.get("duplicates_folder", "Duplicados")
+        
+        # Uma única quarentena na pasta organizada, qualquer que seja a profundidade do modelo de
+        # caminho ({category}/{year}/{month}...), com os nomes resolvidos sem conflito
+        folder = os.path.join(base_folder, quarantine_name)
+        
+        for source, _ in self._iter_moves(suggestions):
+            original = originals.get(source)
+            if original is None:
+                continue
+            
+            if action == "quarantine":
+                actions[source] = (action, os.path.join(folder, names.reserve(folder, os.path.basename(source))))
+            else:
+                actions[source] = (action, original)
+        
+        self._log(f"🔁 {len(actions)} duplicatas serão tratadas com a ação '{action}'")
+        return actions
+    
+    def _link_duplicate(self, original: str, source_path: Path, dest_path: Path) -> bool:
+        """Cria no destino um hardlink para o original e remove a cópia; False se não for possível"""
+        try:
+            os.link(original, dest_path)
+        except FileExistsError:
+            # Destino ocupado: tratado como conflito de nome por quem chamou
+            raise
+        except OSError as e:
+            # Outro dispositivo ou sistema de arquivos sem hardlinks: a cópia é movida normalmente
+            logger.warning(f"Hardlink indisponível para {source_path.name}, movendo a cópia: {str(e)}")
+            return False
+        
+        source_path.unlink()
+        return True
     
     def cancel_operation(self):
-        """Cancela a operação em andamento"""
+        """Cancela a operação em andamento (análise ou organização)"""
+        token = self.analysis_token
+        if token is not None and not token.cancelled:
+            token.cancel()
+            self._log("⏹️ Cancelamento da análise solicitado...", "warning")
+        
         if self.is_running:
             self.cancel_requested = True
             self._log("⏹️ Cancelamento solicitado...", "warning")
@@ -342,17 +955,39 @@ class AdvancedOrganizer:
         """Retorna estatísticas da operação atual"""
         return self.stats.copy()
     
-    def create_custom_organization_rule(self, name: str, rule_function: Callable[[Dict], str]) -> bool:
+    def rule_engine(self) -> Optional[RuleEngine]:
+        """Regras personalizadas compiladas (None se não houver nenhuma ativa)"""
+        if self._rule_engine is None:
+            self._rule_engine = RuleEngine.from_specs(config.get("custom_rules", {}), self._rule_functions)
+        return self._rule_engine if len(self._rule_engine) else None
+    
+    def create_custom_organization_rule(self, name: str,
+                                        rule_function: Union[Callable[[Mapping], Optional[str]], Dict]) -> bool:
         """Cria regra customizada de organização"""
+        # rule_function (nome original mantido para chamadas por palavra-chave) é uma função
+        # file_info -> pasta destino (só nesta sessão) ou uma especificação compilada pelo motor de
+        # regras, {"destination": "Fotos/Grandes", "conditions": {...}} (salva na configuração).
+        # A ordem de criação define a prioridade
         try:
-            # Salvar regra customizada (implementação simplificada)
+            if callable(rule_function):
+                compile_rule(name, {}, rule_function)
+                spec = {"function": True}
+                self._rule_functions[name] = rule_function
+            else:
+                compile_rule(name, rule_function)
+                spec = {key: rule_function[key] for key in ("destination", "conditions", "enabled")
+                        if key in rule_function}
+            
             custom_rules = config.get("custom_rules", {})
             custom_rules[name] = {
                 "name": name,
                 "created": datetime.now().isoformat(),
-                "description": f"Regra customizada: {name}"
+                "description": rule_function.get("description", f"Regra customizada: {name}")
+                               if isinstance(rule_function, dict) else f"Regra customizada: {name}",
+                **spec
             }
             config.set("custom_rules", custom_rules)
+            self._rule_engine = None
             
             self._log(f"📝 Regra customizada criada: {name}")
             return True
@@ -361,9 +996,57 @@ class AdvancedOrganizer:
             self._log(f"❌ Erro ao criar regra customizada: {str(e)}", "error")
             return False
     
-    def preview_organization(self, folder_path: str, mode: str) -> Dict:
+    def remove_custom_organization_rule(self, name: str) -> bool:
+        """Remove regra customizada de organização"""
+        custom_rules = config.get("custom_rules", {})
+        if name not in custom_rules:
+            return False
+        
+        del custom_rules[name]
+        config.set("custom_rules", custom_rules)
+        self._rule_functions.pop(name, None)
+        self._rule_engine = None
+        
+        self._log(f"🗑️ Regra customizada removida: {name}")
+        return True
+    
+    def estimate_folder(self, folder_path: str, mode: str = "por_tipo", recursive: Optional[bool] = None,
+                        max_depth: Optional[int] = None, time_budget: Optional[float] = None,
+                        seed: Optional[int] = None) -> Dict:
+        """Estimativa rápida por amostragem (contagem, tamanho por categoria e pastas destino)"""
+        if recursive is None:
+            recursive = config.get("recursive_scan", False)
+        if max_depth is None:
+            max_depth = config.get("scan_max_depth")
+        if time_budget is None:
+            time_budget = config.get("estimate_time_budget", 0.2)
+        
+        if not file_validator.validate_folder_access(folder_path):
+            return {"success": False, "errors": file_validator.get_validation_summary()["errors"]}
+        
+        try:
+            # Só a extensão classifica: ler conteúdo não cabe no orçamento de tempo
+            result = folder_estimator.estimate(
+                os.path.abspath(folder_path), category_classifier.index.classify,
+                partial(self._dest_folder_name, mode), recursive, max_depth, time_budget, seed,
+                config.get("show_hidden_files", False)
+            )
+            total = result["stats"]["total_files"]
+            self._log(f"📐 Estimativa: ~{total['estimate']:.0f} arquivos "
+                      f"({result['probes']} sondagens em {result['elapsed_seconds']:.2f}s)")
+            return result
+        
+        except Exception as e:
+            logger.error("Erro na estimativa da pasta", e)
+            return {"success": False, "error": str(e)}
+    
+    def preview_organization(self, folder_path: str, mode: str, recursive: Optional[bool] = None,
+                             max_depth: Optional[int] = None, token: Optional[CancellationToken] = None,
+                             timeout: Optional[float] = None, analysis: Optional[Dict] = None) -> Dict:
         """Gera preview da organização sem executar"""
-        analysis = self.analyze_folder(folder_path, mode)
+        # Com uma análise já feita (ex.: a exibida na interface) nada é varrido nem planejado de novo
+        if analysis is None:
+            analysis = self.analyze_folder(folder_path, mode, recursive, max_depth, token=token, timeout=timeout)
         
         if not analysis["success"]:
             return analysis
@@ -371,8 +1054,14 @@ class AdvancedOrganizer:
         # Criar estrutura de preview
         preview_structure = {}
         
+        # Chave relativa à pasta analisada: modelos com subpastas (ex.: {year}/{month}) não se misturam
+        base_folder = os.path.abspath(folder_path)
+        folder_names: Dict[str, str] = {}
         for suggestion in analysis["suggestions"]:
-            folder_name = suggestion["dest_folder_name"]
+            dest_folder = suggestion["dest_folder"]
+            folder_name = folder_names.get(dest_folder)
+            if folder_name is None:
+                folder_name = folder_names[dest_folder] = os.path.relpath(dest_folder, base_folder)
             if folder_name not in preview_structure:
                 preview_structure[folder_name] = []
             
@@ -385,7 +1074,9 @@ class AdvancedOrganizer:
         return {
             "success": True,
             "preview_structure": preview_structure,
-            "stats": analysis["stats"]
+            "stats": analysis["stats"],
+            "partial": analysis["partial"],
+            "cancel_reason": analysis.get("cancel_reason")
         }
 
 # Instância global do organizador
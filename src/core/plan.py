@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Plano de organização compacto com pastas internadas
+"""
+
+import os
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Dict, Iterator, Iterable, Optional, Set, Tuple, Any
+
+from .file_table import FileTable, StringPool, BYTES_PER_MB
+
+if TYPE_CHECKING:
+    from .spill import SpillStore
+
+# Bytes por nome reservado fora do texto: entrada do conjunto e cabeçalho do objeto str
+RESERVED_NAME_OVERHEAD_BYTES = sys.getsizeof("") + 32
+
+# (pasta de origem, nome, pasta destino, nome final se renomeado) de uma movimentação
+CompactRecord = Tuple[str, str, str, Optional[str]]
+
+def build_compact(records: Iterable[CompactRecord]) -> Dict:
+    """Forma serializável compacta: cada pasta aparece uma única vez"""
+    source_dirs = StringPool()
+    dest_dirs = StringPool()
+    moves = []
+    
+    for source_dir, name, dest_folder, final_name in records:
+        move = [source_dirs.code(source_dir), name, dest_dirs.code(dest_folder)]
+        if final_name is not None:
+            move.append(final_name)
+        moves.append(move)
+    
+    return {
+        "source_dirs": source_dirs.values,
+        "dest_dirs": dest_dirs.values,
+        "moves": moves
+    }
+
+class DestinationNames:
+    """Nomes ocupados em cada pasta destino: uma listagem do disco mais as reservas do plano"""
+    
+    def __init__(self):
+        # Nomes normalizados (os.path.normcase) por pasta destino
+        self._taken: Dict[str, Set[str]] = {}
+        # Próximo sufixo a tentar por (pasta, radical, extensão): duplicatas em massa
+        # (ex.: milhares de IMG_0001.jpg) não recomeçam a busca do _1 a cada arquivo
+        self._next_suffix: Dict[Tuple[str, str, str], int] = {}
+        # Acima do orçamento de memória os nomes vão para o armazenamento temporário da análise;
+        # pastas gravadas lá já foram listadas e são consultadas no disco
+        self._store: Optional["SpillStore"] = None
+        self._spilled_folders: Set[str] = set()
+        self._bytes = 0
+    
+    def _names(self, dest_folder: str) -> Set[str]:
+        names = self._taken.get(dest_folder)
+        if names is None:
+            if dest_folder in self._spilled_folders:
+                names = set()
+            else:
+                try:
+                    names = {os.path.normcase(name) for name in os.listdir(dest_folder)}
+                except OSError:
+                    # Pasta ainda não existe (será criada na organização)
+                    names = set()
+                self._bytes += sum(len(name) for name in names) + len(names) * RESERVED_NAME_OVERHEAD_BYTES
+            self._taken[dest_folder] = names
+        return names
+    
+    def _is_taken(self, dest_folder: str, names: Set[str], key: str) -> bool:
+        return key in names or (dest_folder in self._spilled_folders and self._store.has_name(dest_folder, key))
+    
+    def _add(self, names: Set[str], key: str):
+        names.add(key)
+        self._bytes += len(key) + RESERVED_NAME_OVERHEAD_BYTES
+    
+    def reserve(self, dest_folder: str, filename: str) -> str:
+        """Reserva um nome livre na pasta destino (o próprio ou com sufixo numérico)"""
+        names = self._names(dest_folder)
+        key = os.path.normcase(filename)
+        if not self._is_taken(dest_folder, names, key):
+            self._add(names, key)
+            return filename
+        
+        name_stem = Path(filename).stem
+        extension = Path(filename).suffix
+        suffix_key = (dest_folder, os.path.normcase(name_stem), os.path.normcase(extension))
+        counter = self._next_suffix.get(suffix_key, 1)
+        
+        while True:
+            new_name = f"{name_stem}_{counter}{extension}"
+            counter += 1
+            if not self._is_taken(dest_folder, names, os.path.normcase(new_name)):
+                break
+        
+        self._next_suffix[suffix_key] = counter
+        self._add(names, os.path.normcase(new_name))
+        return new_name
+    
+    def estimate_bytes(self) -> int:
+        """Memória aproximada dos nomes mantidos em memória"""
+        return self._bytes
+    
+    def spill(self, store: "SpillStore"):
+        """Grava os nomes em memória no armazenamento temporário e os descarta"""
+        # Os sufixos também são descartados: a busca recomeça do _1, agora consultando o disco
+        store.add_names(self._taken)
+        self._spilled_folders.update(self._taken)
+        self._store = store
+        self._taken = {}
+        self._next_suffix = {}
+        self._bytes = 0
+
+class OrganizationPlan(Sequence):
+    """Plano de movimentação: cada entrada guarda só (linha da tabela, id da pasta destino)"""
+    
+    def __init__(self, table: FileTable, names: Optional[DestinationNames] = None):
+        self.table = table
+        # Nomes reservados nas pastas destino; compartilhado entre segmentos do mesmo plano
+        self.names = names if names is not None else DestinationNames()
+        # Pasta organizada (base das pastas destino), definida ao gerar as sugestões
+        self.root: Optional[str] = None
+        self.dest_dirs = StringPool()
+        self.rows = array('I')
+        self.dest_dir_ids = array('I')
+        # Nome final apenas quando difere do original (conflitos são raros)
+        self.renames: Dict[int, str] = {}
+        self._dir_names: Dict[int, str] = {}
+    
+    def append(self, row: int, dest_folder: str, final_name: Optional[str] = None) -> int:
+        """Adiciona uma movimentação ao plano e retorna sua posição"""
+        position = len(self.rows)
+        self.rows.append(row)
+        self.dest_dir_ids.append(self.dest_dirs.code(dest_folder))
+        if final_name is not None and final_name != self.table.names[row]:
+            self.renames[position] = final_name
+        return position
+    
+    def redirect(self, position: int, dest_folder: str):
+        """Troca a pasta destino de uma entrada, reservando nela um nome livre"""
+        name = self.table.names[self.rows[position]]
+        final_name = self.names.reserve(dest_folder, name)
+        self.dest_dir_ids[position] = self.dest_dirs.code(dest_folder)
+        if final_name != name:
+            self.renames[position] = final_name
+        else:
+            self.renames.pop(position, None)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return PlanView(self, range(len(self.rows))[position])
+        if position < 0:
+            position += len(self.rows)
+        if not 0 <= position < len(self.rows):
+            raise IndexError(position)
+        return PlanEntry(self, position)
+    
+    def view(self, start: int, stop: Optional[int] = None) -> "PlanView":
+        """Visão de um intervalo do plano (ex.: o lote recém-planejado)"""
+        return PlanView(self, range(start, len(self.rows) if stop is None else stop))
+    
+    # Acessores por posição
+    def source(self, position: int) -> str:
+        return self.table.path(self.rows[position])
+    
+    def source_name(self, position: int) -> str:
+        return self.table.names[self.rows[position]]
+    
+    def final_name(self, position: int) -> str:
+        return self.renames.get(position) or self.table.names[self.rows[position]]
+    
+    def dest_folder(self, position: int) -> str:
+        return self.dest_dirs[self.dest_dir_ids[position]]
+    
+    def dest_folder_name(self, position: int) -> str:
+        dir_id = self.dest_dir_ids[position]
+        name = self._dir_names.get(dir_id)
+        if name is None:
+            name = self._dir_names[dir_id] = os.path.basename(self.dest_dirs[dir_id])
+        return name
+    
+    def destination(self, position: int) -> str:
+        return os.path.join(self.dest_folder(position), self.final_name(position))
+    
+    def iter_moves(self, positions: Optional[range] = None) -> Iterator[Tuple[str, str]]:
+        """Itera sobre (origem, destino) sem materializar as sugestões"""
+        for position in positions if positions is not None else range(len(self.rows)):
+            yield self.source(position), self.destination(position)
+    
+    def iter_compact(self, positions: Optional[range] = None) -> Iterator[CompactRecord]:
+        """Itera sobre as movimentações no formato de build_compact"""
+        for position in positions if positions is not None else range(len(self.rows)):
+            row = self.rows[position]
+            yield (self.table.dir_path(row), self.table.names[row], self.dest_folder(position),
+                   self.renames.get(position))
+    
+    def to_compact(self, positions: Optional[range] = None) -> Dict:
+        """Forma serializável compacta: cada pasta aparece uma única vez"""
+        return build_compact(self.iter_compact(positions))
+    
+    def estimate_bytes(self, count: int) -> int:
+        """Memória aproximada de count entradas (linha e id da pasta destino)"""
+        return count * (self.rows.itemsize + self.dest_dir_ids.itemsize)
+    
+    def to_dicts(self, positions: Optional[range] = None) -> List[Dict]:
+        return [PlanEntry(self, position).to_dict()
+                for position in (positions if positions is not None else range(len(self.rows)))]
+
+class PlanView(Sequence):
+    """Intervalo de um OrganizationPlan visto como lista de sugestões"""
+    
+    def __init__(self, plan: OrganizationPlan, positions: range):
+        self.plan = plan
+        self.positions = positions
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PlanView(self.plan, self.positions[index])
+        return self.plan[self.positions[index]]
+    
+    @property
+    def names(self) -> Optional[DestinationNames]:
+        return getattr(self.plan, "names", None)
+    
+    @property
+    def root(self) -> Optional[str]:
+        return getattr(self.plan, "root", None)
+    
+    def iter_moves(self) -> Iterator[Tuple[str, str]]:
+        return self.plan.iter_moves(self.positions)
+    
+    def to_compact(self) -> Dict:
+        return self.plan.to_compact(self.positions)
+    
+    def to_dicts(self) -> List[Dict]:
+        return self.plan.to_dicts(self.positions)
+
+class PlanEntry(Mapping):
+    """Visão de uma entrada do plano com as chaves das sugestões de organização"""
+    
+    __slots__ = ("plan", "position")
+    
+    _FIELDS = {
+        "source": lambda p, i: p.source(i),
+        "destination": lambda p, i: p.destination(i),
+        "source_name": lambda p, i: p.source_name(i),
+        "final_name": lambda p, i: p.final_name(i),
+        "category": lambda p, i: p.table.category(p.rows[i]),
+        "dest_folder": lambda p, i: p.dest_folder(i),
+        "dest_folder_name": lambda p, i: p.dest_folder_name(i),
+        "size_mb": lambda p, i: p.table.sizes[p.rows[i]] / BYTES_PER_MB,
+        "file_info": lambda p, i: p.table.row(p.rows[i]),
+    }
+    
+    def __init__(self, plan: OrganizationPlan, position: int):
+        self.plan = plan
+        self.position = position
+    
+    def __getitem__(self, key: str) -> Any:
+        getter = self._FIELDS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self.plan, self.position)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+    
+    def __repr__(self) -> str:
+        return f"PlanEntry({self.plan.source(self.position)!r} -> {self.plan.destination(self.position)!r})"
+    
+    def to_dict(self) -> Dict:
+        data = {key: getter(self.plan, self.position) for key, getter in self._FIELDS.items()}
+        data["file_info"] = data["file_info"].to_dict()
+        return data
\ No newline at end of file
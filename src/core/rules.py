@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de regras de organização personalizadas, compiladas em um índice de despacho
+"""
+
+import os
+import re
+import time
+import fnmatch
+from datetime import datetime
+from functools import partial
+from typing import List, Dict, Optional, Callable, Iterable, Mapping, Tuple, Any
+
+from ..utils.logger import logger
+from .file_table import FileTable, BYTES_PER_MB
+
+# Condições aceitas em uma regra declarada
+CONDITION_KEYS = frozenset({
+    "extensions", "categories", "min_size_mb", "max_size_mb",
+    "modified_after", "modified_before", "min_age_days", "max_age_days", "name_pattern"
+})
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Função de regra: recebe o file_info e retorna a pasta destino (ou None se não se aplica)
+RuleFunction = Callable[[Mapping], Optional[str]]
+
+class CompiledRule:
+    """Regra pronta para avaliação: conjuntos para o despacho e limites numéricos para o restante"""
+    
+    __slots__ = ("name", "destination", "function", "extensions", "categories",
+                 "min_size", "max_size", "min_mtime", "max_mtime", "name_regex")
+    
+    def __init__(self, name: str, destination: Optional[str] = None, function: Optional[RuleFunction] = None):
+        self.name = name
+        self.destination = destination
+        self.function = function
+        # None: sem restrição (a regra vale para qualquer extensão/categoria)
+        self.extensions: Optional[frozenset] = None
+        self.categories: Optional[frozenset] = None
+        self.min_size: Optional[int] = None
+        self.max_size: Optional[int] = None
+        self.min_mtime: Optional[float] = None
+        self.max_mtime: Optional[float] = None
+        self.name_regex = None
+    
+    @property
+    def unconditional(self) -> bool:
+        """Sem condições além de extensão/categoria: casa com todo arquivo que chega ao despacho"""
+        return (self.function is None and self.name_regex is None and
+                self.min_size is None and self.max_size is None and
+                self.min_mtime is None and self.max_mtime is None)
+    
+    def dispatches(self, extension: str, category: str) -> bool:
+        return ((self.extensions is None or extension in self.extensions) and
+                (self.categories is None or category in self.categories))
+    
+    def match(self, name: str, size: int, mtime: float, file_info: Callable[[], Mapping]) -> Optional[str]:
+        """Pasta destino se as condições restantes forem atendidas"""
+        if self.min_size is not None and size < self.min_size:
+            return None
+        if self.max_size is not None and size > self.max_size:
+            return None
+        if self.min_mtime is not None and mtime < self.min_mtime:
+            return None
+        if self.max_mtime is not None and mtime > self.max_mtime:
+            return None
+        if self.name_regex is not None and not self.name_regex.match(name):
+            return None
+        if self.function is not None:
+            try:
+                destination = self.function(file_info())
+                return _destination(destination) if destination else None
+            except Exception as e:
+                logger.debug(f"Regra {self.name} falhou para {name}: {str(e)}")
+                return None
+        return self.destination
+
+def _timestamp(value: Any) -> float:
+    """Data ISO (AAAA-MM-DD[THH:MM]) ou timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value)).timestamp()
+
+def _destination(value: Any) -> str:
+    """Pasta destino relativa à pasta organizada (subpastas com /)"""
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("Regra sem pasta destino")
+    parts = [part for part in value.replace("\\", "/").split("/") if part]
+    if not parts or value.startswith(("/", "\\")) or os.path.isabs(value) or ".." in parts:
+        raise ValueError(f"Pasta destino inválida: {value}")
+    return os.path.join(*parts)
+
+def compile_rule(name: str, spec: Mapping, function: Optional[RuleFunction] = None) -> CompiledRule:
+    """Valida e compila uma regra declarada (ValueError se inválida)"""
+    conditions = spec.get("conditions") or {}
+    unknown = set(conditions) - CONDITION_KEYS
+    if unknown:
+        raise ValueError(f"Condições desconhecidas na regra {name}: {', '.join(sorted(unknown))}")
+    
+    rule = CompiledRule(name, None if function else _destination(spec.get("destination")), function)
+    
+    if conditions.get("extensions"):
+        rule.extensions = frozenset(
+            ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in conditions["extensions"]
+        )
+    if conditions.get("categories"):
+        rule.categories = frozenset(conditions["categories"])
+    if conditions.get("min_size_mb") is not None:
+        rule.min_size = int(float(conditions["min_size_mb"]) * BYTES_PER_MB)
+    if conditions.get("max_size_mb") is not None:
+        rule.max_size = int(float(conditions["max_size_mb"]) * BYTES_PER_MB)
+    
+    # Datas absolutas e idades relativas viram um único intervalo de mtime
+    now = time.time()
+    lower = [_timestamp(conditions["modified_after"])] if conditions.get("modified_after") is not None else []
+    upper = [_timestamp(conditions["modified_before"])] if conditions.get("modified_before") is not None else []
+    if conditions.get("max_age_days") is not None:
+        lower.append(now - float(conditions["max_age_days"]) * SECONDS_PER_DAY)
+    if conditions.get("min_age_days") is not None:
+        upper.append(now - float(conditions["min_age_days"]) * SECONDS_PER_DAY)
+    rule.min_mtime = max(lower) if lower else None
+    rule.max_mtime = min(upper) if upper else None
+    
+    patterns = conditions.get("name_pattern")
+    if patterns:
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        rule.name_regex = re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns),
+                                     re.IGNORECASE)
+    
+    return rule
+
+class RuleEngine:
+    """Regras em ordem de prioridade com despacho por (extensão, categoria); vale a primeira que casar"""
+    
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = rules
+        # (extensão, categoria) -> regras candidatas, cortadas após a primeira incondicional
+        self._dispatch: Dict[Tuple[str, str], Tuple[CompiledRule, ...]] = {}
+    
+    @classmethod
+    def from_specs(cls, specs: Mapping[str, Mapping],
+                   functions: Optional[Mapping[str, RuleFunction]] = None) -> "RuleEngine":
+        """Compila as regras salvas (nome -> especificação), ignorando as inválidas ou desativadas"""
+        functions = functions or {}
+        rules = []
+        for name, spec in specs.items():
+            if not spec.get("enabled", True):
+                continue
+            function = functions.get(name)
+            if function is None and "destination" not in spec:
+                # Regra por função de uma sessão anterior: a função não é persistida
+                continue
+            try:
+                rules.append(compile_rule(name, spec, function))
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Regra ignorada {name}: {str(e)}")
+        return cls(rules)
+    
+    def __len__(self) -> int:
+        return len(self.rules)
+    
+    def candidates(self, extension: str, category: str) -> Tuple[CompiledRule, ...]:
+        """Regras que podem casar com arquivos desta extensão e categoria"""
+        key = (extension, category)
+        candidates = self._dispatch.get(key)
+        if candidates is None:
+            selected = []
+            for rule in self.rules:
+                if rule.dispatches(extension, category):
+                    selected.append(rule)
+                    if rule.unconditional:
+                        # As seguintes nunca seriam alcançadas
+                        break
+            candidates = self._dispatch[key] = tuple(selected)
+        return candidates
+    
+    def evaluate(self, table: FileTable, rows: Iterable[int]) -> List[Optional[str]]:
+        """Pasta destino (relativa) da primeira regra que casa com cada linha, ou None"""
+        # Códigos internados da tabela -> candidatos: uma consulta por linha, sem montar strings
+        by_codes: Dict[Tuple[int, int], Tuple[CompiledRule, ...]] = {}
+        ext_codes, category_codes = table.ext_codes, table.category_codes
+        names, sizes, mtimes = table.names, table.sizes, table.mtimes
+        results: List[Optional[str]] = []
+        
+        for row in rows:
+            codes = (ext_codes[row], category_codes[row])
+            candidates = by_codes.get(codes)
+            if candidates is None:
+                candidates = by_codes[codes] = self.candidates(table.extensions[codes[0]],
+                                                               table.categories[codes[1]])
+            destination = None
+            if candidates:
+                name, size, mtime = names[row], sizes[row], mtimes[row]
+                file_info = partial(table.row, row)
+                for rule in candidates:
+                    destination = rule.match(name, size, mtime, file_info)
+                    if destination:
+                        break
+            results.append(destination)
+        
+        return results
+    
+    def match(self, file_info: Mapping) -> Optional[str]:
+        """Pasta destino (relativa) para um único file_info, ou None"""
+        for rule in self.candidates(file_info["extension"], file_info["category"]):
+            destination = rule.match(file_info["name"], file_info["size_bytes"], file_info["modified"],
+                                     lambda: file_info)
+            if destination:
+                return destination
+        return None
\ No newline at end of file
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Scanner de arquivos baseado em os.scandir para o Organizador de Arquivos
+"""
+
+import os
+from typing import List, Dict, Iterator, Iterable, Optional, Callable, Tuple
+
+from ..utils.logger import logger
+from ..utils.walker import ParallelWalker, DirectoryListing
+from ..utils.metadata_index import MetadataIndex, CachedStat
+from ..utils.cancellation import CancellationToken
+from .file_table import FileTable
+
+# Entradas processadas entre verificações de cancelamento
+CANCEL_CHECK_INTERVAL = 1024
+
+# Reclassifica em lote (caminho, stat, categoria pela extensão), ex.: leitura de bytes mágicos
+Refiner = Callable[[List[Tuple[str, os.stat_result, str]]], List[str]]
+
+class PathEntry:
+    """Entrada de arquivo a partir de um caminho, com a mesma interface usada de os.DirEntry"""
+    
+    __slots__ = ("path", "name")
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+    
+    def stat(self) -> os.stat_result:
+        return os.stat(self.path)
+    
+    def is_file(self) -> bool:
+        return os.path.isfile(self.path)
+
+class FileScanner:
+    """Scanner que lista e coleta metadados dos arquivos em uma única passada"""
+    
+    def iter_entries(self, folder_path: str,
+                     token: Optional[CancellationToken] = None) -> Iterator[os.DirEntry]:
+        """Itera sobre as entradas de arquivo regulares de uma pasta"""
+        try:
+            with os.scandir(folder_path) as entries:
+                for position, entry in enumerate(entries):
+                    if token is not None and position % CANCEL_CHECK_INTERVAL == 0 and token.cancelled:
+                        return
+                    try:
+                        # is_file() usa o tipo retornado pelo scandir, sem stat extra
+                        if entry.is_file():
+                            yield entry
+                    except OSError as e:
+                        logger.warning(f"Entrada ignorada {entry.path}: {str(e)}")
+        except OSError as e:
+            logger.error(f"Erro ao listar pasta {folder_path}", e)
+    
+    def build_records(self, dir_path: str, entries: Iterable[os.DirEntry], table: FileTable,
+                      classify: Callable[[str], str],
+                      index: Optional[MetadataIndex] = None,
+                      refine: Optional[Refiner] = None,
+                      token: Optional[CancellationToken] = None) -> range:
+        """Adiciona os arquivos de uma pasta à tabela, reclassificando só o que mudou"""
+        start = len(table)
+        for _ in self.iter_records(dir_path, entries, table, classify, index, refine, token):
+            pass
+        return range(start, len(table))
+    
+    def iter_records(self, dir_path: str, entries: Iterable[os.DirEntry], table: FileTable,
+                     classify: Callable[[str], str],
+                     index: Optional[MetadataIndex] = None,
+                     refine: Optional[Refiner] = None,
+                     token: Optional[CancellationToken] = None,
+                     chunk_size: Optional[int] = None) -> Iterator[range]:
+        """Como build_records, produzindo um intervalo a cada chunk_size arquivos da pasta"""
+        # Cada intervalo já sai reclassificado e gravado no índice; o consumidor pode descartar a
+        # tabela entre intervalos (reset). Remoções no índice só depois de ler a pasta até o fim
+        index_key = os.path.abspath(dir_path)
+        cached_rows = index.load_directory(index_key) if index is not None else {}
+        changed = []
+        changed_rows = []
+        start = len(table)
+        
+        for position, entry in enumerate(entries):
+            if token is not None and position % CANCEL_CHECK_INTERVAL == 0 and token.cancelled:
+                # Pasta incompleta: sem reclassificação nem gravação no índice (ausentes não são removidos)
+                yield range(start, len(table))
+                return
+            
+            try:
+                stat_info = entry.stat()
+            except OSError as e:
+                # Arquivo removido entre a listagem e o stat
+                logger.warning(f"Arquivo ignorado {entry.path}: {str(e)}")
+                continue
+            
+            row = cached_rows.pop(entry.name, None)
+            if row is not None and MetadataIndex.matches(row, stat_info) and row["category"]:
+                category = row["category"]
+                table.append(dir_path, entry.name, stat_info, category)
+            else:
+                category = classify(entry.name)
+                changed.append((entry.name, stat_info, category))
+                changed_rows.append(table.append(dir_path, entry.name, stat_info, category))
+            
+            if chunk_size and len(table) - start >= chunk_size:
+                self._store_chunk(dir_path, index_key, changed, changed_rows, table, index, refine)
+                yield range(start, len(table))
+                changed = []
+                changed_rows = []
+                start = len(table)
+        
+        if token is not None and token.cancelled:
+            yield range(start, len(table))
+            return
+        
+        # Linhas que sobraram no cache pertencem a arquivos que não existem mais
+        self._store_chunk(dir_path, index_key, changed, changed_rows, table, index, refine,
+                          removed_names=cached_rows.keys())
+        yield range(start, len(table))
+    
+    def _store_chunk(self, dir_path: str, index_key: str, changed: List[Tuple[str, os.stat_result, str]],
+                     changed_rows: List[int], table: FileTable, index: Optional[MetadataIndex],
+                     refine: Optional[Refiner], removed_names: Iterable[str] = ()):
+        """Reclassifica as linhas alteradas de um intervalo e as grava no índice"""
+        if refine is not None and changed:
+            changed = self._refine(dir_path, changed, changed_rows, table, refine)
+        
+        if index is not None:
+            index.store(index_key, changed, removed_names=removed_names)
+    
+    def iter_listing_records(self, listing: DirectoryListing, table: FileTable,
+                             classify: Callable[[str], str],
+                             index: Optional[MetadataIndex] = None,
+                             refine: Optional[Refiner] = None,
+                             token: Optional[CancellationToken] = None,
+                             chunk_size: Optional[int] = None) -> Iterator[range]:
+        """Adiciona à tabela os arquivos de uma listagem do walker, inclusive pastas não relistadas"""
+        if listing.cached_rows is None:
+            file_count = 0
+            for rows in self.iter_records(listing.path, listing.entries, table, classify, index, refine,
+                                          token, chunk_size):
+                file_count += len(rows)
+                yield rows
+            
+            if token is not None and token.cancelled:
+                return
+            
+            if index is not None and listing.dir_stat is not None:
+                # Impressão digital só é gravada depois das linhas de arquivos da pasta
+                index.record_directory(listing.path, listing.dir_stat,
+                                       file_count + len(listing.subdirs), listing.subdirs)
+            return
+        
+        # Pasta inalterada: linhas reconstruídas a partir do índice, sem listagem nem stat
+        changed = []
+        changed_rows = []
+        start = len(table)
+        
+        for position, (name, row) in enumerate(listing.cached_rows.items()):
+            if token is not None and position % CANCEL_CHECK_INTERVAL == 0 and token.cancelled:
+                yield range(start, len(table))
+                return
+            
+            stat_info = CachedStat.from_row(row)
+            category = row["category"]
+            
+            if category:
+                table.append(listing.path, name, stat_info, category)
+            else:
+                category = classify(name)
+                changed.append((name, stat_info, category))
+                changed_rows.append(table.append(listing.path, name, stat_info, category))
+            
+            if chunk_size and len(table) - start >= chunk_size:
+                self._store_chunk(listing.path, listing.path, changed, changed_rows, table, index, refine)
+                yield range(start, len(table))
+                changed = []
+                changed_rows = []
+                start = len(table)
+        
+        self._store_chunk(listing.path, listing.path, changed, changed_rows, table, index, refine)
+        yield range(start, len(table))
+    
+    def _refine(self, dir_path: str, changed: List[Tuple[str, os.stat_result, str]],
+                rows: List[int], table: FileTable, refine: Refiner) -> List[Tuple[str, os.stat_result, str]]:
+        """Aplica a reclassificação em lote às linhas recém-classificadas de uma pasta"""
+        categories = refine([(os.path.join(dir_path, name), stat_info, category)
+                             for name, stat_info, category in changed])
+        
+        for row, category in zip(rows, categories):
+            table.category_codes[row] = table.categories.code(category)
+        
+        return [(name, stat_info, category)
+                for (name, stat_info, _), category in zip(changed, categories)]
+    
+    def scan(self, folder_path: str, table: FileTable, classify: Callable[[str], str],
+             index: Optional[MetadataIndex] = None,
+             refine: Optional[Refiner] = None,
+             token: Optional[CancellationToken] = None,
+             directories: Optional[Dict[str, int]] = None,
+             chunk_size: Optional[int] = None) -> Iterator[range]:
+        """Preenche a tabela com os arquivos da pasta (apenas nível superior)"""
+        # Intervalos de até chunk_size linhas saem durante a listagem: uma pasta plana enorme
+        # não precisa ser listada inteira antes do primeiro lote
+        if directories is not None:
+            # mtime antes da listagem: alterações durante a listagem invalidam o snapshot
+            try:
+                directories[folder_path] = os.stat(folder_path).st_mtime_ns
+            except OSError:
+                pass
+        
+        yield from self.iter_records(folder_path, self.iter_entries(folder_path, token), table, classify,
+                                     index, refine, token, chunk_size)
+        
+        if index is not None:
+            index.flush()
+    
+    def scan_paths(self, file_paths: Iterable[str], table: FileTable, classify: Callable[[str], str],
+                   refine: Optional[Refiner] = None) -> range:
+        """Adiciona à tabela apenas os arquivos informados, agrupados por pasta"""
+        # Sem índice: os demais arquivos da pasta não foram listados e não podem ser dados como removidos
+        by_folder: Dict[str, List[PathEntry]] = {}
+        for file_path in file_paths:
+            entry = PathEntry(os.path.abspath(file_path))
+            by_folder.setdefault(os.path.dirname(entry.path), []).append(entry)
+        
+        start = len(table)
+        for dir_path, entries in by_folder.items():
+            self.build_records(dir_path, entries, table, classify, refine=refine)
+        
+        return range(start, len(table))
+    
+    def scan_tree(self, folder_path: str, table: FileTable, classify: Callable[[str], str],
+                  max_depth: Optional[int] = None, max_workers: int = 8,
+                  index: Optional[MetadataIndex] = None,
+                  skip_unchanged: bool = False,
+                  refine: Optional[Refiner] = None,
+                  token: Optional[CancellationToken] = None,
+                  directories: Optional[Dict[str, int]] = None,
+                  include_hidden: bool = False,
+                  chunk_size: Optional[int] = None) -> Iterator[range]:
+        """Preenche a tabela com toda a árvore usando o percurso paralelo (intervalos por pasta)"""
+        # directories recebe o mtime (ns) de cada pasta listada, para validar snapshots da varredura;
+        # pastas com mais de chunk_size arquivos saem em vários intervalos
+        fingerprints = index if skip_unchanged else None
+        walker = ParallelWalker(max_workers=max_workers, max_depth=max_depth, fingerprints=fingerprints,
+                                stat_dirs=directories is not None, include_hidden=include_hidden)
+        
+        for listing in walker.walk(folder_path, token):
+            if directories is not None and listing.dir_mtime_ns is not None:
+                directories[listing.path] = listing.dir_mtime_ns
+            yield from self.iter_listing_records(listing, table, classify, index, refine, token, chunk_size)
+        
+        if index is not None:
+            index.flush()
+        
+        if fingerprints is not None:
+            logger.info(f"Pastas listadas: {walker.listed_dirs}, "
+                        f"inalteradas (reaproveitadas do índice): {walker.skipped_dirs}")
+    
+    def scan_folder(self, folder_path: str, classify: Callable[[str], str],
+                    recursive: bool = False, max_depth: Optional[int] = None,
+                    max_workers: int = 8, index: Optional[MetadataIndex] = None,
+                    skip_unchanged: bool = False, refine: Optional[Refiner] = None) -> FileTable:
+        """Retorna a tabela com os arquivos da pasta"""
+        table = FileTable()
+        
+        if recursive:
+            spans = self.scan_tree(folder_path, table, classify, max_depth, max_workers, index,
+                                   skip_unchanged, refine)
+        else:
+            spans = self.scan(folder_path, table, classify, index, refine)
+        
+        for _ in spans:
+            pass
+        
+        return table
+
+# Instância global do scanner
+file_scanner = FileScanner()
\ No newline at end of file
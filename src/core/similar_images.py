@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Agrupamento de imagens quase idênticas (rajadas, cópias redimensionadas) por hash perceptual
+"""
+
+import os
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from ..utils.logger import logger
+from ..utils.cancellation import CancellationToken
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
+# Lado do hash (8 -> 64 bits)
+HASH_SIZE = 8
+
+# Imagens enviadas a cada processo de trabalho por vez
+HASH_CHUNKSIZE = 64
+
+# (posição no plano, caminho, data de modificação) de uma imagem candidata
+ImageCandidate = Tuple[int, str, float]
+
+def dhash(path: str, hash_size: int = HASH_SIZE) -> Optional[int]:
+    """Hash de diferenças: compara pixels vizinhos de uma miniatura em tons de cinza"""
+    try:
+        with Image.open(path) as image:
+            # JPEG: decodifica já reduzido (1/2 a 1/8), sem carregar a foto inteira
+            image.draft("L", (hash_size * 4, hash_size * 4))
+            thumbnail = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+            # Um byte por pixel no modo L (getdata está obsoleto no Pillow 12)
+            pixels = thumbnail.tobytes()
+    except Exception:
+        return None
+    
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+def hamming(a: int, b: int) -> int:
+    """Bits diferentes entre dois hashes"""
+    return bin(a ^ b).count("1")
+
+class MultiIndexHamming:
+    """Busca por raio na distância de Hamming com tabelas por parte do hash (multi-index hashing)"""
+    
+    # Dois hashes a até r bits de distância diferem em no máximo r // PARTS bits em alguma das
+    # partes (casa dos pombos): basta procurar cada parte e suas variações nesse raio menor
+    PARTS = 3
+    
+    def __init__(self, radius: int, bits: int = HASH_SIZE * HASH_SIZE):
+        self.radius = radius
+        self.part_radius = radius // self.PARTS
+        step = -(-bits // self.PARTS)
+        # (deslocamento, máscara) de cada parte
+        self.parts = [(shift, (1 << min(step, bits - shift)) - 1) for shift in range(0, bits, step)]
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.parts]
+        self._variations = [self._flip_masks(mask.bit_length(), self.part_radius) for _, mask in self.parts]
+    
+    @staticmethod
+    def _flip_masks(width: int, radius: int) -> List[int]:
+        """Máscaras XOR com até radius bits ligados em width bits"""
+        masks = [0]
+        for count in range(1, radius + 1):
+            masks.extend(sum(1 << bit for bit in bits) for bits in combinations(range(width), count))
+        return masks
+    
+    def add(self, value: int):
+        """Insere um hash (valores repetidos devem ser inseridos uma única vez)"""
+        for (shift, mask), table in zip(self.parts, self.tables):
+            table.setdefault((value >> shift) & mask, []).append(value)
+    
+    def search(self, value: int) -> List[int]:
+        """Hashes inseridos a no máximo radius bits de value"""
+        results = set()
+        for (shift, mask), table, variations in zip(self.parts, self.tables, self._variations):
+            part = (value >> shift) & mask
+            for flip in variations:
+                for candidate in table.get(part ^ flip, ()):
+                    if candidate not in results and hamming(value, candidate) <= self.radius:
+                        results.add(candidate)
+        return list(results)
+
+class SimilarImageFinder:
+    """Calcula dHash em processos paralelos e agrupa imagens a poucos bits de distância"""
+    
+    def __init__(self, max_distance: int = 5, workers: Optional[int] = None):
+        self.max_distance = max_distance
+        self.workers = workers
+    
+    @property
+    def available(self) -> bool:
+        return PIL_AVAILABLE
+    
+    def find(self, candidates: Iterable[ImageCandidate],
+             token: Optional[CancellationToken] = None) -> List[List[ImageCandidate]]:
+        """Grupos de imagens semelhantes (mais antiga primeiro); vazio sem Pillow"""
+        if not PIL_AVAILABLE:
+            logger.warning("Pillow não instalado: agrupamento de imagens semelhantes ignorado")
+            return []
+        
+        candidates = list(candidates)
+        if len(candidates) < 2:
+            return []
+        
+        hashes = self._hash_all([path for _, path, _ in candidates], token)
+        
+        # Hashes iguais (rajadas, cópias) entram uma única vez no índice
+        by_hash: Dict[int, List[ImageCandidate]] = {}
+        for candidate, value in zip(candidates, hashes):
+            if value is not None:
+                by_hash.setdefault(value, []).append(candidate)
+        
+        # Ligação simples: cada hash se junta aos vizinhos já inseridos (union-find)
+        parent: Dict[int, int] = {}
+        
+        def find_root(value: int) -> int:
+            root = value
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while value != root:
+                parent[value], value = root, parent[value]
+            return root
+        
+        index = MultiIndexHamming(self.max_distance)
+        for value in by_hash:
+            if token is not None and token.cancelled:
+                break
+            root = find_root(value)
+            for neighbour in index.search(value):
+                neighbour_root = find_root(neighbour)
+                if neighbour_root != root:
+                    parent[neighbour_root] = root
+            index.add(value)
+        
+        clusters: Dict[int, List[ImageCandidate]] = {}
+        for value, members in by_hash.items():
+            clusters.setdefault(find_root(value), []).extend(members)
+        
+        groups = [sorted(members, key=lambda candidate: (candidate[2], candidate[1]))
+                  for members in clusters.values() if len(members) > 1]
+        logger.debug(f"Imagens semelhantes: {len(candidates)} imagens, {len(by_hash)} hashes distintos, "
+                     f"{len(groups)} grupos")
+        return groups
+    
+    def _hash_all(self, paths: List[str], token: Optional[CancellationToken]) -> List[Optional[int]]:
+        """dHash de cada caminho (None se não for possível abrir), em paralelo"""
+        hashes: List[Optional[int]] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for value in pool.map(dhash, paths, chunksize=HASH_CHUNKSIZE):
+                hashes.append(value)
+                if token is not None and token.cancelled:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+        # Imagens não processadas por cancelamento ficam sem hash
+        hashes.extend([None] * (len(paths) - len(hashes)))
+        return hashes
+    
+    @staticmethod
+    def group_folder_name(path: str) -> str:
+        """Subpasta compartilhada pelo grupo, nomeada pela imagem mais antiga"""
+        return f"{os.path.splitext(os.path.basename(path))[0]} (semelhantes)"
+
+# Instância global do agrupador de imagens semelhantes
+similar_image_finder = SimilarImageFinder()
\ No newline at end of file
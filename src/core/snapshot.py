@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshots da varredura por pasta, para refazer filtros e plano sem listar a pasta de novo
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Iterator, Hashable, Set
+
+from ..utils.logger import logger
+from ..utils.metadata_index import MetadataIndex
+from ..utils.cancellation import CancellationToken
+from .file_table import FileTable
+
+# Linhas do snapshot entregues por vez na reanálise (equivalente aos intervalos do scanner)
+REPLAY_SPAN = 4096
+
+class ScanSnapshot:
+    """Tabela de uma varredura completa e o mtime (ns) de cada pasta antes de ser listada"""
+    
+    __slots__ = ("table", "directories")
+    
+    def __init__(self, table: FileTable, directories: Dict[str, int]):
+        self.table = table
+        self.directories = directories
+    
+    def is_current(self) -> bool:
+        """Nenhuma pasta recebeu, perdeu ou renomeou arquivos desde a varredura"""
+        # Só um stat por pasta: alterações de conteúdo que não mexem na pasta não são percebidas
+        for dir_path, mtime_ns in self.directories.items():
+            try:
+                if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+class ScanSnapshotCache:
+    """Últimas varreduras completas por chave (pasta, recursão, profundidade, classificação)"""
+    
+    def __init__(self, max_entries: int = 2):
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[Hashable, ScanSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, columns: Optional[Set[str]] = None) -> Optional[FileTable]:
+        """Tabela da última varredura se todas as pastas continuam com o mesmo mtime e ela tem as colunas"""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+        
+        if columns is not None and not columns <= snapshot.table.columns:
+            # Filtros novos precisam de colunas que a varredura não guardou (ex.: flags de
+            # HiddenFileFilter): reaproveitar custaria um stat por arquivo, varrer de novo sai mais barato
+            logger.debug(f"Snapshot da varredura sem as colunas {sorted(columns - snapshot.table.columns)}")
+            return None
+        
+        if not snapshot.is_current():
+            logger.debug(f"Snapshot da varredura desatualizado: {key[0] if isinstance(key, tuple) else key}")
+            self.discard(snapshot.table)
+            return None
+        
+        with self._lock:
+            if key in self._snapshots:
+                self._snapshots.move_to_end(key)
+        return snapshot.table
+    
+    def put(self, key: Hashable, table: FileTable, directories: Dict[str, int], started_ns: int):
+        """Guarda uma varredura completa (as que não podem ser validadas com segurança são ignoradas)"""
+        if self.max_entries <= 0 or not directories:
+            return
+        
+        # Pastas alteradas pouco antes da varredura: uma nova alteração no mesmo tique do relógio
+        # do sistema de arquivos não mudaria o mtime (mesma proteção das impressões digitais)
+        guard = started_ns - MetadataIndex.FINGERPRINT_GUARD_NS
+        if any(mtime_ns > guard for mtime_ns in directories.values()):
+            return
+        
+        with self._lock:
+            self._snapshots[key] = ScanSnapshot(table, directories)
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+    
+    def discard(self, table: FileTable):
+        """Remove os snapshots de uma tabela (ex.: antes de ela ser reaproveitada)"""
+        with self._lock:
+            for key in [key for key, snapshot in self._snapshots.items() if snapshot.table is table]:
+                del self._snapshots[key]
+    
+    def clear(self):
+        """Descarta todos os snapshots (ex.: depois de mover arquivos)"""
+        with self._lock:
+            self._snapshots.clear()
+    
+    def __len__(self) -> int:
+        return len(self._snapshots)
+    
+    @staticmethod
+    def replay(table: FileTable, token: Optional[CancellationToken] = None) -> Iterator[range]:
+        """Entrega as linhas do snapshot em intervalos, como o scanner faria"""
+        for start in range(0, len(table), REPLAY_SPAN):
+            if token is not None and token.cancelled:
+                return
+            yield range(start, min(start + REPLAY_SPAN, len(table)))
+
+# Instância global do cache de snapshots
+scan_snapshots = ScanSnapshotCache()
\ No newline at end of file
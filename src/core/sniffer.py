@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Classificação por conteúdo (assinaturas de bytes) para arquivos sem extensão ou com extensão errada
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional
+
+from ..utils.logger import logger
+from ..config.settings import config
+from .categories import DEFAULT_CATEGORY
+
+# Bytes lidos do início do arquivo (o cabeçalho tar "ustar" fica no offset 257)
+HEADER_SIZE = 512
+
+# Resultados memorizados por (inode, mtime); acima do limite saem os usados há mais tempo
+CACHE_LIMIT = 200000
+
+# (offset, assinatura, categoria, forte), verificadas em ordem. Assinaturas fortes são inequívocas
+# e corrigem extensões erradas; as fracas (contêineres genéricos, scripts, texto) só classificam
+# arquivos que a extensão deixou em "Outros"
+SIGNATURES: List[Tuple[int, bytes, str, bool]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "Imagens", True),
+    (0, b"\xff\xd8\xff", "Imagens", True),
+    (0, b"GIF87a", "Imagens", True),
+    (0, b"GIF89a", "Imagens", True),
+    (0, b"II*\x00", "Imagens", True),
+    (0, b"MM\x00*", "Imagens", True),
+    (0, b"8BPS", "Imagens", True),
+    (0, b"\x00\x00\x01\x00", "Imagens", False),
+    (0, b"%PDF-", "Documentos", True),
+    (0, b"{\\rtf", "Documentos", True),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "Documentos", False),
+    (0, b"\x1a\x45\xdf\xa3", "Videos", True),
+    (0, b"FLV\x01", "Videos", True),
+    (0, b"\x00\x00\x01\xba", "Videos", False),
+    (0, b"\x00\x00\x01\xb3", "Videos", False),
+    (0, b"ID3", "Audio", True),
+    (0, b"\xff\xfb", "Audio", False),
+    (0, b"\xff\xf3", "Audio", False),
+    (0, b"\xff\xf2", "Audio", False),
+    (0, b"\xff\xf1", "Audio", False),
+    (0, b"OggS", "Audio", True),
+    (0, b"fLaC", "Audio", True),
+    (0, b"Rar!\x1a\x07", "Compactados", True),
+    (0, b"7z\xbc\xaf\x27\x1c", "Compactados", True),
+    (0, b"\xfd7zXZ\x00", "Compactados", True),
+    (0, b"\x1f\x8b", "Compactados", False),
+    (0, b"BZh", "Compactados", False),
+    (0, b"MSCF", "Compactados", False),
+    (257, b"ustar", "Compactados", True),
+    (0, b"\x7fELF", "Executaveis", True),
+    (0, b"\xcf\xfa\xed\xfe", "Executaveis", True),
+    (0, b"\xce\xfa\xed\xfe", "Executaveis", True),
+    (0, b"MZ", "Executaveis", False),
+    (0, b"#!", "Executaveis", False),
+    (0, b"OTTO", "Fontes", True),
+    (0, b"wOFF", "Fontes", True),
+    (0, b"wOF2", "Fontes", True),
+    (0, b"\x00\x01\x00\x00\x00", "Fontes", False),
+    (60, b"BOOKMOBI", "Ebooks", True),
+]
+
+# Subtipos de contêineres RIFF / IFF (bytes 8-12)
+RIFF_TYPES = {b"WEBP": "Imagens", b"AVI ": "Videos", b"WAVE": "Audio"}
+IFF_TYPES = {b"AIFF": "Audio", b"AIFC": "Audio"}
+
+# Marcas ISO-BMFF (caixa "ftyp") que não são vídeo
+FTYP_BRANDS = {b"M4A ": "Audio", b"M4B ": "Audio", b"heic": "Imagens", b"heix": "Imagens",
+               b"mif1": "Imagens", b"avif": "Imagens"}
+
+def detect_category(header: bytes) -> Tuple[Optional[str], bool]:
+    """(categoria, assinatura forte) pelo cabeçalho; categoria None se desconhecida"""
+    if header[:4] == b"RIFF":
+        return RIFF_TYPES.get(header[8:12]), True
+    if header[:4] == b"FORM":
+        return IFF_TYPES.get(header[8:12]), True
+    if header[4:8] == b"ftyp":
+        return FTYP_BRANDS.get(header[8:12], "Videos"), True
+    if header[:4] == b"PK\x03\x04":
+        return _detect_zip(header)
+    
+    for offset, signature, category, strong in SIGNATURES:
+        if header.startswith(signature, offset):
+            return category, strong
+    
+    # Formatos de texto: marcação e código
+    text = header.lstrip(b"\xef\xbb\xbf \t\r\n")[:64].lower()
+    if text.startswith((b"<?xml", b"<!doctype html", b"<html", b"<svg")):
+        return ("Imagens" if b"<svg" in header.lower() else "Codigo"), False
+    
+    if is_text(header):
+        return "Documentos", False
+    
+    return None, False
+
+def _detect_zip(header: bytes) -> Tuple[str, bool]:
+    """Contêineres ZIP: o nome da primeira entrada identifica EPUB, OpenDocument e Office Open XML"""
+    if b"mimetypeapplication/epub+zip" in header:
+        return "Ebooks", True
+    if b"mimetypeapplication/vnd.oasis.opendocument" in header:
+        return "Documentos", True
+    if any(marker in header for marker in (b"[Content_Types].xml", b"word/", b"xl/", b"ppt/")):
+        return "Documentos", True
+    return "Compactados", False
+
+def is_text(header: bytes) -> bool:
+    """Cabeçalho parece texto (UTF-8 sem bytes nulos)"""
+    if not header or b"\x00" in header:
+        return False
+    try:
+        header.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Caractere multibyte cortado no limite do cabeçalho
+        return e.start >= len(header) - 3
+    return True
+
+class ContentSniffer:
+    """Classificador por bytes mágicos com pool de leitura e cache por (inode, mtime)"""
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        # None: sniff_workers da configuração, lido ao criar o pool (não na importação do módulo)
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[Optional[str], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        if hasattr(os, "register_at_fork"):
+            # As threads do pool não sobrevivem ao fork
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                max_workers = self.max_workers or max(1, config.get("sniff_workers", 4))
+                self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sniffer")
+            return self._executor
+    
+    def sniff(self, path: str) -> Tuple[Optional[str], bool]:
+        """Lê o cabeçalho do arquivo e retorna (categoria detectada, assinatura forte)"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+        except OSError as e:
+            logger.debug(f"Não foi possível ler cabeçalho de {path}: {str(e)}")
+            return None, False
+        
+        return detect_category(header)
+    
+    def refine(self, items: List[Tuple[str, os.stat_result, str]], verify_all: bool = False) -> List[str]:
+        """Recalcula categorias de (caminho, stat, categoria pela extensão) lendo o conteúdo"""
+        # Sem verify_all só arquivos em "Outros" são lidos; com ele, assinaturas binárias
+        # também corrigem extensões erradas
+        categories = [category for _, _, category in items]
+        pending = []
+        
+        for position, (path, stat_info, category) in enumerate(items):
+            if not verify_all and category != DEFAULT_CATEGORY:
+                continue
+            if stat_info.st_size == 0:
+                continue
+            
+            key = (stat_info.st_ino, stat_info.st_mtime_ns)
+            detected = self._cache.get(key)
+            if detected is not None:
+                self._cache.move_to_end(key)
+                categories[position] = self._merge(category, detected)
+            else:
+                pending.append((position, path, key))
+        
+        if not pending:
+            return categories
+        
+        if len(pending) == 1:
+            results = [self.sniff(pending[0][1])]
+        else:
+            results = self._pool().map(self.sniff, [path for _, path, _ in pending])
+        
+        for (position, _, key), detected in zip(pending, results):
+            self._cache[key] = detected
+            categories[position] = self._merge(categories[position], detected)
+        
+        while len(self._cache) > CACHE_LIMIT:
+            self._cache.popitem(last=False)
+        
+        return categories
+    
+    @staticmethod
+    def _merge(category: str, detected: Tuple[Optional[str], bool]) -> str:
+        """Extensões conhecidas só são corrigidas por assinaturas fortes (ex.: ".py" com shebang continua Codigo)"""
+        detected_category, strong = detected
+        if detected_category is None:
+            return category
+        if category != DEFAULT_CATEGORY and not strong:
+            return category
+        return detected_category
+    
+    def shutdown(self):
+        """Encerra o pool de leitura"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+# Instância global do classificador por conteúdo
+content_sniffer = ContentSniffer()
\ No newline at end of file
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento temporário em disco para análises acima do orçamento de memória
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import mimetypes
+import weakref
+from collections.abc import Sequence
+from typing import List, Dict, Iterator, Optional, Set, Tuple, Any
+
+from ..utils.logger import logger
+from .file_table import FileTable, FileRowList, StringPool, BYTES_PER_MB, FLAG_HIDDEN, FLAG_READONLY
+from .plan import OrganizationPlan, PlanView, DestinationNames, CompactRecord, build_compact
+
+# Linhas lidas do disco por consulta ao percorrer o armazenamento
+FETCH_SIZE = 5000
+
+# Colunas de arquivos gravadas (na ordem das consultas)
+FILE_COLUMNS = "dir_id, name, ext, category, size, mtime, ctime, atime, mode, flags"
+
+class SpillStore:
+    """Arquivos selecionados e movimentações planejadas já retirados da memória (SQLite temporário)"""
+    
+    def __init__(self, directory: Optional[str] = None):
+        fd, self.path = tempfile.mkstemp(prefix="organizador_spill_", suffix=".db", dir=directory)
+        os.close(fd)
+        
+        # Dados descartáveis: sem journal nem fsync
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=OFF")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.executescript("""
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY, dir_id INTEGER, name TEXT, ext TEXT, category TEXT,
+                size INTEGER, mtime REAL, ctime REAL, atime REAL, mode INTEGER, flags INTEGER
+            );
+            CREATE TABLE moves (
+                position INTEGER PRIMARY KEY, file_id INTEGER, dest_dir_id INTEGER, final_name TEXT
+            );
+            CREATE TABLE names (
+                dir_id INTEGER, name TEXT, PRIMARY KEY (dir_id, name)
+            ) WITHOUT ROWID;
+        """)
+        # A escrita ocorre na thread da análise e a leitura pode vir da interface
+        self._lock = threading.Lock()
+        
+        # Pastas (origem e destino) continuam internadas em memória: são poucas perto dos arquivos
+        self.dirs = StringPool()
+        self.file_count = 0
+        self.move_count = 0
+        self._mime_cache: Dict[str, Optional[str]] = {}
+        
+        self._finalizer = weakref.finalize(self, SpillStore._remove, self._connection, self.path)
+    
+    @staticmethod
+    def _remove(connection: sqlite3.Connection, path: str):
+        connection.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def close(self):
+        """Fecha e remove o arquivo temporário"""
+        self._finalizer()
+    
+    def spill(self, table: FileTable, selected: Sequence, plan: OrganizationPlan):
+        """Grava as linhas selecionadas e o plano do segmento atual (a tabela pode então ser esvaziada)"""
+        file_ids: Dict[int, int] = {}
+        files = []
+        columns = table.columns
+        
+        for row in selected:
+            file_id = file_ids[row] = self.file_count + len(files)
+            files.append((
+                file_id, self.dirs.code(table.dir_path(row)), table.names[row], table.extension(row),
+                table.category(row), table.sizes[row], table.mtimes[row],
+                table.ctimes[row] if "ctimes" in columns else None,
+                table.atimes[row] if "atimes" in columns else None,
+                table.modes[row] if "modes" in columns else None,
+                table.flags[row] if "flags" in columns else None
+            ))
+        
+        moves = [
+            (self.move_count + position, file_ids[plan.rows[position]],
+             self.dirs.code(plan.dest_folder(position)), plan.renames.get(position))
+            for position in range(len(plan))
+        ]
+        
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT INTO files (id, {FILE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", files)
+                self._connection.executemany(
+                    "INSERT INTO moves (position, file_id, dest_dir_id, final_name) VALUES (?, ?, ?, ?)", moves)
+        
+        self.file_count += len(files)
+        self.move_count += len(moves)
+        logger.debug(f"Análise gravada em disco: {len(files)} arquivos e {len(moves)} movimentações "
+                     f"(total {self.file_count}/{self.move_count})")
+    
+    def add_names(self, taken: Dict[str, Set[str]]):
+        """Grava nomes ocupados (normalizados) por pasta destino"""
+        rows = [(self.dirs.code(dest_folder), name) for dest_folder, names in taken.items() for name in names]
+        with self._lock:
+            with self._connection:
+                self._connection.executemany("INSERT OR IGNORE INTO names (dir_id, name) VALUES (?, ?)", rows)
+    
+    def has_name(self, dest_folder: str, name: str) -> bool:
+        """Indica se o nome (normalizado) foi gravado como ocupado na pasta destino"""
+        dir_id = self.dirs.codes.get(dest_folder)
+        if dir_id is None:
+            return False
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM names WHERE dir_id = ? AND name = ?",
+                                            (dir_id, name)).fetchone() is not None
+    
+    def redirect(self, position: int, dest_folder: str, names: DestinationNames):
+        """Troca a pasta destino de uma movimentação gravada, reservando nela um nome livre"""
+        with self._lock:
+            (name,) = self._connection.execute(
+                "SELECT f.name FROM moves m JOIN files f ON f.id = m.file_id WHERE m.position = ?",
+                (position,)).fetchone()
+        # Fora do lock: a reserva pode consultar os nomes gravados neste mesmo armazenamento
+        final_name = names.reserve(dest_folder, name)
+        with self._lock:
+            with self._connection:
+                self._connection.execute("UPDATE moves SET dest_dir_id = ?, final_name = ? WHERE position = ?",
+                                         (self.dirs.code(dest_folder), final_name if final_name != name else None,
+                                          position))
+    
+    def _fetch(self, query: str, start: int, stop: int) -> Iterator[Tuple]:
+        """Percorre um intervalo de ids em consultas de até FETCH_SIZE linhas"""
+        for chunk_start in range(start, stop, FETCH_SIZE):
+            with self._lock:
+                records = self._connection.execute(query, (chunk_start, min(chunk_start + FETCH_SIZE, stop))).fetchall()
+            yield from records
+    
+    def _file_info(self, record: Tuple) -> Dict:
+        """Dicionário com as chaves de get_file_info a partir de uma linha gravada"""
+        dir_id, name, extension, category, size, mtime, ctime, atime, mode, flags = record
+        path = os.path.join(self.dirs[dir_id], name)
+        
+        if None in (ctime, atime, mode, flags):
+            # Coluna não declarada na análise: obtida com um novo stat, como na FileTable
+            try:
+                stat_info = os.stat(path)
+                ctime = stat_info.st_ctime if ctime is None else ctime
+                atime = stat_info.st_atime if atime is None else atime
+                mode = stat_info.st_mode if mode is None else mode
+                if flags is None:
+                    flags = FileTable._flags(name, stat_info)
+            except OSError:
+                pass
+        
+        if extension not in self._mime_cache:
+            self._mime_cache[extension] = mimetypes.guess_type(name)[0]
+        
+        return {
+            "name": name,
+            "path": path,
+            "size_bytes": size,
+            "size_mb": size / BYTES_PER_MB,
+            "extension": extension,
+            "mime_type": self._mime_cache[extension],
+            "created": ctime,
+            "modified": mtime,
+            "accessed": atime,
+            "is_hidden": bool(flags & FLAG_HIDDEN) if flags is not None else None,
+            "is_readonly": bool(flags & FLAG_READONLY) if flags is not None else None,
+            "permissions": oct(mode)[-3:] if mode is not None else None,
+            "category": category
+        }
+    
+    def _entry(self, record: Tuple) -> Dict:
+        """Sugestão de organização (chaves de PlanEntry) a partir de uma movimentação gravada"""
+        dest_dir_id, final_name = record[:2]
+        file_info = self._file_info(record[2:])
+        dest_folder = self.dirs[dest_dir_id]
+        final_name = final_name or file_info["name"]
+        return {
+            "source": file_info["path"],
+            "destination": os.path.join(dest_folder, final_name),
+            "source_name": file_info["name"],
+            "final_name": final_name,
+            "category": file_info["category"],
+            "dest_folder": dest_folder,
+            "dest_folder_name": os.path.basename(dest_folder),
+            "size_mb": file_info["size_mb"],
+            "file_info": file_info
+        }
+    
+    def iter_files(self, start: int, stop: int) -> Iterator[Dict]:
+        """Arquivos gravados com id em [start, stop)"""
+        query = f"SELECT {FILE_COLUMNS} FROM files WHERE id >= ? AND id < ? ORDER BY id"
+        for record in self._fetch(query, start, stop):
+            yield self._file_info(record)
+    
+    def iter_entries(self, start: int, stop: int) -> Iterator[Dict]:
+        """Sugestões gravadas com posição em [start, stop)"""
+        query = (f"SELECT m.dest_dir_id, m.final_name, {', '.join('f.' + c for c in FILE_COLUMNS.split(', '))} "
+                 "FROM moves m JOIN files f ON f.id = m.file_id "
+                 "WHERE m.position >= ? AND m.position < ? ORDER BY m.position")
+        for record in self._fetch(query, start, stop):
+            yield self._entry(record)
+    
+    def iter_compact(self, start: int, stop: int) -> Iterator[CompactRecord]:
+        """Movimentações gravadas no formato de build_compact, sem montar dicionários"""
+        query = ("SELECT f.dir_id, f.name, m.dest_dir_id, m.final_name "
+                 "FROM moves m JOIN files f ON f.id = m.file_id "
+                 "WHERE m.position >= ? AND m.position < ? ORDER BY m.position")
+        dirs = self.dirs
+        for dir_id, name, dest_dir_id, final_name in self._fetch(query, start, stop):
+            yield dirs[dir_id], name, dirs[dest_dir_id], final_name
+    
+    def iter_moves(self, start: int, stop: int) -> Iterator[Tuple[str, str]]:
+        """(origem, destino) das movimentações gravadas"""
+        for source_dir, name, dest_folder, final_name in self.iter_compact(start, stop):
+            yield os.path.join(source_dir, name), os.path.join(dest_folder, final_name or name)
+
+class SpilledPlan(Sequence):
+    """Plano de organização com o início em disco (SpillStore) e o segmento atual em memória"""
+    
+    def __init__(self, store: SpillStore, tail: OrganizationPlan):
+        self.store = store
+        self.spilled = store.move_count
+        self.tail = tail
+    
+    def __len__(self) -> int:
+        return self.spilled + len(self.tail)
+    
+    @property
+    def names(self) -> DestinationNames:
+        return self.tail.names
+    
+    @property
+    def root(self) -> Optional[str]:
+        return self.tail.root
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return PlanView(self, range(len(self))[position])
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        if position < self.spilled:
+            return next(self.store.iter_entries(position, position + 1))
+        return self.tail[position - self.spilled]
+    
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.store.iter_entries(0, self.spilled)
+        yield from self.tail
+    
+    def redirect(self, position: int, dest_folder: str):
+        """Troca a pasta destino de uma entrada (em disco ou em memória)"""
+        if position < self.spilled:
+            self.store.redirect(position, dest_folder, self.tail.names)
+        else:
+            self.tail.redirect(position - self.spilled, dest_folder)
+    
+    def view(self, start: int, stop: Optional[int] = None) -> PlanView:
+        """Visão de um intervalo do plano (ex.: o lote recém-planejado)"""
+        return PlanView(self, range(start, len(self) if stop is None else stop))
+    
+    def _split(self, positions: Optional[range]) -> Tuple[range, range]:
+        """Divide um intervalo contíguo entre a parte em disco e a parte em memória (posições locais)"""
+        if positions is None:
+            positions = range(len(self))
+        if positions.step != 1:
+            raise ValueError("Intervalos com passo não são suportados no plano gravado em disco")
+        spilled = range(min(positions.start, self.spilled), min(positions.stop, self.spilled))
+        tail = range(max(positions.start, self.spilled) - self.spilled,
+                     max(positions.stop, self.spilled) - self.spilled)
+        return spilled, tail
+    
+    def iter_moves(self, positions: Optional[range] = None) -> Iterator[Tuple[str, str]]:
+        """Itera sobre (origem, destino) lendo o disco em blocos"""
+        spilled, tail = self._split(positions)
+        yield from self.store.iter_moves(spilled.start, spilled.stop)
+        yield from self.tail.iter_moves(tail)
+    
+    def iter_compact(self, positions: Optional[range] = None) -> Iterator[CompactRecord]:
+        spilled, tail = self._split(positions)
+        yield from self.store.iter_compact(spilled.start, spilled.stop)
+        yield from self.tail.iter_compact(tail)
+    
+    def to_compact(self, positions: Optional[range] = None) -> Dict:
+        """Forma serializável compacta: cada pasta aparece uma única vez"""
+        return build_compact(self.iter_compact(positions))
+    
+    def to_dicts(self, positions: Optional[range] = None) -> List[Dict]:
+        spilled, tail = self._split(positions)
+        return list(self.store.iter_entries(spilled.start, spilled.stop)) + self.tail.to_dicts(tail)
+
+class SpilledRows(Sequence):
+    """Arquivos selecionados da análise: os gravados em disco seguidos das linhas ainda em memória"""
+    
+    def __init__(self, store: SpillStore, tail: FileRowList):
+        self.store = store
+        self.spilled = store.file_count
+        self.tail = tail
+    
+    def __len__(self) -> int:
+        return self.spilled + len(self.tail)
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(len(self))[position]]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        if position < self.spilled:
+            return next(self.store.iter_files(position, position + 1))
+        return self.tail[position - self.spilled]
+    
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.store.iter_files(0, self.spilled)
+        yield from self.tail
+    
+    def to_dicts(self) -> List[Dict]:
+        return list(self.store.iter_files(0, self.spilled)) + self.tail.to_dicts()
\ No newline at end of file
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Modos de organização por modelo de caminho (ex.: {category}/{year}/{month}), compilados uma única vez
+"""
+
+import os
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from string import Formatter
+from typing import List, Dict, Optional, Mapping, Tuple
+
+from .file_table import BYTES_PER_MB
+
+# Campos aceitos nos modelos
+TEMPLATE_FIELDS = frozenset({"category", "ext", "year", "month", "day", "size_class", "initial"})
+
+DATE_FIELDS = ("year", "month", "day")
+
+# Modos fixos expressos como modelos
+BUILTIN_TEMPLATES = {
+    "por_tipo": "{category}",
+    "por_data": "{year}-{month}",
+    "por_nome": "{initial}"
+}
+
+# Pasta usada por modos desconhecidos
+DEFAULT_TEMPLATE = "Organizados"
+
+# Classes de tamanho: limites inferiores (bytes) e nomes das pastas
+SIZE_BOUNDS = (1, BYTES_PER_MB, 100 * BYTES_PER_MB, 1024 * BYTES_PER_MB)
+SIZE_CLASSES = ("Vazios", "Pequenos", "Médios", "Grandes", "Enormes")
+
+NO_EXTENSION = "sem_extensao"
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Dias memorizados antes de a memória de datas ser descartada
+DATE_CACHE_LIMIT = 65536
+
+class PathTemplate:
+    """Modelo compilado: a pasta de cada combinação de valores é montada uma única vez"""
+    
+    def __init__(self, template: str):
+        self.template = template
+        self.segments = self._parse(template)
+        fields = {field for _, segment_fields in self.segments for field in segment_fields}
+        self.fields = frozenset(fields)
+        
+        self._category = "category" in fields
+        self._ext = "ext" in fields
+        self._initial = "initial" in fields
+        self._size = "size_class" in fields
+        self._date_fields = tuple(field for field in DATE_FIELDS if field in fields)
+        
+        # Chave (só com os valores usados pelo modelo) -> pasta relativa
+        self._folders: Dict[Tuple, str] = {}
+        # Dia UTC -> [(fim do trecho, código dos valores de data usados pelo modelo)]: um dia UTC
+        # cobre no máximo duas ou três datas locais, qualquer que seja o fuso ou o horário de verão.
+        # Códigos inteiros mantêm a chave das pastas rápida de comparar
+        self._dates: Dict[int, List[Tuple[float, int]]] = {}
+        self._date_codes: Dict[Tuple[str, ...], int] = {}
+        self._date_values: List[Tuple[str, ...]] = []
+    
+    @staticmethod
+    def _parse(template: str) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Segmentos do caminho com seus campos (ValueError se o modelo for inválido)"""
+        if not isinstance(template, str) or not template.strip():
+            raise ValueError("Modelo de pasta vazio")
+        if template.startswith(("/", "\\")) or os.path.isabs(template):
+            raise ValueError(f"Modelo de pasta deve ser relativo: {template}")
+        
+        segments = []
+        for segment in template.replace("\\", "/").split("/"):
+            if not segment:
+                continue
+            if segment.strip() in (".", ".."):
+                raise ValueError(f"Modelo de pasta inválido: {template}")
+            
+            fields = []
+            for _, field, spec, conversion in Formatter().parse(segment):
+                if field is None:
+                    continue
+                if field not in TEMPLATE_FIELDS:
+                    raise ValueError(f"Campo desconhecido no modelo {template}: {{{field}}} "
+                                     f"(aceitos: {', '.join(sorted(TEMPLATE_FIELDS))})")
+                if spec or conversion:
+                    raise ValueError(f"Formatação não suportada no modelo {template}: {{{field}}}")
+                fields.append(field)
+            segments.append((segment, tuple(fields)))
+        
+        if not segments:
+            raise ValueError(f"Modelo de pasta inválido: {template}")
+        return segments
+    
+    def folder(self, name: str, extension: str, category: str, mtime: float, size: int) -> str:
+        """Pasta destino relativa de um arquivo"""
+        date_code = None
+        if self._date_fields:
+            day = int(mtime // SECONDS_PER_DAY)
+            spans = self._dates.get(day)
+            if spans is None:
+                spans = self._date_spans(day)
+            for end, date_code in spans:
+                if mtime < end:
+                    break
+        
+        key = (category if self._category else None,
+               extension if self._ext else None,
+               name[:1] if self._initial else None,
+               bisect_right(SIZE_BOUNDS, size) if self._size else None,
+               date_code)
+        
+        folder = self._folders.get(key)
+        if folder is None:
+            folder = self._folders[key] = self._render(key)
+        return folder
+    
+    def _date_spans(self, day: int) -> List[Tuple[float, int]]:
+        """Trechos de um dia UTC com a mesma data local e seus valores (ano, mês, dia usados pelo modelo)"""
+        if len(self._dates) >= DATE_CACHE_LIMIT:
+            self._dates.clear()
+        
+        spans = []
+        start = day * SECONDS_PER_DAY
+        stop = start + SECONDS_PER_DAY
+        while start < stop:
+            local = time.localtime(start)
+            values = {"year": str(local.tm_year), "month": f"{local.tm_mon:02d}", "day": f"{local.tm_mday:02d}"}
+            # Próxima meia-noite local (mktime normaliza o dia e resolve o horário de verão)
+            midnight = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+            end = min(midnight, stop) if midnight > start else stop
+            dates = tuple(values[field] for field in self._date_fields)
+            code = self._date_codes.get(dates)
+            if code is None:
+                code = self._date_codes[dates] = len(self._date_values)
+                self._date_values.append(dates)
+            spans.append((end, code))
+            start = end
+        
+        self._dates[day] = spans
+        return spans
+    
+    def _render(self, key: Tuple) -> str:
+        """Monta a pasta relativa de uma chave"""
+        category, extension, initial, size_index, date_code = key
+        values = {}
+        if self._category:
+            values["category"] = category
+        if self._ext:
+            values["ext"] = extension.lstrip(".").lower() or NO_EXTENSION
+        if self._initial:
+            first_char = initial.upper()
+            values["initial"] = first_char if first_char.isalpha() else "#"
+        if self._size:
+            values["size_class"] = SIZE_CLASSES[size_index]
+        if date_code is not None:
+            values.update(zip(self._date_fields, self._date_values[date_code]))
+        
+        parts = []
+        for segment, fields in self.segments:
+            # Separadores vindos dos valores não criam subpastas
+            part = segment.format(**{field: _safe(values[field]) for field in fields}).strip()
+            parts.append(part if part not in ("", ".", "..") else "_")
+        return os.path.join(*parts)
+
+def _safe(value: str) -> str:
+    """Valor de campo sem separadores de pasta"""
+    return value.replace("/", "_").replace("\\", "_")
+
+@lru_cache(maxsize=64)
+def compile_template(template: str) -> PathTemplate:
+    """Modelo compilado (memorizado: análises seguintes reaproveitam as pastas já montadas)"""
+    return PathTemplate(template)
+
+def mode_template(mode: str, templates: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """Modelo de um modo: fixo, nomeado na configuração ou o próprio modo se contiver campos"""
+    template = BUILTIN_TEMPLATES.get(mode)
+    if template is None and templates:
+        template = templates.get(mode)
+    if template is None and "{" in mode:
+        template = mode
+    return template
+
+def template_for_mode(mode: str, templates: Optional[Mapping[str, str]] = None) -> PathTemplate:
+    """Modelo compilado de um modo (modos desconhecidos vão para a pasta padrão)"""
+    return compile_template(mode_template(mode, templates) or DEFAULT_TEMPLATE)
\ No newline at end of file
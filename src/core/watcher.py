@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Modo de observação contínua: organiza arquivos conforme chegam às pastas monitoradas
+"""
+
+import os
+import time
+import threading
+from typing import List, Dict, Optional, NamedTuple
+
+from ..utils.logger import logger
+from ..utils.backup import backup_manager
+from ..utils.inotify import create_watcher
+from ..config.settings import config
+from .organizer import organizer
+
+# Arquivos ainda sendo baixados/gravados por navegadores e clientes de download
+PARTIAL_SUFFIXES = (".part", ".partial", ".crdownload", ".download", ".opdownload",
+                    ".tmp", ".!ut", ".!qb", ".aria2")
+PARTIAL_PREFIXES = (".~lock.", "~$", ".goutputstream")
+
+class PendingFile(NamedTuple):
+    """Arquivo aguardando estabilizar antes de ser organizado"""
+    folder: str
+    size: int
+    mtime_ns: int
+    # Última vez (monotônico) em que houve evento ou mudança de tamanho/mtime
+    changed_at: float
+
+class FolderWatcher:
+    """Observa pastas (inotify ou varredura) e organiza arquivos novos em micro-lotes"""
+    
+    def __init__(self, folders: Optional[List[str]] = None, organization_mode: Optional[str] = None,
+                 debounce: Optional[float] = None, batch_size: Optional[int] = None,
+                 create_backup: Optional[bool] = None):
+        self.folders = [os.path.abspath(folder) for folder in (folders or config.get("watch_folders", []))]
+        self.organization_mode = organization_mode or config.get("default_organization_mode", "por_tipo")
+        # Segundos sem eventos nem mudança de tamanho para considerar o arquivo completo
+        self.debounce = debounce if debounce is not None else config.get("watch_debounce_seconds", 2.0)
+        self.batch_size = batch_size or config.get("watch_batch_size", 200)
+        self.create_backup = create_backup if create_backup is not None else config.get("auto_backup", True)
+        
+        self._pending: Dict[str, PendingFile] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_ns = 0
+        # Um backup por pasta e por sessão de observação, ao qual cada micro-lote acrescenta suas
+        # movimentações: lotes frequentes não giram para fora os backups das organizações manuais
+        self._backup_ids: Dict[str, str] = {}
+        
+        self.stats = {"batches": 0, "organized_files": 0, "errors": 0}
+    
+    @staticmethod
+    def is_partial(name: str) -> bool:
+        """Arquivo temporário de download ou de edição em andamento"""
+        lower = name.lower()
+        return lower.endswith(PARTIAL_SUFFIXES) or lower.startswith(PARTIAL_PREFIXES)
+    
+    def _observe(self, folder: str, name: str, now: float):
+        """Registra atividade em um arquivo; o debounce recomeça a cada evento"""
+        if self.is_partial(name):
+            return
+        
+        path = os.path.join(folder, name)
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        
+        if not os.path.isfile(path):
+            return
+        
+        self._pending[path] = PendingFile(folder, stat_info.st_size, stat_info.st_mtime_ns, now)
+    
+    def _rescan(self, folder: str, now: float):
+        """Após perda de eventos, considera os arquivos alterados desde o início da observação"""
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and entry.stat().st_mtime_ns >= self._started_ns:
+                            self._observe(folder, entry.name, now)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Erro ao varrer pasta observada {folder}: {str(e)}")
+    
+    def _collect_ready(self, now: float) -> Dict[str, List[str]]:
+        """Retira da espera os arquivos estáveis, agrupados por pasta observada"""
+        ready: Dict[str, List[str]] = {}
+        
+        for path, pending in list(self._pending.items()):
+            if now - pending.changed_at < self.debounce:
+                continue
+            
+            try:
+                stat_info = os.stat(path)
+            except OSError:
+                # Removido ou renomeado antes de estabilizar
+                del self._pending[path]
+                continue
+            
+            if (stat_info.st_size, stat_info.st_mtime_ns) != (pending.size, pending.mtime_ns):
+                # Ainda crescendo sem gerar eventos (ex.: gravação por mmap): aguardar outro ciclo
+                self._pending[path] = PendingFile(pending.folder, stat_info.st_size, stat_info.st_mtime_ns, now)
+                continue
+            
+            del self._pending[path]
+            ready.setdefault(pending.folder, []).append(path)
+        
+        return ready
+    
+    def _organize(self, folder: str, paths: List[str]):
+        """Planeja e executa a organização de um micro-lote"""
+        analysis = organizer.plan_files(folder, paths, self.organization_mode)
+        if not analysis["success"]:
+            self.stats["errors"] += 1
+            return
+        
+        if not analysis["suggestions"]:
+            return
+        
+        backup_id = self._backup_id(folder) if self.create_backup else None
+        result = organizer.execute_organization(analysis["suggestions"], create_backup=False, backup_id=backup_id)
+        
+        if result.get("busy"):
+            # Outra organização em curso (ex.: pela interface): tentar de novo no próximo ciclo
+            now = time.monotonic()
+            for path in paths:
+                self._observe(folder, os.path.basename(path), now)
+            return
+        
+        self.stats["batches"] += 1
+        self.stats["organized_files"] += result.get("stats", {}).get("moved_files", 0)
+        if not result.get("success"):
+            self.stats["errors"] += 1
+    
+    def _backup_id(self, folder: str) -> Optional[str]:
+        """Backup da sessão para a pasta, criado no primeiro micro-lote"""
+        backup_id = self._backup_ids.get(folder)
+        if backup_id is None:
+            backup_id = backup_manager.create_backup({
+                "type": "watch",
+                "source_folder": folder,
+                "mode": self.organization_mode,
+                "journal": True
+            })
+            if backup_id:
+                self._backup_ids[folder] = backup_id
+        return backup_id
+    
+    def run(self):
+        """Laço principal de observação (bloqueia até stop())"""
+        if not self.folders:
+            logger.warning("Nenhuma pasta configurada para observação")
+            return
+        
+        watcher = create_watcher(config.get("watch_poll_interval", 5.0))
+        self._started_ns = time.time_ns()
+        self._backup_ids = {}
+        
+        try:
+            for folder in self.folders:
+                watcher.add(folder)
+            logger.info(f"👀 Observando {len(self.folders)} pasta(s) com {type(watcher).__name__}")
+            
+            while not self._stop.is_set():
+                events = watcher.read(timeout=min(1.0, max(self.debounce / 2, 0.1)))
+                now = time.monotonic()
+                
+                for folder, name in events:
+                    if name is None:
+                        self._rescan(folder, now)
+                    else:
+                        self._observe(folder, name, now)
+                
+                for folder, paths in self._collect_ready(now).items():
+                    for start in range(0, len(paths), self.batch_size):
+                        if self._stop.is_set():
+                            break
+                        self._organize(folder, paths[start:start + self.batch_size])
+        
+        except Exception as e:
+            logger.error("Erro no modo de observação", e)
+        
+        finally:
+            watcher.close()
+            logger.info(f"Observação encerrada: {self.stats['organized_files']} arquivos organizados "
+                        f"em {self.stats['batches']} lotes")
+    
+    def start(self):
+        """Inicia a observação em uma thread em segundo plano"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Solicita o fim da observação e aguarda a thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
\ No newline at end of file
@@ -13,8 +13,11 @@ import json
 
 from ..core.organizer import organizer
 from ..core.filters import filter_manager, SizeFilter, DateFilter, ExtensionFilter
+from ..core.templates import compile_template
 from ..utils.logger import logger
 from ..utils.backup import backup_manager
+from ..utils.cancellation import CancellationToken
+from ..utils.events import EventBatch
 from ..config.settings import config, THEMES
 
 class AdvancedOrganizerGUI:
@@ -32,6 +35,7 @@ class AdvancedOrganizerGUI:
         self.current_analysis = None
         self.current_suggestions = []
         self.is_analyzing = False
+        self.analysis_token: Optional[CancellationToken] = None
         self.is_organizing = False
         
         # Carregar configurações
@@ -67,6 +71,7 @@ class AdvancedOrganizerGUI:
         self.organization_mode = tk.StringVar(value="por_tipo")
         self.auto_backup = tk.BooleanVar(value=True)
         self.show_preview = tk.BooleanVar(value=True)
+        self.recursive_scan = tk.BooleanVar(value=False)
         self.current_theme = tk.StringVar(value="claro")
         
         # Variáveis de progresso
@@ -238,6 +243,8 @@ class AdvancedOrganizerGUI:
                        variable=self.auto_backup).pack(anchor="w")
         ttk.Checkbutton(options_frame, text="👁️ Mostrar preview antes de aplicar", 
                        variable=self.show_preview).pack(anchor="w")
+        ttk.Checkbutton(options_frame, text="🌳 Incluir subpastas", 
+                       variable=self.recursive_scan).pack(anchor="w")
         
         # Botões de ação
         actions_frame = ttk.Frame(parent)
@@ -443,8 +450,8 @@ class AdvancedOrganizerGUI:
     
     def setup_callbacks(self):
         """Configura callbacks do organizador"""
-        organizer.set_progress_callback(self.update_progress)
-        organizer.set_log_callback(self.add_log)
+        # Eventos chegam agrupados (até progress_rate_hz por segundo) e são aplicados na thread do Tk
+        organizer.events.subscribe(lambda batch: self.root.after(0, self._apply_events, batch))
     
     # Métodos de interface
     def select_folder(self):
@@ -470,6 +477,7 @@ class AdvancedOrganizerGUI:
             return
         
         self.is_analyzing = True
+        self.analysis_token = CancellationToken()
         self.update_buttons_state()
         
         # Executar análise em thread separada
@@ -482,20 +490,51 @@ class AdvancedOrganizerGUI:
         try:
             self.status_var.set("Analisando...")
             
-            result = organizer.analyze_folder(
-                self.selected_folder.get(),
-                self.organization_mode.get()
-            )
+            self.current_analysis = None
+            self.current_suggestions = []
+            self.root.after(0, self._clear_results_table)
             
-            if result["success"]:
-                self.current_analysis = result
-                self.current_suggestions = result["suggestions"]
+            # Consumir a análise em lotes para exibir resultados antes do fim do scan
+            for batch in organizer.iter_analysis(
+                self.selected_folder.get(),
+                self.organization_mode.get(),
+                recursive=self.recursive_scan.get(),
+                token=self.analysis_token
+            ):
+                if not batch["success"]:
+                    error = batch.get("error") or batch.get("errors") or "Erro desconhecido"
+                    self.root.after(0, lambda: self._show_error("Erro na análise", str(error)))
+                    return
                 
-                # Atualizar interface na thread principal
-                self.root.after(0, self._update_analysis_results)
-            else:
-                self.root.after(0, lambda: self._show_error("Erro na análise", 
-                                                           result.get("error", "Erro desconhecido")))
+                # O plano compacto cresce a cada lote; os lotes são apenas visões dele
+                self.current_suggestions = batch["plan"]
+                
+                if batch["suggestions"]:
+                    # Valores montados aqui: acima do orçamento de memória, a visão do lote deixa de
+                    # ser válida assim que o próximo lote é produzido
+                    rows = [self._result_values(suggestion) for suggestion in batch["suggestions"]]
+                    self.root.after(0, lambda rows=rows: self._append_results(rows))
+                
+                if batch["done"]:
+                    self.current_analysis = {
+                        "success": True,
+                        "folder": self.selected_folder.get(),
+                        "mode": self.organization_mode.get(),
+                        "suggestions": batch["plan"],
+                        "stats": batch["stats"],
+                        "files_info": batch["all_files_info"],
+                        "duplicates": batch["duplicates"],
+                        "similar_images": batch["similar_images"],
+                        "partial": batch["partial"]
+                    }
+                    
+                    if batch["similar_images"] and batch["similar_images"]["groups"]:
+                        # Imagens agrupadas mudaram de destino depois de exibidas
+                        rows = [self._result_values(suggestion) for suggestion in batch["plan"]]
+                        self.root.after(0, lambda rows=rows: self._replace_results(rows))
+            
+            # Atualizar interface na thread principal
+            self.root.after(0, self._update_analysis_results)
         
         except Exception as e:
             self.root.after(0, lambda: self._show_error("Erro na análise", str(e)))
@@ -509,38 +548,56 @@ class AdvancedOrganizerGUI:
         if not self.current_analysis:
             return
         
-        # Atualizar tabela de resultados
-        self.update_results_table()
-        
         # Atualizar estatísticas
         self.update_stats_display()
         
         # Atualizar status
         total_files = len(self.current_suggestions)
-        self.status_var.set(f"Análise concluída: {total_files} arquivos")
         self.progress_var.set(0)
         
         # Habilitar botões
         self.preview_button.configure(state="normal")
         self.organize_button.configure(state="normal")
         
-        self.log(f"✅ Análise concluída: {total_files} arquivos encontrados")
+        if self.current_analysis.get("partial"):
+            self.status_var.set(f"Análise interrompida: {total_files} arquivos (resultado parcial)")
+            self.log(f"⏹️ Análise interrompida: {total_files} arquivos analisados até o cancelamento")
+        else:
+            self.status_var.set(f"Análise concluída: {total_files} arquivos")
+            self.log(f"✅ Análise concluída: {total_files} arquivos encontrados")
     
     def update_results_table(self):
         """Atualiza tabela de resultados"""
-        # Limpar tabela
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        self._clear_results_table()
         
         # Adicionar resultados
-        for suggestion in self.current_suggestions:
-            self.results_tree.insert("", "end", values=(
-                suggestion["source_name"],
-                suggestion["category"],
-                suggestion["final_name"],
-                suggestion["dest_folder_name"],
-                f"{suggestion['size_mb']:.2f}"
-            ))
+        self._append_results([self._result_values(suggestion) for suggestion in self.current_suggestions])
+    
+    def _clear_results_table(self):
+        """Limpa tabela de resultados"""
+        for item in self.results_tree.get_children():
+            self.results_tree.delete(item)
+    
+    @staticmethod
+    def _result_values(suggestion: Dict) -> tuple:
+        """Colunas da tabela de resultados para uma sugestão"""
+        return (
+            suggestion["source_name"],
+            suggestion["category"],
+            suggestion["final_name"],
+            suggestion["dest_folder_name"],
+            f"{suggestion['size_mb']:.2f}"
+        )
+    
+    def _replace_results(self, rows: List[tuple]):
+        """Substitui todas as linhas da tabela de resultados"""
+        self._clear_results_table()
+        self._append_results(rows)
+    
+    def _append_results(self, rows: List[tuple]):
+        """Acrescenta linhas (valores de _result_values) à tabela de resultados"""
+        for values in rows:
+            self.results_tree.insert("", "end", values=values)
     
     def update_stats_display(self):
         """Atualiza exibição de estatísticas"""
@@ -572,6 +629,11 @@ class AdvancedOrganizerGUI:
             smallest = stats["smallest_file"]
             stats_text += f"\n📉 Menor arquivo: {smallest['name']} ({smallest['size_mb']:.2f} MB)"
         
+        duplicates = self.current_analysis.get("duplicates")
+        if duplicates and duplicates["duplicate_files"]:
+            stats_text += (f"\n🔁 Duplicatas: {duplicates['duplicate_files']} arquivos em "
+                           f"{len(duplicates['groups'])} grupos ({duplicates['wasted_mb']:.2f} MB repetidos)")
+        
         # Atualizar widget de texto
         self.stats_text.configure(state="normal")
         self.stats_text.delete(1.0, tk.END)
@@ -603,7 +665,8 @@ class AdvancedOrganizerGUI:
             
             result = organizer.execute_organization(
                 self.current_suggestions,
-                self.auto_backup.get()
+                self.auto_backup.get(),
+                duplicates=self.current_analysis.get("duplicates") if self.current_analysis else None
             )
             
             if result["success"]:
@@ -671,6 +734,8 @@ Deseja continuar?
     def cancel_operation(self):
         """Cancela operação em andamento"""
         if self.is_analyzing or self.is_organizing:
+            if self.is_analyzing and self.analysis_token is not None:
+                self.analysis_token.cancel()
             organizer.cancel_operation()
             self.status_var.set("Cancelando...")
     
@@ -700,6 +765,22 @@ Deseja continuar?
         if message:
             self.operation_var.set(message)
     
+    def _apply_events(self, batch: EventBatch):
+        """Aplica um lote de eventos do organizador: um único insert no log e o progresso mais recente"""
+        if batch.logs or batch.dropped_logs:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            lines = [f"[{timestamp}] {message}\n" for message, _ in batch.logs]
+            if batch.dropped_logs:
+                lines.insert(0, f"[{timestamp}] ... {batch.dropped_logs} mensagens omitidas\n")
+            
+            self.logs_text.configure(state="normal")
+            self.logs_text.insert(tk.END, "".join(lines))
+            self.logs_text.see(tk.END)
+            self.logs_text.configure(state="disabled")
+        
+        if batch.progress:
+            self.update_progress(*batch.progress)
+    
     def add_log(self, message: str):
         """Adiciona mensagem ao log"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -792,7 +873,7 @@ Deseja continuar?
     # Métodos de exportação e backup
     def export_results(self):
         """Exporta resultados para arquivo"""
-        if not self.current_suggestions:
+        if not self.current_suggestions or not self.current_analysis:
             messagebox.showwarning("Aviso", "Nenhum resultado para exportar!")
             return
         
@@ -806,16 +887,29 @@ Deseja continuar?
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
                     json.dump({
-                        "analysis": self.current_analysis,
-                        "suggestions": self.current_suggestions,
+                        "analysis": {
+                            "stats": self.current_analysis["stats"],
+                            "files_info": self.current_analysis["files_info"]
+                        },
+                        # Plano compacto: cada pasta aparece uma única vez na exportação
+                        "plan": self.current_suggestions.to_compact(),
                         "export_date": datetime.now().isoformat()
-                    }, f, indent=2, ensure_ascii=False)
+                    }, f, indent=2, ensure_ascii=False, default=self._json_default)
                 
                 messagebox.showinfo("Sucesso", f"Resultados exportados para {filename}")
                 
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao exportar: {str(e)}")
     
+    @staticmethod
+    def _json_default(obj):
+        """Converte visões da tabela colunar em estruturas serializáveis"""
+        if hasattr(obj, "to_dict"):
+            return obj.to_dict()
+        if hasattr(obj, "to_dicts"):
+            return obj.to_dicts()
+        raise TypeError(f"Objeto não serializável: {type(obj).__name__}")
+    
     def refresh_results(self):
         """Atualiza exibição de resultados"""
         self.update_results_table()
@@ -946,6 +1040,7 @@ Deseja continuar?
             # Carregar outras configurações
             self.auto_backup.set(config.get("auto_backup", True))
             self.show_preview.set(config.get("show_preview", True))
+            self.recursive_scan.set(config.get("recursive_scan", False))
             
             # Atualizar filtros
             self.update_filters_display()
@@ -963,6 +1058,7 @@ Deseja continuar?
             config.set("theme", self.current_theme.get())
             config.set("auto_backup", self.auto_backup.get())
             config.set("show_preview", self.show_preview.get())
+            config.set("recursive_scan", self.recursive_scan.get())
             config.save()
             
         except Exception as e:
@@ -1073,16 +1169,32 @@ class HelpDialog:
 
 class CustomModeDialog:
     def __init__(self, parent):
-        # Implementação simplificada
-        messagebox.showinfo("Modo Personalizado", "Modo personalizado em desenvolvimento")
+        # O modo "personalizado" é um modelo de caminho salvo em organization_templates
+        templates = config.get("organization_templates", {})
+        template = simpledialog.askstring(
+            "Modo Personalizado",
+            "Modelo de pastas (campos: {category}, {ext}, {year}, {month}, {day}, {size_class}, {initial})\n"
+            "Ex.: {category}/{year}/{month}",
+            initialvalue=templates.get("personalizado", "{category}/{year}/{month}"),
+            parent=parent
+        )
+        if not template:
+            return
+        
+        try:
+            compile_template(template)
+        except ValueError as e:
+            messagebox.showerror("Modelo inválido", str(e), parent=parent)
+            return
+        
+        templates["personalizado"] = template
+        config.set("organization_templates", templates)
 
 class PreviewDialog:
     def __init__(self, parent, analysis):
-        # Implementação simplificada
-        preview = organizer.preview_organization(
-            analysis["suggestions"][0]["source"] if analysis["suggestions"] else "",
-            "por_tipo"
-        )
+        # A análise exibida é reaproveitada: o preview não varre a pasta de novo
+        preview = organizer.preview_organization(analysis.get("folder", ""), analysis.get("mode", "por_tipo"),
+                                                 analysis=analysis)
         
         if preview["success"]:
             structure = preview["preview_structure"]
@@ -11,9 +11,21 @@ __description__ = "Utilitários para logging, backup e validação"
 from .logger import OrganizadorLogger, logger
 from .backup import BackupManager, backup_manager
 from .validator import FileValidator, OperationValidator, file_validator, operation_validator
+from .walker import ParallelWalker, DirectoryListing
+from .metadata_index import MetadataIndex, CachedStat, metadata_index
+from .inotify import InotifyWatcher, PollingWatcher, create_watcher
+from .cancellation import CancellationToken
+from .events import EventBus, EventBatch
+from .fsops import move_file, RENAMEAT2_AVAILABLE
 
 __all__ = [
     "OrganizadorLogger", "logger",
     "BackupManager", "backup_manager",
-    "FileValidator", "OperationValidator", "file_validator", "operation_validator"
+    "FileValidator", "OperationValidator", "file_validator", "operation_validator",
+    "ParallelWalker", "DirectoryListing",
+    "MetadataIndex", "CachedStat", "metadata_index",
+    "InotifyWatcher", "PollingWatcher", "create_watcher",
+    "CancellationToken",
+    "EventBus", "EventBatch",
+    "move_file", "RENAMEAT2_AVAILABLE"
 ]
\ No newline at end of file
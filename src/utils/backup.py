@@ -3,22 +3,23 @@
 Sistema de backup automático para o Organizador de Arquivos
 """
 
+import os
 import json
-import shutil
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Tuple
 import threading
 import time
 
 from .logger import logger
+from .fsops import move_file
 
 class BackupManager:
     """Gerenciador de backups automáticos"""
     
     def __init__(self, backup_dir: Optional[Path] = None):
-        self.backup_dir = backup_dir or Path(__file__).parent.parent.parent / "config" / "backups"
+        self.backup_dir = backup_dir or Path(__file__).parent.parent / "config" / "backups"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
         # Arquivo de índice de backups
@@ -50,21 +51,41 @@ class BackupManager:
             backup_name = f"backup_{timestamp}.json"
             backup_path = self.backup_dir / backup_name
             
+            # Vários backups no mesmo segundo (ex.: micro-lotes do modo de observação)
+            counter = 1
+            base_timestamp = timestamp
+            while backup_path.exists():
+                timestamp = f"{base_timestamp}_{counter}"
+                backup_name = f"backup_{timestamp}.json"
+                backup_path = self.backup_dir / backup_name
+                counter += 1
+            
             # Dados do backup
             backup_data = {
                 "timestamp": timestamp,
                 "datetime": datetime.now().isoformat(),
                 "operation_type": operation_data.get("type", "unknown"),
                 "source_folder": operation_data.get("source_folder"),
-                "files_moved": operation_data.get("files_moved", []),
                 "organization_mode": operation_data.get("mode"),
-                "total_files": len(operation_data.get("files_moved", [])),
-                "backup_version": "2.0"
             }
             
+            if operation_data.get("journal"):
+                # Movimentações registradas à medida que acontecem (append_moves), no formato compacto,
+                # em backup_<id>.jsonl: só entra o que de fato foi movido, com o nome final real
+                backup_data["journal"] = f"backup_{timestamp}.jsonl"
+                backup_data["total_files"] = 0
+                backup_data["backup_version"] = "2.2"
+                indent = None
+                (self.backup_dir / backup_data["journal"]).touch()
+            else:
+                backup_data["files_moved"] = operation_data.get("files_moved", [])
+                backup_data["total_files"] = len(backup_data["files_moved"])
+                backup_data["backup_version"] = "2.0"
+                indent = 2
+            
             # Salvar backup
             with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
+                json.dump(backup_data, f, indent=indent, ensure_ascii=False)
             
             # Atualizar índice
             self.backups_index["backups"].append({
@@ -89,6 +110,38 @@ class BackupManager:
             logger.error("Erro ao criar backup", e)
             return None
     
+    def append_moves(self, backup_id: str, plan: Dict) -> bool:
+        """Acrescenta ao diário do backup um bloco de movimentações concluídas (plano compacto)"""
+        if not plan.get("moves"):
+            return True
+        try:
+            with open(self.backup_dir / f"backup_{backup_id}.jsonl", 'a', encoding='utf-8') as f:
+                f.write(json.dumps(plan, ensure_ascii=False) + "\n")
+                f.flush()
+                # O diário é a única forma de desfazer o que já foi movido: gravado antes de seguir
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao registrar movimentações no backup {backup_id}", e)
+            return False
+    
+    def add_total(self, backup_id: str, moved_files: int):
+        """Soma ao total do backup (e do índice) os arquivos efetivamente movidos por uma execução"""
+        backup_file = self.backup_dir / f"backup_{backup_id}.json"
+        try:
+            with open(backup_file, 'r', encoding='utf-8') as f:
+                backup_data = json.load(f)
+            backup_data["total_files"] = backup_data.get("total_files", 0) + moved_files
+            with open(backup_file, 'w', encoding='utf-8') as f:
+                json.dump(backup_data, f, ensure_ascii=False)
+            
+            for backup in self.backups_index["backups"]:
+                if backup.get("id") == backup_id:
+                    backup["total_files"] = backup_data["total_files"]
+            self._save_index()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar o total do backup {backup_id}", e)
+    
     def restore_backup(self, backup_id: str) -> bool:
         """Restaura um backup específico"""
         try:
@@ -102,7 +155,9 @@ class BackupManager:
             with open(backup_file, 'r', encoding='utf-8') as f:
                 backup_data = json.load(f)
             
-            files_moved = backup_data.get("files_moved", [])
+            files_moved = list(self._iter_moves(backup_data))
+            if backup_data.get("journal"):
+                files_moved.extend(self._iter_journal(self.backup_dir / backup_data["journal"]))
             
             logger.operation_start("Restauração de Backup", {
                 "backup_id": backup_id,
@@ -113,23 +168,23 @@ class BackupManager:
             restored_count = 0
             errors = []
             
-            for file_info in files_moved:
+            for source, destination in files_moved:
                 try:
-                    current_path = Path(file_info["destination"])
-                    original_path = Path(file_info["source"])
+                    current_path = Path(destination)
+                    original_path = Path(source)
                     
                     if current_path.exists():
                         # Criar diretório original se necessário
                         original_path.parent.mkdir(parents=True, exist_ok=True)
                         
-                        # Mover arquivo de volta
-                        shutil.move(str(current_path), str(original_path))
+                        # Mover arquivo de volta (sem sobrescrever o que tiver surgido no lugar original)
+                        move_file(str(current_path), str(original_path))
                         restored_count += 1
                         
                         logger.file_operation("RESTAURADO", str(current_path), str(original_path))
                     
                 except Exception as e:
-                    error_msg = f"Erro ao restaurar {file_info.get('source', 'arquivo')}: {str(e)}"
+                    error_msg = f"Erro ao restaurar {source}: {str(e)}"
                     errors.append(error_msg)
                     logger.error(error_msg)
             
@@ -150,6 +205,37 @@ class BackupManager:
             logger.error("Erro ao restaurar backup", e, {"backup_id": backup_id})
             return False
     
+    @staticmethod
+    def _iter_moves(backup_data: Dict) -> Iterator[Tuple[str, str]]:
+        """Itera sobre (origem, destino) da lista files_moved de backups sem diário"""
+        for file_info in backup_data.get("files_moved", []):
+            yield file_info["source"], file_info["destination"]
+    
+    @staticmethod
+    def _iter_compact(plan: Dict) -> Iterator[Tuple[str, str]]:
+        """Itera sobre (origem, destino) de um plano compacto"""
+        source_dirs = plan["source_dirs"]
+        dest_dirs = plan["dest_dirs"]
+        for move in plan["moves"]:
+            source_name = move[1]
+            final_name = move[3] if len(move) > 3 else source_name
+            yield (os.path.join(source_dirs[move[0]], source_name),
+                   os.path.join(dest_dirs[move[2]], final_name))
+    
+    @staticmethod
+    def _iter_journal(journal_file: Path) -> Iterator[Tuple[str, str]]:
+        """Itera sobre (origem, destino) dos blocos do diário (uma linha parcial no fim é ignorada)"""
+        if not journal_file.exists():
+            return
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    plan = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Linha incompleta ignorada no diário {journal_file.name}")
+                    continue
+                yield from BackupManager._iter_compact(plan)
+    
     def _cleanup_empty_folders(self, base_folder: str):
         """Remove pastas vazias após restauração"""
         try:
@@ -183,6 +269,9 @@ class BackupManager:
             
             if backup_file.exists():
                 backup_file.unlink()
+                journal_file = self.backup_dir / f"backup_{backup_id}.jsonl"
+                if journal_file.exists():
+                    journal_file.unlink()
                 
                 # Remover do índice
                 self.backups_index["backups"] = [
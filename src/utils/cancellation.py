@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Cancelamento cooperativo com prazo opcional para operações longas
+"""
+
+import time
+import threading
+from typing import Optional
+
+class CancellationToken:
+    """Sinal compartilhado entre quem pede o cancelamento e as etapas que o verificam"""
+    
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None):
+        self._event = threading.Event()
+        # Prazo em time.monotonic(); timeout é relativo ao momento da criação
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+        self.deadline = deadline
+        # "cancelled" (pedido explícito) ou "deadline" (prazo esgotado)
+        self.reason: Optional[str] = None
+    
+    def cancel(self, reason: str = "cancelled"):
+        """Solicita o cancelamento; o primeiro motivo registrado prevalece"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Cancelado explicitamente ou com prazo esgotado"""
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+            return True
+        return False
+    
+    def remaining(self) -> Optional[float]:
+        """Segundos até o prazo (None sem prazo)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
\ No newline at end of file
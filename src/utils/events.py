@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Barramento de eventos de progresso com entrega agrupada em taxa limitada
+"""
+
+import threading
+from collections import deque
+from typing import List, Dict, Optional, Callable, Tuple, NamedTuple, Deque
+
+from .logger import logger
+
+# Mensagens de log aguardando entrega antes de as mais antigas serem descartadas
+MAX_PENDING_LOGS = 5000
+
+class EventBatch(NamedTuple):
+    """Eventos acumulados desde a última entrega"""
+    # Último progresso (atual, total, mensagem); os intermediários são descartados
+    progress: Optional[Tuple[int, int, str]]
+    # (mensagem, nível) na ordem em que foram emitidas
+    logs: List[Tuple[str, str]]
+    # Cópia dos contadores acumulados (sempre exatos, mesmo com eventos agrupados)
+    counters: Dict[str, int]
+    # Mensagens de log descartadas por excesso desde a última entrega
+    dropped_logs: int
+
+class EventBus:
+    """Recebe eventos do worker sem bloqueá-lo e entrega lotes aos assinantes em até rate_hz por segundo"""
+    
+    def __init__(self, rate_hz: float = 20.0):
+        self.interval = 1.0 / (rate_hz if rate_hz > 0 else 20.0)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._subscribers: List[Callable[[EventBatch], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        
+        self._progress: Optional[Tuple[int, int, str]] = None
+        self._logs: Deque[Tuple[str, str]] = deque()
+        self._dropped_logs = 0
+        self._counters: Dict[str, int] = {}
+        self._dirty = False
+    
+    # Lado do worker: apenas registra o estado, nunca chama assinantes
+    
+    def progress(self, current: int, total: int, message: str = ""):
+        """Registra o progresso atual (substitui o anterior ainda não entregue)"""
+        with self._lock:
+            self._progress = (current, total, message)
+            self._dirty = True
+    
+    def log(self, message: str, level: str = "info"):
+        """Enfileira uma mensagem de log para a próxima entrega"""
+        with self._lock:
+            if len(self._logs) >= MAX_PENDING_LOGS:
+                self._logs.popleft()
+                self._dropped_logs += 1
+            self._logs.append((message, level))
+            self._dirty = True
+    
+    def increment(self, name: str, amount: int = 1):
+        """Soma ao contador exato"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            self._dirty = True
+    
+    def set_counter(self, name: str, value: int = 0):
+        """Define o valor do contador (ex.: zerar no início de uma operação)"""
+        with self._lock:
+            self._counters[name] = value
+            self._dirty = True
+    
+    def counters(self) -> Dict[str, int]:
+        """Cópia dos contadores atuais"""
+        with self._lock:
+            return dict(self._counters)
+    
+    def flush(self):
+        """Pede a entrega imediata do que estiver pendente (ex.: fim de uma operação)"""
+        self._wakeup.set()
+    
+    # Lado dos assinantes
+    
+    def subscribe(self, callback: Callable[[EventBatch], None]):
+        """Registra um assinante; as entregas ocorrem na thread do barramento"""
+        with self._lock:
+            self._subscribers.append(callback)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._dispatch_loop, daemon=True,
+                                                name="event-bus")
+                self._thread.start()
+    
+    def unsubscribe(self, callback: Callable[[EventBatch], None]):
+        """Remove um assinante"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def drain(self) -> Optional[EventBatch]:
+        """Retira os eventos pendentes (None se nada mudou desde a última entrega)"""
+        with self._lock:
+            if not self._dirty:
+                return None
+            batch = EventBatch(self._progress, list(self._logs), dict(self._counters), self._dropped_logs)
+            self._progress = None
+            self._logs.clear()
+            self._dropped_logs = 0
+            self._dirty = False
+            return batch
+    
+    def _dispatch_loop(self):
+        """Entrega lotes no máximo uma vez por intervalo enquanto houver assinantes"""
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            
+            with self._lock:
+                subscribers = list(self._subscribers)
+            if not subscribers:
+                # Eventos continuam acumulados para um futuro assinante ou drain()
+                continue
+            
+            batch = self.drain()
+            if batch is None:
+                continue
+            
+            for callback in subscribers:
+                try:
+                    callback(batch)
+                except Exception as e:
+                    logger.error("Erro em assinante do barramento de eventos", e)
\ No newline at end of file
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Movimentação atômica de arquivos sem sobrescrever o destino (renameat2 com RENAME_NOREPLACE)
+"""
+
+import os
+import sys
+import errno
+import shutil
+import ctypes
+import ctypes.util
+import platform
+from typing import Optional, Callable
+
+from .logger import logger
+
+# linux/fcntl.h e linux/fs.h
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+
+# Número da chamada de sistema renameat2 para glibc sem o wrapper (anterior à 2.28)
+SYS_RENAMEAT2 = {
+    "x86_64": 316,
+    "aarch64": 276,
+    "riscv64": 276,
+    "i386": 353,
+    "i686": 353,
+    "armv7l": 382,
+    "ppc64le": 357,
+    "s390x": 347
+}
+
+# Erros de renameat2 que indicam flag não suportada pelo kernel ou pelo sistema de arquivos
+NOREPLACE_UNSUPPORTED = frozenset({errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP})
+
+# Buffer da cópia entre dispositivos
+COPY_BUFFER = 1024 * 1024
+
+# Resultados de move_file
+RENAMED = "renamed"
+LINKED = "linked"
+COPIED = "copied"
+
+def _load_renameat2() -> Optional[Callable[[bytes, bytes, int], int]]:
+    """renameat2(AT_FDCWD, origem, AT_FDCWD, destino, flags) via ctypes, ou None se indisponível"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    
+    function = getattr(libc, "renameat2", None)
+    if function is not None:
+        function.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+        function.restype = ctypes.c_int
+        return lambda source, destination, flags: function(AT_FDCWD, source, AT_FDCWD, destination, flags)
+    
+    number = SYS_RENAMEAT2.get(platform.machine())
+    if number is None:
+        return None
+    syscall = libc.syscall
+    syscall.restype = ctypes.c_long
+    return lambda source, destination, flags: syscall(
+        ctypes.c_long(number), ctypes.c_int(AT_FDCWD), ctypes.c_char_p(source),
+        ctypes.c_int(AT_FDCWD), ctypes.c_char_p(destination), ctypes.c_uint(flags)
+    )
+
+_renameat2 = _load_renameat2()
+RENAMEAT2_AVAILABLE = _renameat2 is not None
+
+def move_file(source: str, destination: str) -> str:
+    """Move um arquivo sem sobrescrever: RENAMED, LINKED ou COPIED; FileExistsError se o destino existir"""
+    # Mesmo sistema de arquivos: uma única chamada atômica, que falha se o destino já existir
+    # (arquivo surgido depois do planejamento). Cópia só quando o kernel recusa por EXDEV
+    if _renameat2 is not None:
+        if _renameat2(os.fsencode(source), os.fsencode(destination), RENAME_NOREPLACE) == 0:
+            return RENAMED
+        error = ctypes.get_errno()
+        if error == errno.EEXIST:
+            raise FileExistsError(error, os.strerror(error), destination)
+        if error == errno.EXDEV:
+            return _copy(source, destination)
+        if error not in NOREPLACE_UNSUPPORTED:
+            raise OSError(error, os.strerror(error), source, None, destination)
+    elif os.name == "nt":
+        # No Windows os.rename já falha se o destino existir
+        try:
+            os.rename(source, destination)
+            return RENAMED
+        except FileExistsError:
+            raise
+        except OSError as e:
+            # ERROR_NOT_SAME_DEVICE: outro volume
+            if getattr(e, "winerror", None) != 17:
+                raise
+            return _copy(source, destination)
+    
+    return _link_move(source, destination)
+
+def _link_move(source: str, destination: str) -> str:
+    """Alternativa sem renameat2: hardlink (falha se o destino existir) e remoção da origem"""
+    try:
+        os.link(source, destination, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            return _copy(source, destination)
+        # Sistema de arquivos sem hardlinks (ex.: FAT): o nome é reservado com O_EXCL e substituído
+        return _reserve_and_replace(source, destination)
+    
+    try:
+        os.unlink(source)
+    except OSError:
+        os.unlink(destination)
+        raise
+    return LINKED
+
+def _reserve_and_replace(source: str, destination: str) -> str:
+    """Cria o destino vazio com O_EXCL (falha se existir) e o substitui pela origem"""
+    fd = os.open(destination, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    os.close(fd)
+    try:
+        os.replace(source, destination)
+    except OSError:
+        os.unlink(destination)
+        raise
+    return RENAMED
+
+def _copy(source: str, destination: str) -> str:
+    """Outro dispositivo: cópia para um destino criado com O_EXCL, metadados e remoção da origem"""
+    if os.path.islink(source):
+        os.symlink(os.readlink(source), destination)
+    else:
+        with open(source, 'rb') as fsrc:
+            # 'x' falha se o destino existir; a partir daqui o arquivo parcial é nosso
+            with open(destination, 'xb') as fdst:
+                try:
+                    shutil.copyfileobj(fsrc, fdst, COPY_BUFFER)
+                except BaseException:
+                    fdst.close()
+                    os.unlink(destination)
+                    raise
+        try:
+            shutil.copystat(source, destination)
+        except OSError as e:
+            logger.warning(f"Metadados não copiados para {destination}: {str(e)}")
+    
+    os.unlink(source)
+    return COPIED
\ No newline at end of file
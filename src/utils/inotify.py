@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Monitoramento de pastas via inotify (ctypes) com alternativa por varredura periódica
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import List, Dict, Tuple, Optional
+
+from .logger import logger
+
+# Máscaras de eventos (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Eventos que indicam arquivo novo ou alterado na pasta
+WATCH_MASK = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+EVENT_HEADER = struct.Struct("iIII")
+
+# (pasta, nome) de um arquivo novo/alterado; nome None pede nova varredura da pasta
+FolderEvent = Tuple[str, Optional[str]]
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """Carrega a libc com as funções do inotify, ou None se indisponível"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class InotifyWatcher:
+    """Observa pastas (sem recursão) com inotify e entrega eventos de arquivos"""
+    
+    def __init__(self):
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify indisponível nesta plataforma")
+        
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        
+        self._folders: Dict[int, str] = {}
+    
+    @staticmethod
+    def available() -> bool:
+        return _load_libc() is not None
+    
+    def add(self, folder_path: str):
+        """Passa a observar uma pasta"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder_path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), folder_path)
+        self._folders[wd] = folder_path
+    
+    def read(self, timeout: float) -> List[FolderEvent]:
+        """Aguarda até timeout segundos e retorna os eventos acumulados"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                
+                if mask & IN_Q_OVERFLOW:
+                    # Fila do kernel estourou: eventos perdidos, todas as pastas precisam de varredura
+                    logger.warning("Fila do inotify estourou; pastas serão varridas novamente")
+                    events.extend((folder, None) for folder in self._folders.values())
+                    continue
+                
+                folder = self._folders.get(wd)
+                if folder is None:
+                    continue
+                
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    logger.warning(f"Pasta observada removida ou movida: {folder}")
+                    self._folders.pop(wd, None)
+                    continue
+                
+                if name and not mask & IN_ISDIR:
+                    events.append((folder, os.fsdecode(name)))
+        
+        return events
+    
+    def close(self):
+        """Libera o descritor do inotify"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    """Alternativa sem inotify: relista a pasta apenas quando o mtime dela muda"""
+    
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._folders: Dict[str, Tuple[int, Dict[str, Tuple[int, int]]]] = {}
+        self._next_poll = 0.0
+    
+    def add(self, folder_path: str):
+        """Passa a observar uma pasta (o conteúdo atual não gera eventos)"""
+        self._folders[folder_path] = self._snapshot(folder_path)
+    
+    @staticmethod
+    def _snapshot(folder_path: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+        """(mtime da pasta, nome -> (tamanho, mtime)) dos arquivos da pasta"""
+        dir_mtime = os.stat(folder_path).st_mtime_ns
+        files = {}
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat_info = entry.stat()
+                        files[entry.name] = (stat_info.st_size, stat_info.st_mtime_ns)
+                except OSError:
+                    continue
+        return dir_mtime, files
+    
+    def read(self, timeout: float) -> List[FolderEvent]:
+        """Aguarda até timeout segundos e retorna arquivos novos desde a última varredura"""
+        delay = self._next_poll - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            if delay > timeout:
+                return []
+        self._next_poll = time.monotonic() + self.interval
+        
+        events = []
+        for folder_path, (dir_mtime, files) in list(self._folders.items()):
+            try:
+                if os.stat(folder_path).st_mtime_ns == dir_mtime:
+                    continue
+                snapshot = self._snapshot(folder_path)
+            except OSError as e:
+                logger.warning(f"Pasta observada inacessível {folder_path}: {str(e)}")
+                continue
+            
+            self._folders[folder_path] = snapshot
+            events.extend((folder_path, name) for name in snapshot[1] if name not in files)
+        
+        return events
+    
+    def close(self):
+        self._folders.clear()
+
+def create_watcher(poll_interval: float = 5.0):
+    """Cria o observador com inotify quando disponível, senão por varredura periódica"""
+    if InotifyWatcher.available():
+        try:
+            return InotifyWatcher()
+        except OSError as e:
+            logger.warning(f"inotify indisponível ({str(e)}); usando varredura periódica")
+    return PollingWatcher(poll_interval)
\ No newline at end of file
@@ -19,7 +19,7 @@ class OrganizadorLogger:
         self.logger.setLevel(logging.DEBUG)
         
         # Diretório de logs
-        self.log_dir = Path(__file__).parent.parent.parent / "config" / "logs"
+        self.log_dir = Path(__file__).parent.parent / "config" / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
         # Arquivo de log atual
@@ -51,6 +51,12 @@ class OrganizadorLogger:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
     
+    def set_console_level(self, level: int):
+        """Ajusta o nível do handler de console (o arquivo de log continua completo)"""
+        for handler in self.logger.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(level)
+    
     def info(self, message: str, extra_data: Optional[dict] = None):
         """Log de informação"""
         if extra_data:
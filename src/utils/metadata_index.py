@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Índice persistente de metadados para reanálise incremental
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Tuple, NamedTuple
+
+from .logger import logger
+
+class CachedStat(NamedTuple):
+    """Subconjunto de os.stat_result reconstruído a partir do índice"""
+    st_size: int
+    st_mtime_ns: int
+    st_ctime_ns: int
+    st_atime_ns: int
+    st_mode: int
+    st_ino: int
+    
+    @property
+    def st_mtime(self) -> float:
+        return self.st_mtime_ns / 1e9
+    
+    @property
+    def st_ctime(self) -> float:
+        return self.st_ctime_ns / 1e9
+    
+    @property
+    def st_atime(self) -> float:
+        return self.st_atime_ns / 1e9
+    
+    @classmethod
+    def from_row(cls, row: Dict) -> "CachedStat":
+        return cls(row["size"], row["mtime_ns"], row["ctime_ns"], row["atime_ns"], row["mode"], row["inode"])
+
+class MetadataIndex:
+    """Índice SQLite de arquivos já analisados, validado por (tamanho, mtime, inode)"""
+    
+    SCHEMA_VERSION = 4
+    
+    # Linhas alteradas acumuladas antes de um commit automático
+    COMMIT_INTERVAL = 10000
+    
+    # Margem para a granularidade do mtime de pastas: alterações feitas logo após
+    # a listagem podem manter o mesmo mtime, então pastas recentes não são confiáveis
+    FINGERPRINT_GUARD_NS = 2 * 10**9
+    
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or Path(__file__).parent.parent / "config" / "metadata_index.db"
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pending_changes = 0
+        
+        if hasattr(os, "register_at_fork"):
+            # Processos filhos (análise em lote) abrem a própria conexão; a herdada não é segura
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pending_changes = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão sob demanda e cria o esquema"""
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS files")
+                connection.execute("DROP TABLE IF EXISTS directories")
+                connection.execute("DROP TABLE IF EXISTS meta")
+            
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    parent TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    ctime_ns INTEGER NOT NULL,
+                    atime_ns INTEGER NOT NULL,
+                    mode INTEGER NOT NULL,
+                    category TEXT,
+                    PRIMARY KEY (parent, name)
+                ) WITHOUT ROWID
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime_ns INTEGER NOT NULL,
+                    entry_count INTEGER NOT NULL,
+                    scanned_ns INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent)")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                ) WITHOUT ROWID
+            """)
+            connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            connection.commit()
+            self._connection = connection
+        
+        return self._connection
+    
+    @staticmethod
+    def matches(row: Dict, stat_info: os.stat_result) -> bool:
+        """Verifica se a linha do índice ainda corresponde ao stat atual"""
+        return (row["size"] == stat_info.st_size and
+                row["mtime_ns"] == stat_info.st_mtime_ns and
+                row["inode"] == stat_info.st_ino)
+    
+    def load_directory(self, dir_path: str) -> Dict[str, Dict]:
+        """Carrega as linhas de uma pasta em uma única consulta (nome -> linha)"""
+        try:
+            with self._lock:
+                cursor = self._connect().execute(
+                    "SELECT name, size, mtime_ns, inode, ctime_ns, atime_ns, mode, category "
+                    "FROM files WHERE parent = ?",
+                    (dir_path,)
+                )
+                return {
+                    name: {
+                        "size": size,
+                        "mtime_ns": mtime_ns,
+                        "inode": inode,
+                        "ctime_ns": ctime_ns,
+                        "atime_ns": atime_ns,
+                        "mode": mode,
+                        "category": category
+                    }
+                    for name, size, mtime_ns, inode, ctime_ns, atime_ns, mode, category in cursor
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao consultar índice de metadados para {dir_path}", e)
+            return {}
+    
+    def store(self, dir_path: str, records: Iterable[Tuple[str, os.stat_result, Optional[str]]],
+              removed_names: Iterable[str] = ()):
+        """Grava (nome, stat, categoria) alterados de uma pasta e remove os que não existem mais"""
+        rows = [
+            (dir_path, name, stat_info.st_size, stat_info.st_mtime_ns, stat_info.st_ino,
+             stat_info.st_ctime_ns, stat_info.st_atime_ns, stat_info.st_mode, category)
+            for name, stat_info, category in records
+        ]
+        removed = [(dir_path, name) for name in removed_names]
+        
+        if not rows and not removed:
+            return
+        
+        try:
+            with self._lock:
+                connection = self._connect()
+                if rows:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                if removed:
+                    connection.executemany("DELETE FROM files WHERE parent = ? AND name = ?", removed)
+                
+                self._pending_changes += len(rows) + len(removed)
+                if self._pending_changes >= self.COMMIT_INTERVAL:
+                    connection.commit()
+                    self._pending_changes = 0
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao atualizar índice de metadados para {dir_path}", e)
+    
+    def get_unchanged_listing(self, dir_path: str, stat_info: os.stat_result) -> Optional[Tuple[Dict[str, Dict], List[str]]]:
+        """Retorna (arquivos, subpastas) do índice se a impressão digital da pasta não mudou"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                fingerprint = connection.execute(
+                    "SELECT mtime_ns, entry_count, scanned_ns FROM directories WHERE path = ?", (dir_path,)
+                ).fetchone()
+                
+                if fingerprint is None:
+                    return None
+                
+                mtime_ns, entry_count, scanned_ns = fingerprint
+                if (mtime_ns != stat_info.st_mtime_ns or
+                        mtime_ns > scanned_ns - self.FINGERPRINT_GUARD_NS):
+                    return None
+                
+                subdirs = [row[0] for row in connection.execute(
+                    "SELECT path FROM directories WHERE parent = ?", (dir_path,)
+                )]
+            
+            files = self.load_directory(dir_path)
+            
+            # O índice precisa conhecer todas as entradas da pasta para substituir a listagem
+            if len(files) + len(subdirs) != entry_count:
+                return None
+            
+            return files, subdirs
+        
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao consultar impressão digital da pasta {dir_path}", e)
+            return None
+    
+    def record_directory(self, dir_path: str, stat_info: os.stat_result, entry_count: int,
+                         subdirs: List[str]):
+        """Registra a impressão digital (mtime, nº de entradas) de uma pasta recém-listada"""
+        parent = os.path.dirname(dir_path)
+        now_ns = time.time_ns()
+        
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?)",
+                    (dir_path, parent, stat_info.st_mtime_ns, entry_count, now_ns)
+                )
+                
+                # Subpastas ainda não listadas entram sem impressão digital válida
+                connection.executemany(
+                    "INSERT OR IGNORE INTO directories VALUES (?, ?, -1, -1, 0)",
+                    [(subdir, dir_path) for subdir in subdirs]
+                )
+                
+                # Remover subárvores de subpastas que deixaram de existir
+                known = {row[0] for row in connection.execute(
+                    "SELECT path FROM directories WHERE parent = ?", (dir_path,)
+                )}
+                for removed in known.difference(subdirs):
+                    self._delete_subtree(connection, removed)
+                
+                self._pending_changes += 1 + len(subdirs)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar impressão digital da pasta {dir_path}", e)
+    
+    @staticmethod
+    def _delete_subtree(connection: sqlite3.Connection, dir_path: str):
+        """Remove do índice uma pasta e todos os seus descendentes"""
+        # Intervalo [pasta + sep, pasta + chr(sep + 1)) cobre todos os descendentes
+        low = dir_path + os.sep
+        high = dir_path + chr(ord(os.sep) + 1)
+        
+        connection.execute("DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                           (dir_path, low, high))
+        connection.execute("DELETE FROM files WHERE parent = ? OR (parent >= ? AND parent < ?)",
+                           (dir_path, low, high))
+    
+    def sync_category_signature(self, signature: str):
+        """Descarta categorias gravadas se o mapeamento de extensões mudou desde a última análise"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute("SELECT value FROM meta WHERE key = 'category_signature'").fetchone()
+                if row is not None and row[0] == signature:
+                    return
+                
+                # Linhas sem categoria são reclassificadas pelo scanner na próxima passada
+                connection.execute("UPDATE files SET category = NULL WHERE category IS NOT NULL")
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('category_signature', ?)", (signature,))
+                connection.commit()
+                self._pending_changes = 0
+            
+            if row is not None:
+                logger.info("Categorias alteradas: categorias do índice de metadados serão recalculadas")
+        except sqlite3.Error as e:
+            logger.error("Erro ao sincronizar categorias do índice de metadados", e)
+    
+    def flush(self):
+        """Confirma alterações pendentes no disco"""
+        try:
+            with self._lock:
+                if self._connection is not None and self._pending_changes:
+                    self._connection.commit()
+                    self._pending_changes = 0
+        except sqlite3.Error as e:
+            logger.error("Erro ao gravar índice de metadados", e)
+    
+    def clear(self):
+        """Remove todas as entradas do índice"""
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute("DELETE FROM files")
+                connection.execute("DELETE FROM directories")
+                connection.execute("DELETE FROM meta")
+                connection.commit()
+                self._pending_changes = 0
+            logger.info("Índice de metadados limpo")
+        except sqlite3.Error as e:
+            logger.error("Erro ao limpar índice de metadados", e)
+    
+    def close(self):
+        """Fecha a conexão com o índice"""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+# Instância global do índice de metadados
+metadata_index = MetadataIndex()
@@ -7,10 +7,81 @@ import os
 import stat
 import psutil
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from collections.abc import Mapping
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Any
 import mimetypes
 
 from .logger import logger
+from .walker import ParallelWalker
+from .metadata_index import MetadataIndex, CachedStat
+
+# Folga de espaço livre (MB) exigida além do tamanho dos arquivos movidos
+DISK_SPACE_MARGIN_MB = 100
+
+def file_suffix(name: str) -> str:
+    """Retorna a extensão do nome com a mesma semântica de Path.suffix"""
+    index = name.rfind('.')
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ""
+
+def is_hidden_file(name: str, stat_info: os.stat_result) -> bool:
+    """Arquivo oculto: atributo do Windows quando disponível, ponto inicial nos demais sistemas"""
+    if hasattr(stat_info, 'st_file_attributes'):
+        return bool(stat_info.st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
+    return name.startswith('.')
+
+class LazyFileInfo(Mapping):
+    """Informações de arquivo calculadas sob demanda a partir de um stat já obtido"""
+    
+    __slots__ = ("path", "name", "stat_info", "_values")
+    
+    _FIELDS = {
+        "name": lambda f: f.name,
+        "size_bytes": lambda f: f.stat_info.st_size,
+        "size_mb": lambda f: f.stat_info.st_size / (1024 * 1024),
+        "extension": lambda f: file_suffix(f.name).lower(),
+        "mime_type": lambda f: mimetypes.guess_type(f.path)[0],
+        "created": lambda f: f.stat_info.st_ctime,
+        "modified": lambda f: f.stat_info.st_mtime,
+        "accessed": lambda f: f.stat_info.st_atime,
+        "is_hidden": lambda f: is_hidden_file(f.name, f.stat_info),
+        "is_readonly": lambda f: not bool(f.stat_info.st_mode & stat.S_IWRITE),
+        "permissions": lambda f: oct(f.stat_info.st_mode)[-3:],
+    }
+    
+    def __init__(self, path: str, name: str, stat_info: os.stat_result,
+                 fields: Optional[Iterable[str]] = None):
+        self.path = path
+        self.name = name
+        self.stat_info = stat_info
+        self._values: Dict[str, Any] = {}
+        
+        # Campos declarados de antemão são calculados já na criação
+        for key in fields or ():
+            self[key]
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            getter = self._FIELDS.get(key)
+            if getter is None:
+                raise
+            value = self._values[key] = getter(self)
+            return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+    
+    def __repr__(self) -> str:
+        return f"LazyFileInfo({self.path!r})"
+    
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self._FIELDS}
 
 class FileValidator:
     """Validador de arquivos e operações"""
@@ -174,34 +245,23 @@ class FileValidator:
         
         return True
     
-    def get_file_info(self, file_path: str) -> Dict:
-        """Obtém informações detalhadas do arquivo"""
+    def get_file_info(self, file_path: str, fields: Optional[Iterable[str]] = None) -> Mapping:
+        """Obtém informações detalhadas do arquivo (campos calculados sob demanda)"""
         try:
-            path = Path(file_path)
-            stat_info = path.stat()
-            
-            # Detectar tipo MIME
-            mime_type, _ = mimetypes.guess_type(str(path))
-            
-            return {
-                "name": path.name,
-                "size_bytes": stat_info.st_size,
-                "size_mb": stat_info.st_size / (1024 * 1024),
-                "extension": path.suffix.lower(),
-                "mime_type": mime_type,
-                "created": stat_info.st_ctime,
-                "modified": stat_info.st_mtime,
-                "accessed": stat_info.st_atime,
-                "is_hidden": bool(stat_info.st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN) if hasattr(stat, 'FILE_ATTRIBUTE_HIDDEN') else path.name.startswith('.'),
-                "is_readonly": not bool(stat_info.st_mode & stat.S_IWRITE),
-                "permissions": oct(stat_info.st_mode)[-3:]
-            }
-            
+            stat_info = os.stat(file_path)
+            return self.build_file_info(file_path, os.path.basename(file_path), stat_info, fields)
+        
         except Exception as e:
             logger.error(f"Erro ao obter informações do arquivo {file_path}", e)
             return {}
     
-    def scan_folder_issues(self, folder_path: str) -> Dict:
+    def build_file_info(self, file_path: str, name: str, stat_info: os.stat_result,
+                        fields: Optional[Iterable[str]] = None) -> LazyFileInfo:
+        """Monta informações do arquivo a partir de um stat já obtido (sem novas syscalls)"""
+        return LazyFileInfo(file_path, name, stat_info, fields)
+    
+    def scan_folder_issues(self, folder_path: str, max_depth: Optional[int] = None,
+                           max_workers: int = 8, fingerprints: Optional[MetadataIndex] = None) -> Dict:
         """Escaneia pasta em busca de possíveis problemas"""
         issues = {
             "inaccessible_files": [],
@@ -213,11 +273,27 @@ class FileValidator:
         }
         
         try:
-            path = Path(folder_path)
+            # Pastas ocultas também são percorridas: arquivos ocultos fazem parte dos problemas relatados
+            walker = ParallelWalker(max_workers=max_workers, max_depth=max_depth, fingerprints=fingerprints,
+                                    include_hidden=True)
             
-            for file_path in path.rglob('*'):
-                if file_path.is_file():
-                    file_info = self.get_file_info(str(file_path))
+            for listing in walker.walk(folder_path):
+                if listing.cached_rows is not None:
+                    # Pasta inalterada desde a última análise: usar metadados do índice
+                    items = [(os.path.join(listing.path, name), name, CachedStat.from_row(row))
+                             for name, row in listing.cached_rows.items()]
+                else:
+                    items = []
+                    for entry in listing.entries:
+                        try:
+                            items.append((entry.path, entry.name, entry.stat()))
+                        except OSError:
+                            # Removido ou inacessível após a listagem: afeta só este arquivo
+                            issues["inaccessible_files"].append(entry.path)
+                
+                for path_str, name, stat_info in items:
+                    file_path = Path(path_str)
+                    file_info = self.build_file_info(path_str, name, stat_info)
                     
                     # Verificar acessibilidade
                     if not self.validate_file_access(str(file_path)):
@@ -267,8 +343,11 @@ class OperationValidator:
     def __init__(self):
         self.file_validator = FileValidator()
     
-    def validate_organization_operation(self, source_folder: str, files_to_move: List[Dict]) -> Tuple[bool, Dict]:
+    def validate_organization_operation(self, source_folder: str, files_to_move: List[Dict],
+                                        check_disk_space: bool = True) -> Tuple[bool, Dict]:
         """Valida uma operação completa de organização"""
+        # Com check_disk_space=False (um segmento de um plano maior) o espaço não é verificado aqui:
+        # summary["total_size_mb"] é somado entre os segmentos e verificado uma vez com validate_disk_space
         self.file_validator.clear_messages()
         
         # Validar pasta origem
@@ -282,7 +361,8 @@ class OperationValidator:
             if Path(file_info["source"]).exists()
         )
         
-        self.file_validator.validate_disk_space(source_folder, total_size_mb + 100)
+        if check_disk_space:
+            self.file_validator.validate_disk_space(source_folder, total_size_mb + DISK_SPACE_MARGIN_MB)
         
         # Validar cada arquivo
         valid_files = []
@@ -299,12 +379,19 @@ class OperationValidator:
         summary["valid_files"] = valid_files
         summary["total_files"] = len(files_to_move)
         summary["destination_conflicts"] = destination_conflicts
+        summary["total_size_mb"] = total_size_mb
         
         # Operação é válida se não há erros críticos
         is_valid = not summary["has_errors"]
         
         return is_valid, summary
     
+    def validate_disk_space(self, source_folder: str, total_size_mb: float) -> Tuple[bool, Dict]:
+        """Valida o espaço em disco para mover total_size_mb (com a mesma folga da operação completa)"""
+        self.file_validator.clear_messages()
+        has_space = self.file_validator.validate_disk_space(source_folder, total_size_mb + DISK_SPACE_MARGIN_MB)
+        return has_space, self.file_validator.get_validation_summary()
+    
     def _check_destination_conflicts(self, files_to_move: List[Dict]) -> List[Dict]:
         """Verifica conflitos de destino"""
         conflicts = []
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Percurso paralelo de árvores de diretórios para o Organizador de Arquivos
+"""
+
+import os
+import stat
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterator, Optional, NamedTuple
+
+from .logger import logger
+from .metadata_index import MetadataIndex
+from .cancellation import CancellationToken
+
+# Intervalo (s) entre verificações de cancelamento enquanto listagens estão em andamento
+CANCEL_POLL_INTERVAL = 0.1
+
+def is_hidden_dir(dir_path: str) -> bool:
+    """Pasta oculta: ponto inicial no nome (.git, .venv...) ou atributo oculto do Windows"""
+    if os.path.basename(dir_path).startswith('.'):
+        return True
+    if os.name == 'nt':
+        try:
+            return bool(os.stat(dir_path, follow_symlinks=False).st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
+        except OSError:
+            return False
+    return False
+
+class DirectoryListing(NamedTuple):
+    """Resultado da listagem de uma pasta"""
+    path: str
+    # Entradas de arquivo listadas agora (vazio quando a pasta não mudou)
+    entries: List[os.DirEntry]
+    subdirs: List[str]
+    # Linhas do índice de metadados (nome -> linha) quando a listagem foi evitada
+    cached_rows: Optional[Dict[str, Dict]] = None
+    # Stat da pasta obtido antes da listagem (para registrar a impressão digital)
+    dir_stat: Optional[os.stat_result] = None
+    # mtime da pasta antes da listagem (com stat_dirs ou impressões digitais), inclusive se inalterada
+    dir_mtime_ns: Optional[int] = None
+
+class ParallelWalker:
+    """Percorre árvores de diretórios distribuindo as listagens em um pool de threads"""
+    
+    def __init__(self, max_workers: int = 8, max_depth: Optional[int] = None,
+                 fingerprints: Optional[MetadataIndex] = None, stat_dirs: bool = False,
+                 include_hidden: bool = False):
+        self.max_workers = max(1, max_workers)
+        # Profundidade 0 = apenas a pasta raiz; None = sem limite
+        self.max_depth = max_depth
+        # Limite de listagens em andamento para manter a memória estável
+        self.max_in_flight = self.max_workers * 4
+        # Índice com impressões digitais (mtime, nº de entradas) das pastas; o walker
+        # apenas consulta, quem grava é o consumidor que mantém as linhas de arquivos
+        self.fingerprints = fingerprints
+        # Stat de cada pasta antes da listagem mesmo sem impressões digitais (validação de snapshots)
+        self.stat_dirs = stat_dirs
+        # Descer em pastas ocultas; as listagens (e o índice) continuam com todas as subpastas,
+        # o filtro vale só para o que entra na fila do percurso
+        self.include_hidden = include_hidden
+        
+        # Contadores da última execução
+        self.listed_dirs = 0
+        self.skipped_dirs = 0
+    
+    def _list_directory(self, dir_path: str) -> DirectoryListing:
+        """Lista uma pasta separando arquivos e subpastas (executado no pool)"""
+        dir_stat = None
+        
+        if self.fingerprints is not None or self.stat_dirs:
+            try:
+                # Stat antes da listagem: alterações durante a listagem invalidam a impressão
+                dir_stat = os.stat(dir_path)
+                unchanged = (self.fingerprints.get_unchanged_listing(dir_path, dir_stat)
+                             if self.fingerprints is not None else None)
+                if unchanged is not None:
+                    cached_rows, subdirs = unchanged
+                    return DirectoryListing(dir_path, [], subdirs, cached_rows,
+                                            dir_mtime_ns=dir_stat.st_mtime_ns)
+            except OSError as e:
+                logger.warning(f"Pasta ignorada {dir_path}: {str(e)}")
+                return DirectoryListing(dir_path, [], [])
+        
+        files = []
+        subdirs = []
+        
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        # Não seguir links simbólicos de pastas para evitar ciclos
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            # Aquecer o cache de stat do DirEntry dentro do pool
+                            entry.stat()
+                            files.append(entry)
+                    except OSError as e:
+                        logger.warning(f"Entrada ignorada {entry.path}: {str(e)}")
+        except OSError as e:
+            logger.warning(f"Pasta ignorada {dir_path}: {str(e)}")
+            # Sem listagem completa não há impressão digital a registrar
+            dir_stat = None
+        
+        return DirectoryListing(dir_path, files, subdirs,
+                                dir_stat=dir_stat if self.fingerprints is not None else None,
+                                dir_mtime_ns=dir_stat.st_mtime_ns if dir_stat is not None else None)
+    
+    def walk(self, root_path: str, token: Optional[CancellationToken] = None) -> Iterator[DirectoryListing]:
+        """Itera sobre as listagens das pastas à medida que terminam (até o token ser cancelado)"""
+        if self.fingerprints is not None:
+            # Impressões digitais são indexadas por caminho absoluto
+            root_path = os.path.abspath(root_path)
+        
+        self.listed_dirs = 0
+        self.skipped_dirs = 0
+        pending = deque([(root_path, 0)])
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="walker") as executor:
+            in_flight = {}
+            
+            while pending or in_flight:
+                if token is not None and token.cancelled:
+                    # Listagens ainda não iniciadas são descartadas; as em andamento terminam sozinhas
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return
+                
+                # Despachar novas listagens até o limite
+                while pending and len(in_flight) < self.max_in_flight:
+                    dir_path, depth = pending.popleft()
+                    future = executor.submit(self._list_directory, dir_path)
+                    in_flight[future] = (dir_path, depth)
+                
+                done, _ = wait(in_flight, timeout=CANCEL_POLL_INTERVAL if token is not None else None,
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    dir_path, depth = in_flight.pop(future)
+                    listing = future.result()
+                    
+                    if listing.cached_rows is not None:
+                        self.skipped_dirs += 1
+                    else:
+                        self.listed_dirs += 1
+                    
+                    if self.max_depth is None or depth < self.max_depth:
+                        pending.extend((subdir, depth + 1) for subdir in listing.subdirs
+                                       if self.include_hidden or not is_hidden_dir(subdir))
+                    
+                    yield listing
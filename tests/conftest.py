@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração compartilhada dos testes
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config.settings import config as settings
+from src.utils.backup import backup_manager
+from src.core.snapshot import scan_snapshots
+from src.core.filters import filter_manager
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Configuração em memória, backups em pasta temporária e nenhum estado entre testes"""
+    monkeypatch.setattr(settings, "settings", dict(settings.settings))
+    monkeypatch.setattr(settings, "save_settings", lambda: True)
+    settings.settings["use_metadata_index"] = False
+    
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    monkeypatch.setattr(backup_manager, "backup_dir", backup_dir)
+    monkeypatch.setattr(backup_manager, "index_file", backup_dir / "backup_index.json")
+    monkeypatch.setattr(backup_manager, "backups_index", {"backups": [], "last_cleanup": None})
+    
+    monkeypatch.setattr(filter_manager, "filters", [])
+    scan_snapshots.clear()
+    yield
+    scan_snapshots.clear()
+
+@pytest.fixture
+def make_files(tmp_path):
+    """Cria arquivos (caminho relativo -> conteúdo) dentro de uma pasta de trabalho"""
+    root = tmp_path / "pasta"
+    root.mkdir()
+    
+    def make(files):
+        for relative, content in files.items():
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content if isinstance(content, bytes) else content.encode())
+            # Pastas "antigas": snapshots e impressões digitais não descartam mtimes recentes
+            os.utime(path, (1_600_000_000, 1_600_000_000))
+        for dir_path, _, _ in os.walk(root):
+            os.utime(dir_path, (1_600_000_000, 1_600_000_000))
+        return root
+    
+    return make
+
+def tree(root: Path) -> dict:
+    """Caminho relativo -> conteúdo de todos os arquivos sob root"""
+    return {str(path.relative_to(root)): path.read_bytes()
+            for path in sorted(root.rglob("*")) if path.is_file()}
\ No newline at end of file
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core import batch
+from src.core.batch import BatchAnalyzer
+from src.core.organizer import organizer
+
+FILES = {
+    "um/a.txt": "1", "um/b.jpg": "22",
+    "dois/c.txt": "333", "dois/d.mp3": "4444", "dois/e.txt": "5",
+    "tres/f.pdf": "666666",
+}
+
+def test_batch_matches_single_analyses(make_files):
+    root = make_files(FILES)
+    folders = [str(root / name) for name in ("um", "dois", "tres")]
+    progress = []
+    analyzer = BatchAnalyzer()
+    analyzer.set_progress_callback(lambda done, total, message: progress.append((done, total)))
+    
+    result = analyzer.analyze(folders + [folders[0]], max_workers=2)
+    
+    assert result["success"] and result["errors"] == {}
+    assert list(result["results"]) == folders
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+    for folder in folders:
+        single = organizer.analyze_folder(folder, "por_tipo")
+        assert result["results"][folder]["plan"] == single["suggestions"].to_compact()
+        assert result["results"][folder]["stats"]["total_files"] == single["stats"]["total_files"]
+    
+    stats = result["stats"]
+    assert stats["total_files"] == 6
+    assert stats["categories_stats"]["Documentos"]["count"] == 4
+    assert stats["categories_count"] == 3
+    assert stats["largest_file"]["name"] == "f.pdf"
+    assert stats["smallest_file"]["name"] in ("a.txt", "e.txt")
+
+def test_missing_folder_is_reported(make_files):
+    root = make_files(FILES)
+    
+    result = BatchAnalyzer().analyze([str(root / "um"), str(root / "inexistente")], max_workers=1)
+    
+    assert not result["success"]
+    assert list(result["errors"]) == [str(root / "inexistente")]
+    assert result["stats"]["total_files"] == 2
+
+def test_per_device_limit(make_files, monkeypatch):
+    # Threads no lugar de processos para observar a concorrência por dispositivo
+    root = make_files({f"{disk}{i}/a.txt": "1" for disk in "xy" for i in range(4)})
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+    
+    def analyze_root(folder, *args):
+        device = os.path.basename(folder)[0]
+        with lock:
+            active[device] = active.get(device, 0) + 1
+            peak[device] = max(peak.get(device, 0), active[device])
+        time.sleep(0.02)
+        with lock:
+            active[device] -= 1
+        return {"success": True, "stats": organizer._new_stats(), "plan": {}}
+    
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(batch, "_analyze_root", analyze_root)
+    monkeypatch.setattr(BatchAnalyzer, "_device", staticmethod(lambda folder: ord(os.path.basename(folder)[0])))
+    
+    result = BatchAnalyzer().analyze(sorted(str(path) for path in root.iterdir()), max_workers=4, per_device=1)
+    
+    assert result["success"] and len(result["results"]) == 8
+    assert peak == {"x": 1, "y": 1}
\ No newline at end of file
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import time
+
+from src.core.organizer import organizer
+from src.core.snapshot import scan_snapshots
+from src.utils.cancellation import CancellationToken
+
+def test_token_reasons_and_deadline():
+    token = CancellationToken()
+    assert not token.cancelled and token.remaining() is None
+    token.cancel()
+    token.cancel("deadline")
+    assert token.cancelled and token.reason == "cancelled"
+    
+    expired = CancellationToken(timeout=0)
+    assert expired.cancelled and expired.reason == "deadline"
+    assert expired.remaining() == 0.0
+    
+    later = CancellationToken(deadline=time.monotonic() + 60)
+    assert not later.cancelled and 0 < later.remaining() <= 60
+
+def test_timeout_returns_partial_analysis(make_files):
+    root = make_files({f"p{i}/f{i}.txt": str(i) for i in range(5)})
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", recursive=True, timeout=0)
+    
+    assert analysis["success"] and analysis["partial"]
+    assert analysis["cancel_reason"] == "deadline"
+    assert len(scan_snapshots) == 0
+    
+    preview = organizer.preview_organization(str(root), "por_tipo", recursive=True, timeout=0)
+    assert preview["success"] and preview["partial"] and preview["cancel_reason"] == "deadline"
+
+def test_timeout_is_added_to_token_without_deadline(make_files):
+    root = make_files({"a.txt": "1"})
+    token = CancellationToken()
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", token=token, timeout=60)
+    
+    assert token.deadline is not None
+    assert not analysis["partial"] and analysis["cancel_reason"] is None
+    assert len(analysis["suggestions"]) == 1
+
+def test_cancel_operation_stops_stream(make_files):
+    root = make_files({f"p{i}/f{i:02}.txt": str(i) for i in range(40)})
+    
+    batches = []
+    for batch in organizer.iter_analysis(str(root), "por_tipo", recursive=True, batch_size=5):
+        batches.append(batch)
+        if len(batches) == 1:
+            organizer.cancel_operation()
+    
+    final = batches[-1]
+    assert [batch["done"] for batch in batches] == [False] * (len(batches) - 1) + [True]
+    assert final["partial"] and final["cancel_reason"] == "cancelled"
+    assert final["scanned_files"] < 40
+    sources = [suggestion["source"] for batch in batches for suggestion in batch["suggestions"]]
+    assert len(sources) == len(set(sources)) == len(final["plan"])
+    assert len(scan_snapshots) == 0
+    
+    # A próxima análise usa um token novo
+    assert not organizer.analyze_folder(str(root), "por_tipo", recursive=True)["partial"]
\ No newline at end of file
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from src.config.settings import config
+from src.core.categories import CategoryIndex, category_classifier
+
+def test_simple_and_compound_suffixes():
+    index = CategoryIndex({"Compactados": {"extensions": [".gz", ".tar.gz", "TAR.BZ2"]},
+                           "Documentos": {"extensions": [".txt", "pdf"]}})
+    
+    assert index.classify("nota.TXT") == "Documentos"
+    assert index.classify("r.pdf") == "Documentos"
+    assert index.classify("backup.tar.gz") == "Compactados"
+    assert index.classify("backup.tar.bz2") == "Compactados"
+    assert index.classify("x.bz2") == "Outros"
+    assert index.classify(".txt") == "Outros"
+    assert index.classify("sem_extensao") == "Outros"
+    assert index.classify("ponto.") == "Outros"
+
+def test_longest_compound_suffix_wins():
+    index = CategoryIndex({"Codigo": [".d.ts"], "Web": [".ts"], "Video": [".m.ts"]})
+    
+    assert index.classify("tipos.d.ts") == "Codigo"
+    assert index.classify("app.ts") == "Web"
+    assert index.classify("a.b.ts") == "Web"
+
+def test_first_category_wins_and_numbered_suffixes():
+    index = CategoryIndex({"A": [".blend", ".gz"], "B": [".blend", ".ogg"]})
+    
+    assert index.classify("cena.blend") == "A"
+    assert index.classify("cena.blend1") == "A"
+    assert index.classify("som.ogg2") == "B"
+    # Base curta demais: ".gz1" não é reconhecido como ".gz" numerado
+    assert index.classify("x.gz1") == "Outros"
+
+def test_signature_follows_mapping():
+    first = CategoryIndex({"A": [".x"]})
+    
+    assert first.signature == CategoryIndex({"A": [".X"]}).signature
+    assert first.signature != CategoryIndex({"B": [".x"]}).signature
+
+def test_classifier_rebuilds_on_config_change(monkeypatch):
+    # Versão restaurada no fim: o índice volta às categorias padrão nos próximos testes
+    monkeypatch.setattr(config, "version", config.version)
+    before = category_classifier.index
+    assert category_classifier.classify("modelo.xyz") == "Outros"
+    
+    config.set("custom_categories", {"Modelos": {"extensions": [".xyz"]}, "Imagens": {"extensions": [".heic"]}})
+    
+    assert category_classifier.index is not before
+    assert category_classifier.classify("modelo.xyz") == "Modelos"
+    assert category_classifier.classify("foto.heic") == "Imagens"
+    assert category_classifier.classify("foto.jpg") == "Imagens"
+def test_unrelated_settings_keep_the_index(monkeypatch):
+    monkeypatch.setattr(config, "version", config.version)
+    before = category_classifier.index
+    
+    config.set("recent_folders", ["/tmp/a"])
+    assert category_classifier.index is before
+    
+    config.set("custom_categories", {"Modelos": {"extensions": [".xyz"]}})
+    assert category_classifier.index is not before
\ No newline at end of file
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, tree
+from src.cli import main
+from src.config.settings import config
+
+def _run(capsys, *argv):
+    code = main(["-q", *argv])
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+def _run_module(*argv):
+    return subprocess.run([sys.executable, "-m", "src.cli", "-q", *argv], cwd=ROOT,
+                          capture_output=True, text=True)
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, src.cli; print('tkinter' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+def test_cli_runs_as_module(make_files, tmp_path):
+    root = make_files({"a.txt": "1", "b.jpg": "22"})
+    
+    result = _run_module("analyze", str(root))
+    
+    assert result.returncode == 0, result.stderr
+    analysis = json.loads(result.stdout)
+    assert analysis["success"] and analysis["stats"]["total_files"] == 2
+    
+    missing = _run_module("analyze", str(tmp_path / "nao_existe"))
+    assert missing.returncode == 1
+    assert json.loads(missing.stdout)["success"] is False
+
+def test_analyze_json(make_files, capsys):
+    root = make_files({"a.txt": "1", "b.jpg": "22"})
+    
+    code, lines = _run(capsys, "analyze", str(root))
+    
+    assert code == 0 and len(lines) == 1
+    assert lines[0]["success"] and lines[0]["stats"]["total_files"] == 2
+    assert lines[0]["partial"] is False
+    assert len(lines[0]["plan"]["moves"]) == 2
+
+def test_analyze_jsonl_streams_suggestions(make_files, capsys):
+    root = make_files({f"f{i}.txt": str(i) for i in range(5)})
+    
+    code, lines = _run(capsys, "analyze", str(root), "--format", "jsonl", "--ext", ".txt")
+    
+    assert code == 0
+    assert [line["type"] for line in lines] == ["suggestion"] * 5 + ["summary"]
+    assert {line["destination"] for line in lines[:-1]} == {str(root / "Documentos" / f"f{i}.txt")
+                                                           for i in range(5)}
+    assert lines[-1]["stats"]["total_files"] == 5
+
+def test_analyze_jsonl_emits_redirects_for_similar_images(make_files, capsys):
+    pytest.importorskip("PIL.Image")
+    from test_similar_images import _pattern
+    
+    root = make_files({})
+    _pattern(root / "foto1.png")
+    _pattern(root / "foto2.png", size=(192, 128))
+    _pattern(root / "listras.png", frequency=11)
+    config.settings["image_hash_workers"] = 1
+    
+    code, lines = _run(capsys, "analyze", str(root), "--format", "jsonl", "--group-similar-images")
+    
+    assert code == 0
+    group = str(root / "Imagens" / "foto1 (semelhantes)")
+    redirects = {os.path.basename(line["source"]): os.path.dirname(line["destination"])
+                 for line in lines if line["type"] == "redirect"}
+    assert redirects == {"foto1.png": group, "foto2.png": group}
+    assert lines[-1]["type"] == "summary" and lines[-1]["similar_images"]["grouped_files"] == 2
+
+def test_organize_and_restore(make_files, capsys):
+    root = make_files({"a.txt": "1", "b.jpg": "22"})
+    before = tree(root)
+    
+    code, lines = _run(capsys, "organize", str(root), "--format", "jsonl")
+    
+    assert code == 0
+    assert sorted(line["type"] for line in lines) == ["moved", "moved", "summary"]
+    assert tree(root) == {"Documentos/a.txt": b"1", "Imagens/b.jpg": b"22"}
+    
+    code, lines = _run(capsys, "restore", lines[-1]["backup_id"])
+    assert code == 0 and lines == [{"success": True, "backup_id": lines[0]["backup_id"]}]
+    assert tree(root) == before
+
+def test_dry_run_moves_nothing(make_files, capsys):
+    root = make_files({"a.txt": "1"})
+    
+    code, lines = _run(capsys, "organize", str(root), "--dry-run")
+    
+    assert code == 0 and lines[0]["success"]
+    assert tree(root) == {"a.txt": b"1"}
+
+def test_invalid_arguments(make_files, capsys):
+    root = make_files({"a.txt": "1"})
+    
+    with pytest.raises(SystemExit) as exit_info:
+        main(["analyze", str(root), "--mode", "{inexistente}"])
+    assert exit_info.value.code == 2
+    
+    code, lines = _run(capsys, "analyze", str(root), "--preset", "inexistente")
+    assert code == 2 and not lines[0]["success"]
+    
+    code, lines = _run(capsys, "analyze", str(root / "inexistente"))
+    assert code == 1 and not lines[0]["success"]
\ No newline at end of file
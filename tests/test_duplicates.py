@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import os
+
+from src.core.duplicates import DuplicateFinder, PARTIAL_BLOCK
+from src.core.organizer import organizer
+from src.utils.backup import backup_manager
+from conftest import tree
+
+def _rows(root):
+    return [{"path": str(path), "size_bytes": path.stat().st_size, "modified": path.stat().st_mtime}
+            for path in sorted(root.rglob("*")) if path.is_file()]
+
+def test_finder_groups_by_content(make_files):
+    big = b"x" * (3 * PARTIAL_BLOCK)
+    # Mesmo início e fim, meio diferente: só o hash completo separa
+    other = big[:PARTIAL_BLOCK] + b"y" * PARTIAL_BLOCK + big[-PARTIAL_BLOCK:]
+    root = make_files({"a.txt": "igual", "sub/b.txt": "igual", "c.txt": "outro",
+                       "d.bin": big, "e.bin": big, "f.bin": other, "vazio1": "", "vazio2": ""})
+    os.utime(root / "sub/b.txt", (1_500_000_000, 1_500_000_000))
+    
+    report = DuplicateFinder(workers=2).find(_rows(root))
+    
+    groups = {group["original"]: group["duplicates"] for group in report["groups"]}
+    assert groups == {str(root / "sub/b.txt"): [str(root / "a.txt")],
+                      str(root / "d.bin"): [str(root / "e.bin")]}
+    assert report["duplicate_files"] == 2
+    assert not report["partial"]
+
+def test_quarantine_goes_to_organized_root(make_files):
+    files = {f"a{i}.txt": "igual" for i in range(4)}
+    files.update({f"sub/b{i}.txt": f"unico {i}" for i in range(3)})
+    root = make_files(files)
+    before = tree(root)
+    
+    analysis = organizer.analyze_folder(str(root), "{category}/{year}/{month}", recursive=True,
+                                        find_duplicates=True)
+    result = organizer.execute_organization(analysis["suggestions"], True, analysis["duplicates"], "quarantine")
+    
+    assert result["success"]
+    # Com template aninhado a quarentena continua na raiz, não dentro de categoria/ano
+    assert len(os.listdir(root / "Duplicados")) == 3
+    assert result["stats"]["moved_files"] == 7
+    
+    assert backup_manager.restore_backup(result["backup_id"])
+    assert tree(root) == before
+
+def test_skipped_copies_stay_out_of_backup(make_files):
+    files = {f"a{i}.txt": "igual" for i in range(4)}
+    files.update({f"b{i}.txt": f"unico {i}" for i in range(3)})
+    root = make_files(files)
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", find_duplicates=True)
+    copies = {path for group in analysis["duplicates"]["groups"] for path in group["duplicates"]}
+    skipped = [s["destination"] for s in analysis["suggestions"] if s["source"] in copies]
+    result = organizer.execute_organization(analysis["suggestions"], True, analysis["duplicates"], "skip")
+    
+    assert result["stats"]["moved_files"] == 4
+    assert result["stats"]["skipped_files"] == 3
+    assert backup_manager.get_backup_info(result["backup_id"])["total_files"] == 4
+    assert all((root / os.path.basename(path)).exists() for path in copies)
+    
+    # Arquivos criados depois nos destinos das cópias não são "restaurados" por engano
+    for destination in skipped:
+        with open(destination, "w") as f:
+            f.write("novo")
+    assert backup_manager.restore_backup(result["backup_id"])
+    assert all(open(destination).read() == "novo" for destination in skipped)
+    assert all((root / os.path.basename(path)).read_text() == "igual" for path in copies)
+
+def test_keep_moves_every_copy(make_files):
+    root = make_files({f"a{i}.txt": "igual" for i in range(3)})
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", find_duplicates=True)
+    result = organizer.execute_organization(analysis["suggestions"], True, analysis["duplicates"], "keep")
+    
+    assert result["stats"]["moved_files"] == 3
+    assert sorted(os.listdir(root / "Documentos")) == ["a0.txt", "a1.txt", "a2.txt"]
+
+def test_invalid_duplicate_action(make_files):
+    root = make_files({"a.txt": "x"})
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    result = organizer.execute_organization(analysis["suggestions"], True, None, "apagar")
+    
+    assert not result["success"]
+    assert (root / "a.txt").exists()
\ No newline at end of file
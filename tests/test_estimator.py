@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import os
+
+from src.core.estimator import FolderEstimator
+from src.core.file_table import BYTES_PER_MB
+from src.core.organizer import organizer
+
+def _classify(name):
+    return "Documentos" if name.endswith(".txt") else "Outros"
+
+def _dest_folder(name, category, mtime, size):
+    return category
+
+def test_small_folder_is_exact(make_files):
+    root = make_files({"a.txt": "1" * 100, "b.txt": "2" * 200, "c.bin": "3" * 50, "sub/d.txt": "ignorado"})
+    
+    result = FolderEstimator().estimate(str(root), _classify, _dest_folder, time_budget=1.0, seed=1)
+    
+    assert result["success"] and not result["estimated"]
+    stats = result["stats"]
+    assert stats["total_files"] == {"estimate": 3.0, "low": 3.0, "high": 3.0}
+    assert stats["total_size_mb"]["estimate"] == 350 / BYTES_PER_MB
+    assert stats["categories_stats"]["Documentos"]["count"]["estimate"] == 2.0
+    assert stats["destinations"] == {"Documentos": {"estimate": 2.0, "low": 2.0, "high": 2.0},
+                                     "Outros": {"estimate": 1.0, "low": 1.0, "high": 1.0}}
+
+def test_large_flat_folder_becomes_exact_after_sampling_everything(make_files):
+    root = make_files({f"f{i:03}.txt": "x" * i for i in range(60)})
+    
+    result = FolderEstimator(files_per_dir=8).estimate(str(root), _classify, _dest_folder, time_budget=5.0, seed=2)
+    
+    assert not result["estimated"]
+    assert result["sampled_files"] == 60
+    assert result["stats"]["total_files"]["estimate"] == 60.0
+    assert result["stats"]["total_size_mb"]["estimate"] == sum(range(60)) / BYTES_PER_MB
+
+def test_recursive_estimate_brackets_the_total(make_files):
+    # Árvore desigual: a variância entre sondagens não é nula
+    files = {f"f{i}.txt": "x" for i in range(5)}
+    files.update({f"a/f{i}.txt": "x" * 10 for i in range(30)})
+    files.update({f"b/c/f{i}.bin": "x" * 20 for i in range(12)})
+    files.update({f"b/d/f{i}.txt": "x" for i in range(3)})
+    files.update({"e/f.txt": "x", ".oculta/f.txt": "x"})
+    root = make_files(files)
+    truth = 5 + 30 + 12 + 3 + 1
+    
+    result = FolderEstimator().estimate(str(root), _classify, _dest_folder, recursive=True,
+                                        time_budget=0.3, seed=3)
+    
+    total = result["stats"]["total_files"]
+    assert result["estimated"]
+    assert result["probes"] > 100
+    assert total["low"] <= total["estimate"] <= total["high"]
+    assert abs(total["estimate"] - truth) <= 0.15 * truth
+    # Pasta oculta fora do percurso, como na varredura
+    hidden = FolderEstimator().estimate(str(root), _classify, _dest_folder, recursive=True,
+                                        time_budget=0.3, seed=3, include_hidden=True)
+    assert hidden["listed_dirs"] == result["listed_dirs"] + 1
+
+def test_max_depth_limits_probes(make_files):
+    root = make_files({"a.txt": "x", "sub/b.txt": "x", "sub/deep/c.txt": "x"})
+    
+    result = FolderEstimator().estimate(str(root), _classify, _dest_folder, recursive=True, max_depth=1,
+                                        time_budget=0.2, seed=4)
+    
+    assert result["listed_dirs"] == 2
+    assert result["stats"]["total_files"]["estimate"] == 2.0
+
+def test_organizer_estimate_uses_mode(make_files):
+    root = make_files({"a.txt": "1", "b.jpg": "2", "c.jpg": "3"})
+    
+    result = organizer.estimate_folder(str(root), "por_tipo", recursive=False, time_budget=1.0)
+    
+    assert set(result["stats"]["destinations"]) == {"Documentos", "Imagens"}
+    assert result["stats"]["destinations"]["Imagens"]["estimate"] == 2.0
+    assert not organizer.estimate_folder(os.path.join(str(root), "inexistente"))["success"]
\ No newline at end of file
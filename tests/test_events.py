@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import time
+
+from src.core.organizer import organizer
+from src.utils import events
+from src.utils.events import EventBus
+
+def _wait(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_drain_keeps_latest_progress_and_exact_counters():
+    bus = EventBus()
+    assert bus.drain() is None
+    
+    for i in range(1000):
+        bus.progress(i, 1000, f"arquivo {i}")
+        bus.increment("scanned_files")
+    bus.log("início")
+    bus.log("falha", "error")
+    bus.set_counter("moved_files", 7)
+    
+    batch = bus.drain()
+    assert batch.progress == (999, 1000, "arquivo 999")
+    assert batch.logs == [("início", "info"), ("falha", "error")]
+    assert batch.counters == {"scanned_files": 1000, "moved_files": 7}
+    assert batch.dropped_logs == 0
+    assert bus.drain() is None
+    assert bus.counters() == batch.counters
+
+def test_old_logs_are_dropped_over_limit(monkeypatch):
+    monkeypatch.setattr(events, "MAX_PENDING_LOGS", 3)
+    bus = EventBus()
+    
+    for i in range(5):
+        bus.log(f"m{i}")
+    
+    batch = bus.drain()
+    assert [message for message, _ in batch.logs] == ["m2", "m3", "m4"]
+    assert batch.dropped_logs == 2
+
+def test_subscribers_receive_rate_limited_batches():
+    bus = EventBus(rate_hz=10)
+    assert EventBus(rate_hz=0).interval == 1.0 / 20
+    received = []
+    
+    def failing(batch):
+        raise RuntimeError("assinante com erro")
+    
+    bus.subscribe(failing)
+    bus.subscribe(received.append)
+    started = time.monotonic()
+    while time.monotonic() - started < 0.35:
+        bus.progress(1, 2, "trabalhando")
+        bus.increment("scanned_files")
+        time.sleep(0.001)
+    bus.progress(2, 2, "fim")
+    bus.flush()
+    
+    assert _wait(lambda: received and received[-1].progress == (2, 2, "fim"))
+    # Um assinante com erro não impede os demais; entregas limitadas a ~10 por segundo
+    assert 1 <= len(received) <= 8
+    assert received[-1].counters["scanned_files"] == bus.counters()["scanned_files"]
+
+def test_organizer_callbacks_and_counters(make_files, monkeypatch):
+    root = make_files({f"f{i}.txt": str(i) for i in range(12)})
+    monkeypatch.setattr(organizer, "events", EventBus(rate_hz=50))
+    monkeypatch.setattr(organizer, "_callbacks_subscribed", False)
+    monkeypatch.setattr(organizer, "progress_callback", None)
+    monkeypatch.setattr(organizer, "log_callback", None)
+    progress, logs = [], []
+    organizer.set_progress_callback(lambda current, total, message: progress.append(current))
+    organizer.set_log_callback(logs.append)
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    assert len(analysis["suggestions"]) == 12
+    assert organizer.events.counters() == {"scanned_files": 12, "planned_files": 12}
+    assert _wait(lambda: any("Análise concluída" in message for message in logs))
+    assert progress and progress[-1] == 12
\ No newline at end of file
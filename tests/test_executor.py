@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src.config.settings import config
+from src.core.executor import OrderedResults, MoveExecutor
+from src.core.file_table import BYTES_PER_MB
+from src.core.organizer import organizer
+from src.utils.backup import backup_manager
+from src.utils.validator import operation_validator, DISK_SPACE_MARGIN_MB
+from conftest import tree
+
+def test_ordered_results_deliver_in_position_order():
+    delivered = []
+    results = OrderedResults([0, 1, 2, 3], lambda position, value, error: delivered.append(position))
+    
+    results.add(2, "c")
+    results.add(0, "a")
+    assert delivered == [0]
+    results.add(3, "d")
+    results.add(1, "b")
+    assert delivered == [0, 1, 2, 3]
+
+def test_ordered_results_finish_flushes_after_gaps():
+    delivered = []
+    results = OrderedResults([0, 1, 2], lambda position, value, error: delivered.append(position))
+    
+    results.add(2, "c")
+    results.finish()
+    assert delivered == [2]
+
+def test_executor_delivers_results_in_position_order(tmp_path):
+    started = []
+    lock = threading.Lock()
+    
+    def operation(position):
+        with lock:
+            started.append(position)
+        time.sleep(0.001)
+        return position
+    
+    delivered = []
+    tasks = [(position, str(tmp_path / f"d{position % 3}")) for position in range(30)]
+    executed = MoveExecutor(workers=4, per_device=4, chunk_size=2).run(
+        tasks, operation, lambda position, value, error: delivered.append(value)
+    )
+    
+    assert executed == 30
+    assert sorted(started) == list(range(30))
+    assert delivered == list(range(30))
+    assert all((tmp_path / f"d{index}").is_dir() for index in range(3))
+
+def test_executor_reports_errors_per_position(tmp_path):
+    def operation(position):
+        if position == 1:
+            raise OSError("falhou")
+        return position
+    
+    outcomes = {}
+    MoveExecutor(workers=2).run([(position, str(tmp_path)) for position in range(3)], operation,
+                                lambda position, value, error: outcomes.setdefault(position, error))
+    assert outcomes[0] is None and outcomes[2] is None
+    assert isinstance(outcomes[1], OSError)
+
+def test_execution_in_segments_with_hardlinks(make_files):
+    config.settings["move_segment_size"] = 7
+    # Originais depois das cópias na ordem do plano: os hardlinks esperam o último segmento
+    files = {f"sub{i % 3}/f{i:02}.txt": f"unico {i}" for i in range(30)}
+    files.update({f"copia{i}.txt": "repetido" for i in range(4)})
+    root = make_files(files)
+    before = tree(root)
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", recursive=True, find_duplicates=True)
+    moved = []
+    result = organizer.execute_organization(analysis["suggestions"], True, analysis["duplicates"], "hardlink",
+                                            on_moved=lambda source, destination: moved.append(destination))
+    
+    assert result["success"]
+    assert "moved_files" not in result
+    assert result["stats"]["moved_files"] == len(moved) == 34
+    assert all(os.path.exists(destination) for destination in moved)
+    documents = root / "Documentos"
+    inodes = {os.stat(documents / f"copia{i}.txt").st_ino for i in range(4)}
+    assert len(inodes) == 1
+    
+    # Um bloco do diário por segmento com movimentações (mais o lote dos hardlinks)
+    info = backup_manager.get_backup_info(result["backup_id"])
+    assert info["total_files"] == 34
+    with open(backup_manager.backup_dir / info["journal"]) as f:
+        blocks = [json.loads(line) for line in f]
+    assert len(blocks) == 6
+    assert sum(len(block["moves"]) for block in blocks) == 34
+    
+    assert backup_manager.restore_backup(result["backup_id"])
+    assert tree(root) == before
+
+def test_disk_space_is_checked_once_for_all_segments(make_files, monkeypatch):
+    config.settings["move_segment_size"] = 2
+    root = make_files({f"f{i}.txt": "x" * 1024 * (i + 1) for i in range(5)})
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    required = []
+    monkeypatch.setattr(operation_validator.file_validator, "validate_disk_space",
+                        lambda folder, required_mb: required.append(required_mb) or True)
+    
+    result = organizer.execute_organization(analysis["suggestions"], False)
+    
+    assert result["success"] and result["stats"]["moved_files"] == 5
+    assert required == [pytest.approx(15 * 1024 / BYTES_PER_MB + DISK_SPACE_MARGIN_MB)]
+
+def test_cancelled_execution_backs_up_only_what_moved(make_files, monkeypatch):
+    config.settings["move_segment_size"] = 10
+    config.settings["move_workers"] = 1
+    root = make_files({f"f{i:02}.txt": str(i) for i in range(40)})
+    before = tree(root)
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    moved = []
+    
+    def on_moved(source, destination):
+        moved.append(destination)
+        if len(moved) == 15:
+            organizer.cancel_operation()
+    
+    result = organizer.execute_organization(analysis["suggestions"], True, on_moved=on_moved)
+    
+    assert not result["success"]
+    assert 15 <= result["stats"]["moved_files"] < 40
+    assert backup_manager.get_backup_info(result["backup_id"])["total_files"] == result["stats"]["moved_files"]
+    assert backup_manager.restore_backup(result["backup_id"])
+    assert tree(root) == before
\ No newline at end of file
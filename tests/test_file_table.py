@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from src.core.file_table import FileTable
+from src.utils.validator import file_validator
+
+FILES = {"a.txt": "1", ".oculto": "22", "arquivo.tar.gz": "333", "sub/sem_extensao": "4444"}
+
+def _table(root, fields=None):
+    table = FileTable(fields)
+    for relative in FILES:
+        path = os.path.join(str(root), relative)
+        table.append(os.path.dirname(path), os.path.basename(path), os.stat(path), "Outros")
+    return table
+
+@pytest.mark.parametrize("fields", [None, (), ("is_hidden",)])
+def test_rows_match_file_info(make_files, fields):
+    root = make_files(FILES)
+    os.chmod(root / "a.txt", 0o444)
+    
+    table = _table(root, fields)
+    
+    for index, relative in enumerate(FILES):
+        path = os.path.join(str(root), relative)
+        expected = file_validator.get_file_info(path).to_dict()
+        row = table.row(index).to_dict()
+        assert row.pop("path") == path
+        assert row.pop("category") == "Outros"
+        assert row == expected
+
+def test_declared_columns_avoid_stat(make_files, monkeypatch):
+    root = make_files(FILES)
+    table = _table(root, ("created", "is_hidden"))
+    monkeypatch.setattr(FileTable, "_restat", lambda self, index: pytest.fail("stat inesperado"))
+    
+    assert table.columns == {"ctimes", "flags"}
+    assert table.row(1)["is_hidden"] is True
+    assert table.row(0)["created"] == os.stat(root / "a.txt").st_ctime
+
+def test_paths_and_extensions_are_interned(make_files):
+    root = make_files({f"f{i}.txt": str(i) for i in range(50)})
+    
+    table = FileTable(())
+    for name in sorted(os.listdir(root)):
+        table.append(str(root), name, os.stat(root / name), "Documentos")
+    
+    assert len(table) == 50
+    assert len(table.dirs) == len(table.extensions) == len(table.categories) == 1
+    rows = table.rows(range(10, 20))
+    assert [row["name"] for row in rows] == [f"f{i}.txt" for i in sorted(range(50), key=str)[10:20]]
+    assert rows.total_size_bytes() == sum(len(str(i)) for i in sorted(range(50), key=str)[10:20])
+
+def test_reset_keeps_declared_columns(make_files):
+    root = make_files(FILES)
+    table = _table(root, ("permissions",))
+    assert table.estimate_bytes(range(len(table))) > 0
+    
+    table.reset()
+    
+    assert len(table) == 0 and len(table.modes) == 0
+    assert table.columns == {"modes"}
+    table.append(str(root), "a.txt", os.stat(root / "a.txt"), "Documentos")
+    assert table.row(0)["permissions"] == oct(os.stat(root / "a.txt").st_mode)[-3:]
\ No newline at end of file
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import ctypes
+import errno
+import os
+
+import pytest
+
+from src.utils import fsops
+from src.utils.fsops import move_file, RENAMED, LINKED, COPIED
+from src.utils.backup import backup_manager
+from src.core.organizer import organizer
+from conftest import tree
+
+def write(path, content):
+    path.write_text(content)
+    return str(path)
+
+def fail_with(error):
+    """renameat2 simulado que falha com o errno dado"""
+    def renameat2(source, destination, flags):
+        ctypes.set_errno(error)
+        return -1
+    return renameat2
+
+def test_move_file_renames_to_free_destination(tmp_path):
+    source = write(tmp_path / "a.txt", "A")
+    destination = str(tmp_path / "b.txt")
+    
+    assert move_file(source, destination) in (RENAMED, LINKED)
+    assert not os.path.exists(source)
+    assert open(destination).read() == "A"
+
+def test_move_file_never_clobbers(tmp_path):
+    source = write(tmp_path / "a.txt", "A")
+    destination = write(tmp_path / "b.txt", "B")
+    
+    with pytest.raises(FileExistsError):
+        move_file(source, destination)
+    assert open(source).read() == "A"
+    assert open(destination).read() == "B"
+
+@pytest.mark.skipif(not fsops.RENAMEAT2_AVAILABLE, reason="renameat2 indisponível")
+def test_renameat2_is_used_when_available(tmp_path):
+    source = write(tmp_path / "a.txt", "A")
+    assert move_file(source, str(tmp_path / "b.txt")) == RENAMED
+
+def test_link_fallback_when_noreplace_is_unsupported(tmp_path, monkeypatch):
+    monkeypatch.setattr(fsops, "_renameat2", fail_with(errno.EINVAL))
+    source = write(tmp_path / "a.txt", "A")
+    taken = write(tmp_path / "taken.txt", "T")
+    
+    with pytest.raises(FileExistsError):
+        move_file(source, taken)
+    assert open(taken).read() == "T"
+    
+    destination = str(tmp_path / "b.txt")
+    assert move_file(source, destination) == LINKED
+    assert not os.path.exists(source)
+    assert open(destination).read() == "A"
+
+def test_exclusive_reserve_without_hardlinks(tmp_path, monkeypatch):
+    def no_links(*args, **kwargs):
+        raise OSError(errno.EPERM, "sem hardlinks")
+    monkeypatch.setattr(fsops, "_renameat2", None)
+    monkeypatch.setattr(fsops.os, "link", no_links)
+    source = write(tmp_path / "a.txt", "A")
+    taken = write(tmp_path / "taken.txt", "T")
+    
+    with pytest.raises(FileExistsError):
+        move_file(source, taken)
+    assert open(taken).read() == "T"
+    assert move_file(source, str(tmp_path / "b.txt")) == RENAMED
+    assert open(tmp_path / "b.txt").read() == "A"
+
+def test_copy_only_on_exdev(tmp_path, monkeypatch):
+    monkeypatch.setattr(fsops, "_renameat2", fail_with(errno.EXDEV))
+    source = write(tmp_path / "a.txt", "A" * 10000)
+    os.utime(source, (1_000_000_000, 1_000_000_000))
+    destination = str(tmp_path / "b.txt")
+    
+    assert move_file(source, destination) == COPIED
+    assert not os.path.exists(source)
+    assert open(destination).read() == "A" * 10000
+    assert os.stat(destination).st_mtime == 1_000_000_000
+
+def test_copy_refuses_existing_destination(tmp_path, monkeypatch):
+    monkeypatch.setattr(fsops, "_renameat2", fail_with(errno.EXDEV))
+    source = write(tmp_path / "a.txt", "A")
+    destination = write(tmp_path / "b.txt", "B")
+    
+    with pytest.raises(FileExistsError):
+        move_file(source, destination)
+    assert open(source).read() == "A"
+    assert open(destination).read() == "B"
+
+def test_other_errors_are_raised(tmp_path, monkeypatch):
+    monkeypatch.setattr(fsops, "_renameat2", fail_with(errno.EACCES))
+    source = write(tmp_path / "a.txt", "A")
+    
+    with pytest.raises(PermissionError):
+        move_file(source, str(tmp_path / "b.txt"))
+    assert os.path.exists(source)
+
+def test_collision_after_planning_gets_new_name_and_restores(make_files):
+    root = make_files({f"f{i}.txt": f"conteudo {i}" for i in range(5)})
+    before = tree(root)
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    # Arquivo que surgiu no destino depois do planejamento
+    planned = analysis["suggestions"][2]["destination"]
+    os.makedirs(os.path.dirname(planned))
+    with open(planned, "w") as f:
+        f.write("intruso")
+    
+    result = organizer.execute_organization(analysis["suggestions"], create_backup=True)
+    
+    assert result["success"]
+    assert result["stats"]["moved_files"] == 5
+    source = analysis["suggestions"][2]["source"]
+    assert result["renamed"] == {source: planned.replace(".txt", "_1.txt")}
+    assert open(planned).read() == "intruso"
+    
+    assert backup_manager.restore_backup(result["backup_id"])
+    after = tree(root)
+    assert open(planned).read() == "intruso"
+    assert {path: content for path, content in after.items() if path in before} == before
\ No newline at end of file
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import pytest
+
+from src.core.scanner import file_scanner
+from src.core.file_table import FileTable
+from src.utils.metadata_index import MetadataIndex
+from src.utils.walker import ParallelWalker
+
+@pytest.fixture
+def index(tmp_path):
+    index = MetadataIndex(tmp_path / "idx.db")
+    yield index
+    index.close()
+
+class CountingClassifier:
+    """Classificação por extensão que registra os nomes classificados"""
+    
+    def __init__(self):
+        self.names = []
+    
+    def __call__(self, name):
+        self.names.append(name)
+        return "Documentos" if name.endswith(".txt") else "Outros"
+
+def test_unchanged_files_reuse_indexed_category(make_files, index):
+    root = make_files({"a.txt": "1", "b.bin": "2", "c.txt": "3"})
+    
+    classify = CountingClassifier()
+    first = file_scanner.scan_folder(str(root), classify, index=index)
+    assert sorted(classify.names) == ["a.txt", "b.bin", "c.txt"]
+    
+    classify = CountingClassifier()
+    second = file_scanner.scan_folder(str(root), classify, index=index)
+    assert classify.names == []
+    assert sorted(second.to_dicts(), key=lambda row: row["name"]) == \
+        sorted(first.to_dicts(), key=lambda row: row["name"])
+
+def test_changed_and_removed_files_update_index(make_files, index):
+    root = make_files({"a.txt": "1", "b.bin": "2", "c.txt": "3"})
+    file_scanner.scan_folder(str(root), CountingClassifier(), index=index)
+    
+    (root / "a.txt").write_text("maior")
+    (root / "c.txt").unlink()
+    classify = CountingClassifier()
+    table = file_scanner.scan_folder(str(root), classify, index=index)
+    
+    assert classify.names == ["a.txt"]
+    assert sorted(table.names[row] for row in range(len(table))) == ["a.txt", "b.bin"]
+    rows = index.load_directory(str(root))
+    assert sorted(rows) == ["a.txt", "b.bin"]
+    assert rows["a.txt"]["size"] == len("maior")
+
+def test_chunked_scan_removes_missing_files_after_last_chunk(make_files, index):
+    root = make_files({f"f{i}.txt": str(i) for i in range(5)})
+    file_scanner.scan_folder(str(root), CountingClassifier(), index=index)
+    
+    (root / "f3.txt").unlink()
+    table = FileTable()
+    spans = list(file_scanner.scan(str(root), table, CountingClassifier(), index=index, chunk_size=2))
+    
+    assert [len(span) for span in spans] == [2, 2, 0]
+    assert sorted(index.load_directory(str(root))) == ["f0.txt", "f1.txt", "f2.txt", "f4.txt"]
+
+def test_replaced_file_with_same_size_is_reclassified(make_files, index):
+    root = make_files({"a.txt": "1"})
+    file_scanner.scan_folder(str(root), CountingClassifier(), index=index)
+    
+    # Mesmo tamanho e mtime, outro inode (criado antes da remoção para não reaproveitar o antigo)
+    (root / "novo").write_text("2")
+    os.rename(root / "novo", root / "a.txt")
+    os.utime(root / "a.txt", (1_600_000_000, 1_600_000_000))
+    classify = CountingClassifier()
+    file_scanner.scan_folder(str(root), classify, index=index)
+    
+    assert classify.names == ["a.txt"]
+
+def test_category_signature_change_clears_categories(make_files, index):
+    root = make_files({"a.txt": "1", "b.bin": "2"})
+    index.sync_category_signature("v1")
+    file_scanner.scan_folder(str(root), CountingClassifier(), index=index)
+    
+    index.sync_category_signature("v1")
+    classify = CountingClassifier()
+    file_scanner.scan_folder(str(root), classify, index=index)
+    assert classify.names == []
+    
+    index.sync_category_signature("v2")
+    file_scanner.scan_folder(str(root), classify, index=index)
+    assert sorted(classify.names) == ["a.txt", "b.bin"]
+
+def _scan_tree(root, index, classify):
+    table = FileTable()
+    for _ in file_scanner.scan_tree(str(root), table, classify, index=index, skip_unchanged=True):
+        pass
+    return sorted(table.path(row) for row in range(len(table)))
+
+def _walk(root, index):
+    walker = ParallelWalker(max_workers=2, fingerprints=index)
+    for _ in walker.walk(str(root)):
+        pass
+    return walker.listed_dirs, walker.skipped_dirs
+
+def test_unchanged_tree_is_not_relisted(make_files, index):
+    root = make_files({"a.txt": "1", "sub/b.txt": "2", "sub/deep/c.bin": "3"})
+    first = _scan_tree(root, index, CountingClassifier())
+    assert _walk(root, index) == (0, 3)
+    
+    classify = CountingClassifier()
+    assert _scan_tree(root, index, classify) == first
+    assert classify.names == []
+
+def test_changed_directory_fingerprint_forces_listing(make_files, index):
+    root = make_files({"a.txt": "1", "sub/b.txt": "2", "sub/deep/c.bin": "3"})
+    _scan_tree(root, index, CountingClassifier())
+    
+    (root / "sub" / "novo.txt").write_text("4")
+    os.utime(root / "sub", (1_600_000_100, 1_600_000_100))
+    assert _walk(root, index) == (1, 2)
+    
+    classify = CountingClassifier()
+    assert str(root / "sub" / "novo.txt") in _scan_tree(root, index, classify)
+    assert classify.names == ["novo.txt"]
+
+def test_recent_directory_is_not_trusted(make_files, index):
+    root = make_files({"a.txt": "1"})
+    # mtime dentro da margem da granularidade: a listagem pode não ter visto a última alteração
+    os.utime(root, None)
+    _scan_tree(root, index, CountingClassifier())
+    
+    assert _walk(root, index) == (1, 0)
+
+def test_removed_subdirectory_leaves_index(make_files, index):
+    root = make_files({"a.txt": "1", "sub/b.txt": "2", "sub/deep/c.bin": "3"})
+    _scan_tree(root, index, CountingClassifier())
+    
+    shutil.rmtree(root / "sub")
+    os.utime(root, (1_600_000_100, 1_600_000_100))
+    assert _scan_tree(root, index, CountingClassifier()) == [str(root / "a.txt")]
+    assert index.load_directory(str(root / "sub")) == {}
+    assert index.load_directory(str(root / "sub" / "deep")) == {}
\ No newline at end of file
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import pytest
+
+from src.core.organizer import organizer
+from src.core.plan import DestinationNames
+from src.core.spill import SpillStore
+from src.utils.backup import BackupManager, backup_manager
+
+def test_reserve_keeps_free_names(tmp_path):
+    names = DestinationNames()
+    
+    assert names.reserve(str(tmp_path), "a.txt") == "a.txt"
+    assert names.reserve(str(tmp_path), "b.txt") == "b.txt"
+
+def test_reserve_avoids_names_on_disk_and_reserved(tmp_path):
+    (tmp_path / "foto.jpg").write_text("x")
+    (tmp_path / "foto_1.jpg").write_text("x")
+    names = DestinationNames()
+    
+    assert names.reserve(str(tmp_path), "foto.jpg") == "foto_2.jpg"
+    assert names.reserve(str(tmp_path), "foto.jpg") == "foto_3.jpg"
+    # Nome com sufixo reservado por outro arquivo é pulado na sequência
+    assert names.reserve(str(tmp_path), "foto_4.jpg") == "foto_4.jpg"
+    assert names.reserve(str(tmp_path), "foto.jpg") == "foto_5.jpg"
+
+def test_disk_listing_is_read_once(tmp_path):
+    names = DestinationNames()
+    assert names.reserve(str(tmp_path), "a.txt") == "a.txt"
+    
+    # Criado depois da primeira consulta: a listagem em memória não é refeita
+    (tmp_path / "b.txt").write_text("x")
+    assert names.reserve(str(tmp_path), "b.txt") == "b.txt"
+
+def test_missing_folder_has_no_names(tmp_path):
+    names = DestinationNames()
+    
+    assert names.reserve(str(tmp_path / "nova"), "a.txt") == "a.txt"
+    assert names.reserve(str(tmp_path / "nova"), "a.txt") == "a_1.txt"
+    assert not (tmp_path / "nova").exists()
+
+def test_many_duplicates_get_sequential_suffixes(tmp_path):
+    names = DestinationNames()
+    
+    reserved = [names.reserve(str(tmp_path), "IMG_0001.jpg") for _ in range(1000)]
+    assert reserved[:3] == ["IMG_0001.jpg", "IMG_0001_1.jpg", "IMG_0001_2.jpg"]
+    assert len(set(reserved)) == 1000
+    assert names._next_suffix[(str(tmp_path), "IMG_0001", ".jpg")] == 1000
+
+def test_spilled_names_stay_reserved(tmp_path):
+    (tmp_path / "disco.txt").write_text("x")
+    names = DestinationNames()
+    assert names.reserve(str(tmp_path), "a.txt") == "a.txt"
+    assert names.estimate_bytes() > 0
+    store = SpillStore(str(tmp_path))
+    
+    names.spill(store)
+    
+    assert names.estimate_bytes() == 0
+    # A pasta não é listada de novo: um arquivo criado depois continua livre
+    (tmp_path / "b.txt").write_text("x")
+    assert names.reserve(str(tmp_path), "b.txt") == "b.txt"
+    assert names.reserve(str(tmp_path), "a.txt") == "a_1.txt"
+    assert names.reserve(str(tmp_path), "disco.txt") == "disco_1.txt"
+    assert names.reserve(str(tmp_path / "nova"), "a.txt") == "a.txt"
+    store.close()
+
+def test_plan_renames_same_names_from_subfolders(make_files):
+    root = make_files({"x/a.txt": "1", "y/a.txt": "2", "Documentos/a.txt": "3"})
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    destinations = sorted(os.path.basename(s["destination"]) for s in analysis["suggestions"]
+                          if os.path.dirname(s["source"]) != str(root / "Documentos"))
+    
+    # a.txt já existe em Documentos: as duas cópias recebem sufixos distintos
+    assert destinations == ["a_1.txt", "a_2.txt"]
+
+def test_compact_form_round_trips(make_files):
+    root = make_files({"x/a.txt": "1", "y/a.txt": "2", "x/b.jpg": "3", "y/c.txt": "4"})
+    plan = organizer.analyze_folder(str(root), "por_tipo", recursive=True)["suggestions"]
+    
+    compact = plan.to_compact()
+    
+    assert sorted(compact["source_dirs"]) == [str(root / "x"), str(root / "y")]
+    assert sorted(compact["dest_dirs"]) == [str(root / "Documentos"), str(root / "Imagens")]
+    # Nome final só é gravado quando difere do original
+    assert sorted(len(move) for move in compact["moves"]) == [3, 3, 3, 4]
+    assert list(BackupManager._iter_compact(compact)) == list(plan.iter_moves())
+    assert json.loads(json.dumps(compact)) == compact
+
+def test_plan_entries_expose_suggestion_keys(make_files):
+    root = make_files({"a.txt": "1234"})
+    plan = organizer.analyze_folder(str(root), "por_tipo")["suggestions"]
+    
+    entry = plan.to_dicts()[0]
+    
+    assert entry["source"] == str(root / "a.txt")
+    assert entry["destination"] == str(root / "Documentos" / "a.txt")
+    assert entry["dest_folder_name"] == "Documentos"
+    assert entry["category"] == "Documentos"
+    assert entry["file_info"]["size_bytes"] == 4
+    assert dict(plan[-1]) == {key: plan[0][key] for key in plan[0]}
+    with pytest.raises(IndexError):
+        plan[1]
+
+def test_legacy_backup_list_is_restored(make_files):
+    root = make_files({"a.txt": "1"})
+    (root / "Documentos").mkdir()
+    os.rename(root / "a.txt", root / "Documentos" / "a.txt")
+    backup_id = backup_manager.create_backup({
+        "type": "organization",
+        "source_folder": str(root),
+        "files_moved": [{"source": str(root / "a.txt"), "destination": str(root / "Documentos" / "a.txt")}]
+    })
+    
+    assert backup_manager.restore_backup(backup_id)
+    assert (root / "a.txt").read_text() == "1"
\ No newline at end of file
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from src.core.organizer import organizer
+from src.core.rules import RuleEngine, compile_rule, _destination
+
+@pytest.fixture(autouse=True)
+def no_rule_functions(monkeypatch):
+    """Funções de regra ficam só na instância global: cada teste começa sem nenhuma"""
+    monkeypatch.setattr(organizer, "_rule_functions", {})
+    monkeypatch.setattr(organizer, "_rule_engine", None)
+
+def _info(name, category, size=10, modified=1_600_000_000):
+    return {"name": name, "extension": os.path.splitext(name)[1].lower(), "category": category,
+            "size_bytes": size, "modified": modified}
+
+def test_destination_is_relative_and_contained():
+    assert _destination("Fotos/Grandes") == os.path.join("Fotos", "Grandes")
+    assert _destination("Fotos\\2020//") == os.path.join("Fotos", "2020")
+    for invalid in ("../x", "a/../../x", "/abs", "\\abs", "", "   ", None):
+        with pytest.raises(ValueError):
+            _destination(invalid)
+
+def test_compile_rejects_unknown_conditions():
+    with pytest.raises(ValueError):
+        compile_rule("r", {"destination": "x", "conditions": {"tamanho": 1}})
+
+def test_dispatch_by_extension_and_category():
+    engine = RuleEngine([
+        compile_rule("pdf", {"destination": "PDFs", "conditions": {"extensions": ["PDF"]}}),
+        compile_rule("imagens", {"destination": "Fotos", "conditions": {"categories": ["Imagens"]}}),
+    ])
+    
+    assert engine.match(_info("a.pdf", "Documentos")) == "PDFs"
+    assert engine.match(_info("b.jpg", "Imagens")) == "Fotos"
+    assert engine.match(_info("c.txt", "Documentos")) is None
+    assert [rule.name for rule in engine.candidates(".txt", "Documentos")] == []
+
+def test_first_matching_rule_wins():
+    engine = RuleEngine([
+        compile_rule("grandes", {"destination": "Grandes", "conditions": {"min_size_mb": 1}}),
+        compile_rule("todos", {"destination": "Todos"}),
+        compile_rule("nunca", {"destination": "Nunca", "conditions": {"extensions": [".txt"]}}),
+    ])
+    
+    assert engine.match(_info("a.txt", "Documentos", size=2 * 1024 * 1024)) == "Grandes"
+    assert engine.match(_info("a.txt", "Documentos", size=10)) == "Todos"
+    # Regras depois de uma incondicional não entram no despacho
+    assert [rule.name for rule in engine.candidates(".txt", "Documentos")] == ["grandes", "todos"]
+
+def test_name_pattern_and_dates():
+    engine = RuleEngine([
+        compile_rule("capturas", {"destination": "Capturas",
+                                  "conditions": {"name_pattern": ["Screenshot*", "Captura*"]}}),
+        compile_rule("antigos", {"destination": "Antigos",
+                                 "conditions": {"modified_before": "2015-01-01"}}),
+    ])
+    
+    assert engine.match(_info("screenshot 1.png", "Imagens")) == "Capturas"
+    assert engine.match(_info("foto.png", "Imagens", modified=1_300_000_000)) == "Antigos"
+    assert engine.match(_info("foto.png", "Imagens")) is None
+
+def test_function_rule_with_invalid_destination_is_ignored():
+    engine = RuleEngine([compile_rule("escapa", {}, lambda info: "../fora"),
+                         compile_rule("resto", {"destination": "Resto"})])
+    
+    assert engine.match(_info("a.txt", "Documentos")) == "Resto"
+
+def test_custom_rules_take_precedence_in_plan(make_files):
+    root = make_files({"nota.txt": "1", "grande.txt": "x" * 2048, "foto.jpg": "2"})
+    
+    assert organizer.create_custom_organization_rule(
+        "grandes", {"destination": "Grandes/Texto", "conditions": {"extensions": [".txt"], "min_size_mb": 0.001}})
+    assert organizer.create_custom_organization_rule(
+        "fotos", lambda info: "Fotos" if info["category"] == "Imagens" else None)
+    assert not organizer.create_custom_organization_rule("invalida", {"destination": "../fora"})
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    destinations = {os.path.basename(s["source"]): os.path.relpath(s["destination"], root)
+                    for s in analysis["suggestions"]}
+    
+    assert destinations == {"grande.txt": os.path.join("Grandes", "Texto", "grande.txt"),
+                            "foto.jpg": os.path.join("Fotos", "foto.jpg"),
+                            "nota.txt": os.path.join("Documentos", "nota.txt")}
+    
+    assert organizer.remove_custom_organization_rule("grandes")
+    assert organizer.remove_custom_organization_rule("fotos")
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    assert all("Documentos" in s["destination"] or "Imagens" in s["destination"] for s in analysis["suggestions"])
\ No newline at end of file
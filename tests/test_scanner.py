@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import os
+
+from src.core.file_table import BYTES_PER_MB
+from src.core.organizer import organizer
+from src.core.scanner import file_scanner
+
+def _classify(name):
+    return "Documentos" if name.endswith(".txt") else "Outros"
+
+def test_scan_collects_regular_files_with_stat(make_files):
+    root = make_files({"a.txt": "1" * 10, "b.bin": "2" * 300, "sub/c.txt": "nao listado"})
+    os.symlink(root / "inexistente", root / "quebrado")
+    
+    table = file_scanner.scan_folder(str(root), _classify)
+    
+    rows = {row["name"]: row for row in table.to_dicts()}
+    assert set(rows) == {"a.txt", "b.bin"}
+    for name, row in rows.items():
+        stat_info = os.stat(root / name)
+        assert row["path"] == str(root / name)
+        assert row["size_bytes"] == stat_info.st_size
+        assert row["modified"] == stat_info.st_mtime
+    assert rows["a.txt"]["category"] == "Documentos" and rows["b.bin"]["extension"] == ".bin"
+
+def test_scan_paths_adds_only_given_files(make_files):
+    root = make_files({"a.txt": "1", "b.txt": "2", "sub/c.txt": "3"})
+    
+    table = file_scanner.scan_folder(str(root), _classify)
+    assert len(table) == 2
+    rows = file_scanner.scan_paths([str(root / "sub/c.txt"), str(root / "inexistente.txt")], table, _classify)
+    
+    assert [table.path(row) for row in rows] == [str(root / "sub/c.txt")]
+
+def test_analysis_stats(make_files):
+    root = make_files({"a.txt": "1" * 10, "b.txt": "2" * 30, "c.jpg": "3" * 20})
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    stats = analysis["stats"]
+    assert stats["total_files"] == 3
+    assert stats["total_size_mb"] == 60 / BYTES_PER_MB
+    assert stats["categories_stats"]["Documentos"]["count"] == 2
+    assert stats["largest_file"]["name"] == "b.txt"
+    assert stats["smallest_file"]["name"] == "a.txt"
+
+def test_invalid_folder_is_reported(tmp_path):
+    analysis = organizer.analyze_folder(str(tmp_path / "inexistente"), "por_tipo")
+    
+    assert not analysis["success"]
+    assert analysis["errors"]
\ No newline at end of file
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import math
+import os
+import random
+
+import pytest
+
+from src.config.settings import config
+from src.core.organizer import organizer
+from src.core.similar_images import MultiIndexHamming, SimilarImageFinder, dhash, hamming
+
+Image = pytest.importorskip("PIL.Image")
+
+def _pattern(path, size=(96, 64), brightness=0, frequency=3.0):
+    """Imagem suave em coordenadas normalizadas: cópias redimensionadas têm o mesmo desenho"""
+    image = Image.new("L", size)
+    width, height = size
+    image.putdata([int(120 + brightness + 100 * math.sin(frequency * x / width * math.pi) *
+                       math.cos(2 * y / height * math.pi))
+                   for y in range(height) for x in range(width)])
+    image.save(path)
+    return str(path)
+
+def test_multi_index_matches_brute_force():
+    rng = random.Random(3)
+    values = list({rng.getrandbits(64) for _ in range(300)})
+    # Vizinhos próximos de alguns valores para que a busca encontre algo
+    values += [value ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for value in values[:50]]
+    values = list(dict.fromkeys(values))
+    
+    index = MultiIndexHamming(5)
+    for value in values:
+        index.add(value)
+    
+    for query in values[:80] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = {value for value in values if hamming(query, value) <= 5}
+        assert set(index.search(query)) == expected
+
+def test_dhash_is_stable_for_resized_and_brightened_copies(tmp_path):
+    original = dhash(_pattern(tmp_path / "a.png"))
+    resized = dhash(_pattern(tmp_path / "b.png", size=(192, 128)))
+    brighter = dhash(_pattern(tmp_path / "c.jpg", brightness=10))
+    different = dhash(_pattern(tmp_path / "d.png", frequency=11))
+    
+    assert hamming(original, resized) <= 5
+    assert hamming(original, brighter) <= 5
+    assert hamming(original, different) > 5
+    assert dhash(str(tmp_path / "inexistente.png")) is None
+
+def test_finder_groups_near_duplicates(tmp_path):
+    candidates = [
+        (0, _pattern(tmp_path / "rajada2.png", size=(192, 128)), 20.0),
+        (1, _pattern(tmp_path / "rajada1.png"), 10.0),
+        (2, _pattern(tmp_path / "inverso.png", frequency=-3.0), 5.0),
+        (3, _pattern(tmp_path / "listras.png", frequency=11), 1.0),
+    ]
+    (tmp_path / "quebrada.png").write_bytes(b"nao e imagem")
+    candidates.append((4, str(tmp_path / "quebrada.png"), 0.0))
+    
+    groups = SimilarImageFinder(max_distance=5, workers=1).find(candidates)
+    
+    assert [[position for position, _, _ in group] for group in groups] == [[1, 0]]
+
+def test_analysis_redirects_groups_to_shared_folder(make_files):
+    root = make_files({"outro.txt": "x"})
+    _pattern(root / "foto1.png")
+    _pattern(root / "foto2.png", size=(192, 128))
+    _pattern(root / "listras.png", frequency=11)
+    for name in ("foto1.png", "foto2.png", "listras.png"):
+        os.utime(root / name, (1_600_000_000, 1_600_000_000))
+    config.settings["image_hash_workers"] = 1
+    
+    analysis = organizer.analyze_folder(str(root), "por_tipo", group_similar_images=True)
+    
+    destinations = {os.path.basename(s["source"]): os.path.relpath(s["destination"], root)
+                    for s in analysis["suggestions"]}
+    group = os.path.join("Imagens", "foto1 (semelhantes)")
+    assert destinations == {"foto1.png": os.path.join(group, "foto1.png"),
+                            "foto2.png": os.path.join(group, "foto2.png"),
+                            "listras.png": os.path.join("Imagens", "listras.png"),
+                            "outro.txt": os.path.join("Documentos", "outro.txt")}
+    assert analysis["similar_images"]["grouped_files"] == 2
\ No newline at end of file
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from src.config.settings import config
+from src.core.file_table import FileTable
+from src.core.filters import filter_manager, HiddenFileFilter
+from src.core.organizer import organizer
+from src.core.scanner import file_scanner
+from src.core.snapshot import ScanSnapshotCache, scan_snapshots
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Conta as varreduras reais feitas pelo organizador"""
+    calls = []
+    for method in ("scan", "scan_tree"):
+        original = getattr(file_scanner, method)
+        
+        def counted(*args, original=original, **kwargs):
+            calls.append(args[0])
+            return original(*args, **kwargs)
+        
+        monkeypatch.setattr(file_scanner, method, counted)
+    return calls
+
+def _moves(analysis):
+    return sorted((s["source"], s["destination"]) for s in analysis["suggestions"])
+
+def test_unchanged_folder_reuses_scan(make_files, scans):
+    root = make_files({"a.txt": "1", "b.jpg": "2", "sub/c.mp3": "3"})
+    
+    first = organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    second = organizer.analyze_folder(str(root), "por_extensao", recursive=True)
+    third = organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    
+    assert len(scans) == 1
+    assert len(second["suggestions"]) == 3
+    assert _moves(third) == _moves(first)
+
+def test_changed_directory_invalidates_snapshot(make_files, scans):
+    root = make_files({"a.txt": "1", "sub/c.mp3": "3"})
+    organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    
+    (root / "sub" / "novo.txt").write_text("4")
+    os.utime(root / "sub", (1_600_000_100, 1_600_000_100))
+    analysis = organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    
+    assert len(scans) == 2
+    assert str(root / "sub" / "novo.txt") in {s["source"] for s in analysis["suggestions"]}
+
+def test_recursion_and_depth_are_part_of_the_key(make_files, scans):
+    root = make_files({"a.txt": "1", "sub/c.mp3": "3"})
+    
+    assert len(organizer.analyze_folder(str(root), "por_tipo", recursive=True)["suggestions"]) == 2
+    assert len(organizer.analyze_folder(str(root), "por_tipo", recursive=False)["suggestions"]) == 1
+    assert len(scans) == 2
+
+def test_snapshot_without_filter_columns_is_rescanned(make_files, scans, monkeypatch):
+    root = make_files({"a.txt": "1", ".oculto.txt": "2"})
+    organizer.analyze_folder(str(root), "por_tipo")
+    
+    # Reaproveitar a tabela sem a coluna de flags exigiria um stat por linha
+    def restat(self, index):
+        raise AssertionError("stat por linha em tabela de snapshot")
+    
+    monkeypatch.setattr(FileTable, "_restat", restat)
+    filter_manager.add_filter(HiddenFileFilter())
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    assert len(scans) == 2
+    assert [s["source"] for s in analysis["suggestions"]] == [str(root / "a.txt")]
+
+def test_moving_files_clears_snapshots(make_files):
+    root = make_files({"a.txt": "1"})
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    assert len(scan_snapshots) == 1
+    
+    organizer.execute_organization(analysis["suggestions"], False)
+    assert len(scan_snapshots) == 0
+
+def test_cache_rejects_recent_directories_and_evicts_oldest(tmp_path):
+    cache = ScanSnapshotCache(max_entries=2)
+    now_ns = 1_600_000_100 * 10**9
+    
+    cache.put("recente", FileTable(), {str(tmp_path): now_ns}, now_ns)
+    assert len(cache) == 0
+    
+    os.utime(tmp_path, (1_600_000_000, 1_600_000_000))
+    old = {str(tmp_path): os.stat(tmp_path).st_mtime_ns}
+    tables = [FileTable(fields=()) for _ in range(3)]
+    for key, table in enumerate(tables):
+        cache.put(key, table, old, now_ns)
+    
+    assert cache.get(0) is None
+    assert cache.get(1) is tables[1] and cache.get(2) is tables[2]
+    assert cache.get(2, {"flags"}) is None
+
+def test_snapshots_can_be_disabled(make_files, scans):
+    config.settings["scan_snapshot_entries"] = 0
+    root = make_files({"a.txt": "1"})
+    
+    organizer.analyze_folder(str(root), "por_tipo")
+    organizer.analyze_folder(str(root), "por_tipo")
+    assert len(scans) == 2
\ No newline at end of file
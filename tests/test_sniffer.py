@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from src.config.settings import config
+from src.core.organizer import organizer
+from src.core import sniffer as sniffer_module
+from src.core.sniffer import ContentSniffer, detect_category, is_text
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+@pytest.mark.parametrize("header, expected", [
+    (PNG, ("Imagens", True)),
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 12, ("Imagens", True)),
+    (b"%PDF-1.7\n", ("Documentos", True)),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", ("Imagens", True)),
+    (b"RIFF\x00\x00\x00\x00WAVEfmt ", ("Audio", True)),
+    (b"\x00\x00\x00\x18ftypisom", ("Videos", True)),
+    (b"\x00\x00\x00\x18ftypM4A ", ("Audio", True)),
+    (b"PK\x03\x04" + b"\x00" * 26 + b"mimetypeapplication/epub+zip", ("Ebooks", True)),
+    (b"PK\x03\x04" + b"\x00" * 26 + b"[Content_Types].xml", ("Documentos", True)),
+    (b"PK\x03\x04" + b"\x00" * 26 + b"dados.csv", ("Compactados", False)),
+    (b"\x00" * 257 + b"ustar\x0000", ("Compactados", True)),
+    (b"#!/bin/sh\necho oi\n", ("Executaveis", False)),
+    (b"\xef\xbb\xbf<?xml version='1.0'?><svg/>", ("Imagens", False)),
+    (b"<!DOCTYPE html><html></html>", ("Codigo", False)),
+    ("texto comum com acentuação\n".encode("utf-8"), ("Documentos", False)),
+    (b"\x00\x17\x42\x99", (None, False)),
+])
+def test_detect_category(header, expected):
+    assert detect_category(header) == expected
+
+def test_is_text():
+    assert is_text("olá".encode("utf-8"))
+    # Caractere multibyte cortado no limite do cabeçalho
+    assert is_text("olá".encode("utf-8")[:-1])
+    assert not is_text(b"")
+    assert not is_text(b"abc\x00def")
+    assert not is_text(b"\xff\xfe" + b"a" * 20)
+
+def _items(root, names):
+    return [(str(root / name), os.stat(root / name), category) for name, category in names]
+
+def test_refine_only_unknown_files_by_default(make_files):
+    root = make_files({"sem_extensao": "", "imagem.txt": "", "vazio": ""})
+    (root / "sem_extensao").write_bytes(PNG)
+    (root / "imagem.txt").write_bytes(PNG)
+    items = _items(root, [("sem_extensao", "Outros"), ("imagem.txt", "Documentos"), ("vazio", "Outros")])
+    
+    assert ContentSniffer(max_workers=2).refine(items) == ["Imagens", "Documentos", "Outros"]
+    assert ContentSniffer(max_workers=2).refine(items, verify_all=True) == ["Imagens", "Imagens", "Outros"]
+
+def test_weak_signatures_keep_known_extensions(make_files):
+    root = make_files({"script.py": "#!/usr/bin/env python\nprint(1)\n", "notas": "texto simples\n"})
+    items = _items(root, [("script.py", "Codigo"), ("notas", "Outros")])
+    
+    assert ContentSniffer().refine(items, verify_all=True) == ["Codigo", "Documentos"]
+
+def test_results_are_cached_by_inode_and_mtime(make_files, monkeypatch):
+    root = make_files({"a": "", "b": ""})
+    (root / "a").write_bytes(PNG)
+    (root / "b").write_bytes(b"%PDF-1.4")
+    sniffer = ContentSniffer()
+    items = _items(root, [("a", "Outros"), ("b", "Outros")])
+    assert sniffer.refine(items) == ["Imagens", "Documentos"]
+    
+    monkeypatch.setattr(sniffer, "sniff", lambda path: pytest.fail("cabeçalho relido"))
+    assert sniffer.refine(items) == ["Imagens", "Documentos"]
+    sniffer.shutdown()
+
+def test_cache_evicts_least_recently_used(make_files, monkeypatch):
+    monkeypatch.setattr(sniffer_module, "CACHE_LIMIT", 2)
+    root = make_files({"a": "", "b": "", "c": ""})
+    for name in "abc":
+        (root / name).write_bytes(PNG)
+    sniffer = ContentSniffer()
+    a, b, c = (_items(root, [(name, "Outros")]) for name in "abc")
+    sniffer.refine(a)
+    sniffer.refine(b)
+    sniffer.refine(a)
+    
+    sniffer.refine(c)
+    
+    keys = {(os.stat(root / name).st_ino, os.stat(root / name).st_mtime_ns): name for name in "abc"}
+    assert [keys[key] for key in sniffer._cache] == ["a", "c"]
+
+def test_pool_size_is_read_from_config_when_created():
+    config.settings["sniff_workers"] = 3
+    sniffer = ContentSniffer()
+    explicit = ContentSniffer(max_workers=2)
+    
+    assert sniffer._pool()._max_workers == 3
+    assert explicit._pool()._max_workers == 2
+    sniffer.shutdown()
+    explicit.shutdown()
+
+def test_analysis_uses_content_sniffing(make_files):
+    root = make_files({"foto": "", "imagem.txt": "", "nota.txt": "texto\n"})
+    (root / "foto").write_bytes(PNG)
+    (root / "imagem.txt").write_bytes(PNG)
+    
+    def categories():
+        analysis = organizer.analyze_folder(str(root), "por_tipo")
+        return {os.path.basename(item["source"]): os.path.basename(os.path.dirname(item["destination"]))
+                for item in analysis["suggestions"]}
+    
+    assert categories() == {"foto": "Imagens", "imagem.txt": "Documentos", "nota.txt": "Documentos"}
+    config.set("content_sniffing", "all")
+    assert categories() == {"foto": "Imagens", "imagem.txt": "Imagens", "nota.txt": "Documentos"}
+    config.set("content_sniffing", "off")
+    assert categories() == {"foto": "Outros", "imagem.txt": "Documentos", "nota.txt": "Documentos"}
\ No newline at end of file
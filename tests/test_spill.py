@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import gc
+import os
+
+from src.config.settings import config
+from src.core.organizer import organizer
+from src.core.spill import SpilledPlan, SpilledRows
+from src.utils.backup import backup_manager
+from conftest import tree
+
+FILES = {f"sub{i % 4}/{['a.txt', 'b.jpg', 'c.mp3'][i % 3]}" if i < 12 else f"sub{i % 4}/f{i:02}.txt": str(i)
+         for i in range(40)}
+
+def _analyze(root, budget_mb):
+    config.settings.update({"analysis_memory_budget_mb": budget_mb, "analysis_batch_size": 5,
+                            "scan_snapshot_entries": 0, "scan_workers": 1})
+    return organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+
+def _moves(plan):
+    # Sufixos de conflito dependem da ordem de varredura: compara pastas destino e o conjunto de nomes
+    moves = list(plan.iter_moves())
+    return (sorted((source, os.path.dirname(destination)) for source, destination in moves),
+            sorted(destination for _, destination in moves))
+
+def test_spilled_plan_matches_in_memory_plan(make_files, tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    config.settings["spill_dir"] = str(spill_dir)
+    root = make_files(FILES)
+    
+    expected = _analyze(root, 0)
+    spilled = _analyze(root, 0.001)
+    
+    assert not isinstance(expected["suggestions"], SpilledPlan)
+    assert isinstance(spilled["suggestions"], SpilledPlan)
+    assert isinstance(spilled["files_info"], SpilledRows)
+    assert os.listdir(spill_dir)
+    
+    assert len(spilled["suggestions"]) == len(expected["suggestions"]) == 40
+    # Nomes reservados valem entre segmentos: nenhum destino repetido
+    assert _moves(spilled["suggestions"]) == _moves(expected["suggestions"])
+    assert len({destination for _, destination in spilled["suggestions"].iter_moves()}) == 40
+    assert sorted(row["path"] for row in spilled["files_info"]) == \
+        sorted(row["path"] for row in expected["files_info"])
+    assert spilled["stats"]["total_files"] == expected["stats"]["total_files"] == 40
+    assert spilled["suggestions"][0] == spilled["suggestions"].to_dicts()[0]
+    
+    del spilled
+    gc.collect()
+    assert not os.listdir(spill_dir)
+
+def test_large_folder_is_spilled_between_batches(make_files):
+    root = make_files({f"f{i:02}.{['txt', 'jpg'][i % 2]}": str(i) for i in range(42)})
+    
+    analysis = _analyze(root, 0.001)
+    
+    # Orçamento verificado a cada lote, não só ao fim da pasta: a parte final continua em memória
+    plan = analysis["suggestions"]
+    assert isinstance(plan, SpilledPlan)
+    assert 0 < plan.spilled < 42
+    assert len({destination for _, destination in plan.iter_moves()}) == 42
+
+def test_spilled_plan_executes_and_restores(make_files):
+    root = make_files(FILES)
+    before = tree(root)
+    analysis = _analyze(root, 0.001)
+    assert isinstance(analysis["suggestions"], SpilledPlan)
+    
+    result = organizer.execute_organization(analysis["suggestions"], True)
+    
+    assert result["success"]
+    assert result["stats"]["moved_files"] == 40
+    assert sorted(os.listdir(root)) == ["Audio", "Documentos", "Imagens", "sub0", "sub1", "sub2", "sub3"]
+    assert backup_manager.restore_backup(result["backup_id"])
+    assert tree(root) == before
\ No newline at end of file
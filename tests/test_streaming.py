@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from src.core.organizer import organizer
+
+def test_batches_cover_every_file_once(make_files):
+    # Os lotes saem conforme as pastas listadas completam batch_size arquivos
+    root = make_files({f"p{i % 6}/f{i:02}.{'txt' if i % 2 else 'jpg'}": str(i) for i in range(23)})
+    
+    batches = list(organizer.iter_analysis(str(root), "por_tipo", recursive=True, batch_size=5))
+    
+    assert all(batch["success"] for batch in batches)
+    assert [batch["done"] for batch in batches] == [False] * (len(batches) - 1) + [True]
+    assert len(batches) >= 2
+    sources = [suggestion["source"] for batch in batches for suggestion in batch["suggestions"]]
+    assert len(sources) == len(set(sources)) == 23
+    
+    # Estatísticas parciais só crescem e não mudam depois de entregues
+    totals = [batch["stats"]["total_files"] for batch in batches]
+    assert totals == sorted(totals) and totals[-1] == 23
+    first = batches[0]["stats"]
+    assert first["total_files"] < 23
+    assert sum(info["count"] for info in first["categories_stats"].values()) == first["total_files"]
+    
+    final = batches[-1]
+    assert len(final["plan"]) == 23
+    assert len(final["all_files_info"]) == 23
+    assert final["scanned_files"] == 23
+
+def test_flat_folder_is_batched_while_listing(make_files):
+    root = make_files({f"f{i:02}.txt": str(i) for i in range(23)})
+    
+    batches = list(organizer.iter_analysis(str(root), "por_tipo", batch_size=5))
+    
+    assert [len(batch["suggestions"]) for batch in batches] == [5, 5, 5, 5, 3]
+    assert [batch["scanned_files"] for batch in batches] == [5, 10, 15, 20, 23]
+
+def test_analyze_folder_matches_stream(make_files):
+    root = make_files({f"f{i:02}.txt": str(i) for i in range(12)})
+    
+    streamed = [suggestion["destination"] for batch in organizer.iter_analysis(str(root), "por_tipo", batch_size=4)
+                for suggestion in batch["suggestions"]]
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    assert sorted(streamed) == sorted(suggestion["destination"] for suggestion in analysis["suggestions"])
+
+def test_empty_folder(make_files):
+    root = make_files({})
+    
+    batches = list(organizer.iter_analysis(str(root), "por_tipo"))
+    assert len(batches) == 1 and batches[0]["done"] and batches[0]["scanned_files"] == 0
+    assert organizer.analyze_folder(str(root), "por_tipo")["suggestions"] == []
\ No newline at end of file
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+import random
+import time
+from datetime import datetime
+
+import pytest
+
+from src.config.settings import config
+from src.core.organizer import organizer
+from src.core.templates import PathTemplate, template_for_mode, mode_template
+
+MB = 1024 * 1024
+
+@pytest.fixture
+def dst_timezone(monkeypatch):
+    """Fuso com horário de verão: datas locais não coincidem com os dias UTC"""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset indisponível")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_dates_match_local_calendar(dst_timezone):
+    template = PathTemplate("{year}/{month}/{day}")
+    rng = random.Random(7)
+    # Inclui as transições de horário de verão de 2021 e as meias-noites ao redor delas
+    mtimes = [rng.uniform(1_600_000_000, 1_700_000_000) for _ in range(2000)]
+    mtimes += [1_615_705_200 + offset for offset in range(-7200, 7200, 600)]
+    mtimes += [1_636_264_800 + offset for offset in range(-7200, 7200, 600)]
+    
+    for mtime in mtimes:
+        expected = datetime.fromtimestamp(mtime).strftime(os.path.join("%Y", "%m", "%d"))
+        assert template.folder("a.txt", ".txt", "Documentos", mtime, 1) == expected
+
+def test_fields_are_rendered():
+    template = PathTemplate("{category}/{ext}_{size_class}/{initial}")
+    
+    assert template.folder("relatorio.PDF", ".PDF", "Documentos", 0, 2 * MB) == \
+        os.path.join("Documentos", "pdf_Médios", "R")
+    assert template.folder("1nota", "", "Outros", 0, 0) == os.path.join("Outros", "sem_extensao_Vazios", "#")
+    assert template.folder("x.iso", ".iso", "Compactados", 0, 2048 * MB) == \
+        os.path.join("Compactados", "iso_Enormes", "X")
+
+def test_values_do_not_create_folders():
+    template = PathTemplate("{category}")
+    
+    assert template.folder("a", "", "Fotos/../../etc", 0, 1) == "Fotos_.._.._etc"
+    assert template.folder("a", "", "..", 0, 1) == "_"
+
+@pytest.mark.parametrize("invalid", ["", "  ", "/{category}", "{category}/../x", "{tipo}", "{year:04}", "{ext!r}"])
+def test_invalid_templates_are_rejected(invalid):
+    with pytest.raises(ValueError):
+        PathTemplate(invalid)
+
+def test_modes_resolve_to_templates():
+    assert mode_template("por_tipo") == "{category}"
+    assert mode_template("fotos", {"fotos": "{year}/{month}"}) == "{year}/{month}"
+    assert mode_template("{ext}") == "{ext}"
+    assert mode_template("desconhecido") is None
+    assert template_for_mode("desconhecido").folder("a.txt", ".txt", "Documentos", 0, 1) == "Organizados"
+    assert template_for_mode("por_tipo") is template_for_mode("por_tipo")
+
+def test_named_template_in_analysis(make_files):
+    config.settings["organization_templates"] = {"por_ext": "{ext}/{initial}"}
+    root = make_files({"nota.txt": "1", "Foto.JPG": "2"})
+    
+    analysis = organizer.analyze_folder(str(root), "por_ext")
+    
+    assert sorted(os.path.relpath(s["destination"], root) for s in analysis["suggestions"]) == [
+        os.path.join("jpg", "F", "Foto.JPG"), os.path.join("txt", "N", "nota.txt")]
\ No newline at end of file
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import mimetypes
+import os
+
+from src.core.scanner import PathEntry
+from src.utils.validator import LazyFileInfo, file_validator, file_suffix
+from src.utils.walker import ParallelWalker
+
+def test_fields_are_computed_on_demand(make_files, monkeypatch):
+    root = make_files({"foto.JPG": "123"})
+    calls = []
+    original = mimetypes.guess_type
+    
+    def guess_type(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+    
+    monkeypatch.setattr(mimetypes, "guess_type", guess_type)
+    info = file_validator.get_file_info(str(root / "foto.JPG"))
+    
+    assert isinstance(info, LazyFileInfo)
+    assert info["size_bytes"] == 3 and info["extension"] == ".jpg"
+    assert calls == []
+    assert info["mime_type"] == "image/jpeg"
+    assert info["mime_type"] == "image/jpeg"
+    assert len(calls) == 1
+
+def test_declared_fields_are_computed_upfront(make_files):
+    root = make_files({"a.txt": "1"})
+    stat_info = os.stat(root / "a.txt")
+    
+    info = LazyFileInfo(str(root / "a.txt"), "a.txt", stat_info, fields=["permissions", "is_hidden"])
+    
+    assert set(info._values) == {"permissions", "is_hidden"}
+    assert info.to_dict()["modified"] == stat_info.st_mtime
+    assert set(info) == set(info.to_dict())
+
+def test_missing_file_has_no_info(tmp_path):
+    assert file_validator.get_file_info(str(tmp_path / "inexistente")) == {}
+
+def test_suffix():
+    expected = {"a.txt": ".txt", ".oculto": "", "arquivo.tar.gz": ".gz", "sem": "", "ponto.": "",
+                "a.b.c": ".c"}
+    assert {name: file_suffix(name) for name in expected} == expected
+def test_folder_issues_cover_hidden_folders_and_vanished_files(make_files, monkeypatch):
+    root = make_files({"a.txt": "1", ".config/.chave": "2", "sub/.oculto": "3"})
+    walk = ParallelWalker.walk
+    
+    def walk_with_vanished_file(self, folder_path, *args, **kwargs):
+        # Arquivo removido entre a listagem e o stat
+        for listing in walk(self, folder_path, *args, **kwargs):
+            if listing.path == str(root):
+                listing = listing._replace(entries=listing.entries + [PathEntry(str(root / "sumiu.txt"))])
+            yield listing
+    
+    monkeypatch.setattr(ParallelWalker, "walk", walk_with_vanished_file)
+    issues = file_validator.scan_folder_issues(str(root))
+    
+    assert issues["inaccessible_files"] == [str(root / "sumiu.txt")]
+    assert sorted(issues["hidden_files"]) == [str(root / ".config" / ".chave"), str(root / "sub" / ".oculto")]
\ No newline at end of file
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import os
+
+from src.config.settings import config
+from src.core.organizer import organizer
+from src.utils.cancellation import CancellationToken
+from src.utils.walker import ParallelWalker, is_hidden_dir
+
+FILES = {"a.txt": "1", "sub/b.txt": "2", "sub/deep/c.txt": "3", "outra/d.txt": "4",
+         ".git/objeto": "5", "sub/.cache/e.txt": "6"}
+
+def _walk(root, **kwargs):
+    listings = list(ParallelWalker(max_workers=3, **kwargs).walk(str(root)))
+    folders = {os.path.relpath(listing.path, root): sorted(entry.name for entry in listing.entries)
+               for listing in listings}
+    assert len(folders) == len(listings)
+    return folders
+
+def test_walker_lists_every_visible_folder_once(make_files):
+    root = make_files(FILES)
+    
+    assert _walk(root) == {".": ["a.txt"], "sub": ["b.txt"], os.path.join("sub", "deep"): ["c.txt"],
+                           "outra": ["d.txt"]}
+
+def test_walker_depth_and_hidden_folders(make_files):
+    root = make_files(FILES)
+    
+    assert set(_walk(root, max_depth=1)) == {".", "sub", "outra"}
+    assert set(_walk(root, include_hidden=True)) == {".", "sub", os.path.join("sub", "deep"), "outra",
+                                                     ".git", os.path.join("sub", ".cache")}
+    assert is_hidden_dir(str(root / ".git"))
+    assert not is_hidden_dir(str(root / "sub"))
+
+def test_walker_stops_when_cancelled(make_files):
+    root = make_files({f"p{i}/f.txt": str(i) for i in range(20)})
+    token = CancellationToken()
+    token.cancel()
+    
+    assert list(ParallelWalker().walk(str(root), token)) == []
+
+def test_recursive_analysis_skips_hidden_folders_unless_enabled(make_files):
+    root = make_files(FILES)
+    
+    sources = {os.path.relpath(s["source"], root)
+               for s in organizer.analyze_folder(str(root), "por_tipo", recursive=True)["suggestions"]}
+    assert sources == {"a.txt", os.path.join("sub", "b.txt"), os.path.join("sub", "deep", "c.txt"),
+                       os.path.join("outra", "d.txt")}
+    
+    config.settings["show_hidden_files"] = True
+    analysis = organizer.analyze_folder(str(root), "por_tipo", recursive=True)
+    assert len(analysis["suggestions"]) == 6
\ No newline at end of file
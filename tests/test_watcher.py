@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from src.core.organizer import organizer
+from src.core.watcher import FolderWatcher
+from src.utils.backup import backup_manager
+from conftest import tree
+
+def test_concurrent_execution_is_reported_busy(make_files):
+    root = make_files({"a.txt": "x"})
+    analysis = organizer.analyze_folder(str(root), "por_tipo")
+    
+    assert organizer._execution_lock.acquire(blocking=False)
+    try:
+        result = organizer.execute_organization(analysis["suggestions"], True)
+    finally:
+        organizer._execution_lock.release()
+    
+    assert not result["success"]
+    assert result["busy"]
+    assert (root / "a.txt").exists()
+    
+    result = organizer.execute_organization(analysis["suggestions"], True)
+    assert result["success"] and "busy" not in result
+
+def test_busy_batch_is_retried(make_files):
+    root = make_files({"a.txt": "x"})
+    watcher = FolderWatcher([str(root)], "por_tipo", debounce=0)
+    
+    assert organizer._execution_lock.acquire(blocking=False)
+    try:
+        watcher._organize(str(root), [str(root / "a.txt")])
+    finally:
+        organizer._execution_lock.release()
+    
+    assert watcher.stats["batches"] == 0
+    assert str(root / "a.txt") in watcher._pending
+
+def test_watch_session_uses_one_backup(make_files):
+    root = make_files({"a.txt": "1", "b.jpg": "2", "c.mp3": "3"})
+    before = tree(root)
+    watcher = FolderWatcher([str(root)], "por_tipo", create_backup=True)
+    
+    watcher._organize(str(root), [str(root / "a.txt")])
+    watcher._organize(str(root), [str(root / "b.jpg"), str(root / "c.mp3")])
+    
+    backups = backup_manager.list_backups()
+    assert len(backups) == 1
+    assert backup_manager.get_backup_info(backups[0]["id"])["total_files"] == 3
+    assert watcher.stats["organized_files"] == 3
+    
+    assert backup_manager.restore_backup(backups[0]["id"])
+    assert tree(root) == before
\ No newline at end of file